@@ -2,11 +2,15 @@ from django.conf import settings
 from rest_framework.routers import DefaultRouter
 from rest_framework.routers import SimpleRouter
 
+from experienciaas.events.api.views import EventViewSet
+from experienciaas.events.api.views import FeedViewSet
 from experienciaas.users.api.views import UserViewSet
 
 router = DefaultRouter() if settings.DEBUG else SimpleRouter()
 
 router.register("users", UserViewSet)
+router.register("events", EventViewSet, basename="event")
+router.register("feed", FeedViewSet, basename="feed")
 
 
 app_name = "api"
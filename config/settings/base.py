@@ -5,6 +5,7 @@ import ssl
 from pathlib import Path
 
 import environ
+from celery.schedules import crontab
 
 BASE_DIR = Path(__file__).resolve(strict=True).parent.parent.parent
 # experienciaas/
@@ -47,8 +48,20 @@ LOCALE_PATHS = [str(BASE_DIR / "locale")]
 # DATABASES
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#databases
+# Requests aren't wrapped in a transaction: views that write several rows open
+# short atomic blocks around them, so nothing holds locks while rendering.
 DATABASES = {"default": env.db("DATABASE_URL")}
-DATABASES["default"]["ATOMIC_REQUESTS"] = True
+# Analytics tables, the main database unless set. Its own connection keeps
+# analytics writes out of the primary's transactions.
+DATABASES["analytics"] = env.db("ANALYTICS_DATABASE_URL", default=env("DATABASE_URL"))
+# Optional read replica for read-only pages, see experienciaas.utils.replicas
+if env("DATABASE_REPLICA_URL", default=""):
+    DATABASES["replica"] = env.db("DATABASE_REPLICA_URL")
+# https://docs.djangoproject.com/en/dev/ref/settings/#database-routers
+DATABASE_ROUTERS = [
+    "experienciaas.analytics.routers.AnalyticsRouter",
+    "experienciaas.utils.replicas.ReplicaRouter",
+]
 # https://docs.djangoproject.com/en/stable/ref/settings/#std:setting-DEFAULT_AUTO_FIELD
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -148,9 +161,10 @@ AUTH_PASSWORD_VALIDATORS = [
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
+    "experienciaas.analytics.middleware.PerformanceMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "experienciaas.utils.static.StaticFilesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -159,6 +173,8 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "allauth.account.middleware.AccountMiddleware",
+    "experienciaas.utils.replicas.ReplicaMiddleware",
+    "experienciaas.utils.public_pages.PublicPageMiddleware",
 ]
 
 # STATIC
@@ -188,7 +204,10 @@ MEDIA_URL = "/media/"
 TEMPLATES = [
     {
         # https://docs.djangoproject.com/en/dev/ref/settings/#std:setting-TEMPLATES-BACKEND
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates measuring render time, see experienciaas.analytics.performance
+        "BACKEND": "experienciaas.analytics.performance.InstrumentedDjangoTemplates",
+        # The alias is derived from the backend's module otherwise
+        "NAME": "django",
         # https://docs.djangoproject.com/en/dev/ref/settings/#dirs
         "DIRS": [str(APPS_DIR / "templates")],
         # https://docs.djangoproject.com/en/dev/ref/settings/#app-dirs
@@ -205,6 +224,7 @@ TEMPLATES = [
                 "django.template.context_processors.tz",
                 "django.contrib.messages.context_processors.messages",
                 "experienciaas.users.context_processors.allauth_settings",
+                "experienciaas.utils.public_pages.public_page_context",
             ],
         },
     },
@@ -313,6 +333,44 @@ CELERY_TASK_TIME_LIMIT = 5 * 60
 CELERY_TASK_SOFT_TIME_LIMIT = 60
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#beat-scheduler
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+# https://docs.celeryq.dev/en/stable/userguide/configuration.html#beat-schedule
+CELERY_BEAT_SCHEDULE = {
+    # Sends retries and messages stranded by a dead worker once their lease expires
+    "drain-email-outbox": {
+        "task": "experienciaas.users.tasks.drain_email_outbox",
+        "schedule": 60.0,
+    },
+    # Creates next months' partitions before rows land in the default one
+    "maintain-analytics-partitions": {
+        "task": "experienciaas.analytics.tasks.maintain_analytics_partitions",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    # Folds raw views and searches past ANALYTICS_COMPACT_AFTER_DAYS into rollups
+    "compact-analytics": {
+        "task": "experienciaas.analytics.tasks.compact_analytics",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    # Recomputes every user's recommendations, a run can take up to half an hour
+    "compute-event-recommendations": {
+        "task": "experienciaas.events.tasks.compute_event_recommendations",
+        "schedule": crontab(hour="*/6", minute=15),
+    },
+    # Saves the trending scores kept in Redis to the database
+    "checkpoint-trending-scores": {
+        "task": "experienciaas.events.tasks.checkpoint_trending_scores",
+        "schedule": 300.0,
+    },
+    # Rebuilds the suggestions well within suggestions.DELTA_TIMEOUT
+    "rebuild-search-suggestions": {
+        "task": "experienciaas.events.tasks.rebuild_search_suggestions",
+        "schedule": 600.0,
+    },
+    # Resumes follower notifications whose fan-out was interrupted
+    "resume-new-event-notifications": {
+        "task": "experienciaas.events.tasks.resume_new_event_notifications",
+        "schedule": 600.0,
+    },
+}
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#worker-send-task-events
 CELERY_WORKER_SEND_TASK_EVENTS = True
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#std-setting-task_send_sent_event
@@ -390,3 +448,33 @@ SPECTACULAR_SETTINGS = {
 }
 # Your stuff...
 # ------------------------------------------------------------------------------
+# New-event notifications: followers handled per task run, and emails per
+# second sent by each worker.
+EVENT_NOTIFICATION_CHUNK_SIZE = env.int("EVENT_NOTIFICATION_CHUNK_SIZE", default=200)
+EVENT_NOTIFICATION_RATE_LIMIT = env.int("EVENT_NOTIFICATION_RATE_LIMIT", default=10)
+# Email outbox: messages per batch (one SMTP connection each), delivery
+# attempts before giving up and messages per minute to each recipient domain.
+EMAIL_OUTBOX_BATCH_SIZE = env.int("EMAIL_OUTBOX_BATCH_SIZE", default=50)
+EMAIL_OUTBOX_MAX_ATTEMPTS = env.int("EMAIL_OUTBOX_MAX_ATTEMPTS", default=8)
+EMAIL_OUTBOX_DOMAIN_RATE_LIMIT = env.int("EMAIL_OUTBOX_DOMAIN_RATE_LIMIT", default=60)
+# Seconds during which an identical message to the same recipient is dropped.
+EMAIL_OUTBOX_DEDUPE_WINDOW = env.int("EMAIL_OUTBOX_DEDUPE_WINDOW", default=600)
+# Seconds during which repeated views of a page by the same visitor count once.
+ANALYTICS_VIEW_DEDUPE_WINDOW = env.int("ANALYTICS_VIEW_DEDUPE_WINDOW", default=30 * 60)
+# Days after which raw views and searches are folded into hourly rollups.
+ANALYTICS_COMPACT_AFTER_DAYS = env.int("ANALYTICS_COMPACT_AFTER_DAYS", default=90)
+# Seconds the replica may lag behind before reads go to the primary, and
+# seconds a client reads from the primary after a write.
+DATABASE_REPLICA_MAX_LAG = env.int("DATABASE_REPLICA_MAX_LAG", default=5)
+DATABASE_REPLICA_PIN_SECONDS = env.int("DATABASE_REPLICA_PIN_SECONDS", default=10)
+# Seconds an event detail page rendered for anonymous visitors is cached.
+EVENT_PAGE_CACHE_TIMEOUT = env.int("EVENT_PAGE_CACHE_TIMEOUT", default=5 * 60)
+# Seconds shared caches may keep the anonymous response of a public page.
+PUBLIC_PAGE_MAX_AGE = env.int("PUBLIC_PAGE_MAX_AGE", default=60)
+# Seconds a generated sitemap shard is kept, it's regenerated sooner when its
+# events or profiles change.
+SITEMAP_CACHE_TIMEOUT = env.int("SITEMAP_CACHE_TIMEOUT", default=24 * 60 * 60)
+# Measure SQL, cache and tracking time per request, sent to staff in a
+# Server-Timing header and logged for the given fraction of the requests.
+PERFORMANCE_METRICS = env.bool("PERFORMANCE_METRICS", default=True)
+PERFORMANCE_LOG_SAMPLE_RATE = env.float("PERFORMANCE_LOG_SAMPLE_RATE", default=0.01)
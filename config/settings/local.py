@@ -38,7 +38,7 @@ if ngrok_server:
 # https://docs.djangoproject.com/en/dev/ref/settings/#caches
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "BACKEND": "experienciaas.analytics.performance.InstrumentedLocMemCache",
         "LOCATION": "",
     },
 }
@@ -1,13 +1,87 @@
-async def websocket_application(scope, receive, send):
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+
+from experienciaas.events.realtime import LIVE_STATUSES
+from experienciaas.events.realtime import MAX_SUBSCRIPTIONS
+from experienciaas.events.realtime import SeatSubscription
+from experienciaas.events.realtime import get_seat_snapshots
+from experienciaas.events.realtime import seat_hub
+
+
+def parse_event_ids(message):
+    event_ids = set()
+    for value in message.get("events", []):
+        try:
+            event_ids.add(int(value))
+        except (TypeError, ValueError):
+            continue
+    return event_ids
+
+
+async def send_seat_updates(subscription, send):
     while True:
-        event = await receive()
+        updates = await subscription.get()
+        await send(
+            {
+                "type": "websocket.send",
+                "text": json.dumps({"type": "seats", "events": updates}),
+            }
+        )
+
+
+async def handle_message(text, subscription):
+    """Handle a client message.
+
+    Clients follow seat availability with ``{"action": "subscribe", "events": [ids]}``
+    and stop with ``{"action": "unsubscribe", "events": [ids]}``. The current
+    availability is sent right after subscribing, then every change.
+    """
+    try:
+        message = json.loads(text)
+    except ValueError:
+        return
+    if not isinstance(message, dict):
+        return
+
+    event_ids = parse_event_ids(message)
+    if message.get("action") == "subscribe":
+        available = MAX_SUBSCRIPTIONS - len(subscription.keys)
+        event_ids = sorted(event_ids - subscription.keys)[: max(0, available)]
+        if not event_ids:
+            return
+        snapshots = await sync_to_async(get_seat_snapshots)(
+            event_ids, statuses=LIVE_STATUSES
+        )
+        seat_hub.subscribe(subscription, [snapshot["event"] for snapshot in snapshots])
+        for snapshot in snapshots:
+            subscription.push(snapshot)
+    elif message.get("action") == "unsubscribe":
+        seat_hub.unsubscribe(subscription, event_ids & subscription.keys)
+
+
+async def websocket_application(scope, receive, send):
+    subscription = SeatSubscription()
+    sender = None
+    try:
+        while True:
+            event = await receive()
 
-        if event["type"] == "websocket.connect":
-            await send({"type": "websocket.accept"})
+            if event["type"] == "websocket.connect":
+                await send({"type": "websocket.accept"})
+                sender = asyncio.create_task(send_seat_updates(subscription, send))
 
-        if event["type"] == "websocket.disconnect":
-            break
+            if event["type"] == "websocket.disconnect":
+                break
 
-        if event["type"] == "websocket.receive":
-            if event["text"] == "ping":
-                await send({"type": "websocket.send", "text": "pong!"})
+            if event["type"] == "websocket.receive":
+                text = event.get("text")
+                if text == "ping":
+                    await send({"type": "websocket.send", "text": "pong!"})
+                elif text:
+                    await handle_message(text, subscription)
+    finally:
+        seat_hub.unsubscribe(subscription)
+        if sender is not None:
+            sender.cancel()
@@ -5,15 +5,17 @@ from django.utils.translation import gettext_lazy as _
 
 from .models import (
     EventView, OrganizerView, SearchQuery, TicketRegistration, 
-    DailyStats, OrganizerStats
+    DailyStats, OrganizerStats, BotRule, Referrer, UserAgent,
+    EventViewRollup, SearchRollup
 )
 
 
 @admin.register(EventView)
 class EventViewAdmin(admin.ModelAdmin):
     list_display = ['event', 'user', 'ip_address', 'timestamp']
-    list_filter = ['timestamp', 'event__category', 'event__city']
-    search_fields = ['event__title', 'user__email', 'ip_address']
+    list_filter = ['timestamp']
+    # Events and users may be on another database, so they're searched by id
+    search_fields = ['=event__id', '=user__id', 'ip_address']
     readonly_fields = ['timestamp']
     date_hierarchy = 'timestamp'
 
@@ -22,7 +24,7 @@ class EventViewAdmin(admin.ModelAdmin):
 class OrganizerViewAdmin(admin.ModelAdmin):
     list_display = ['organizer', 'user', 'ip_address', 'timestamp']
     list_filter = ['timestamp']
-    search_fields = ['organizer__user__name', 'user__email', 'ip_address']
+    search_fields = ['=organizer__id', '=user__id', 'ip_address']
     readonly_fields = ['timestamp']
     date_hierarchy = 'timestamp'
 
@@ -31,7 +33,7 @@ class OrganizerViewAdmin(admin.ModelAdmin):
 class SearchQueryAdmin(admin.ModelAdmin):
     list_display = ['query', 'results_count', 'category', 'city', 'user', 'timestamp']
     list_filter = ['timestamp', 'category', 'city', 'results_count']
-    search_fields = ['query', 'user__email']
+    search_fields = ['query', '=user__id']
     readonly_fields = ['timestamp']
     date_hierarchy = 'timestamp'
 
@@ -39,8 +41,8 @@ class SearchQueryAdmin(admin.ModelAdmin):
 @admin.register(TicketRegistration)
 class TicketRegistrationAdmin(admin.ModelAdmin):
     list_display = ['event', 'step', 'user', 'session_id', 'timestamp']
-    list_filter = ['step', 'timestamp', 'event__category']
-    search_fields = ['event__title', 'user__email', 'session_id']
+    list_filter = ['step', 'timestamp']
+    search_fields = ['=event__id', '=user__id', 'session_id']
     readonly_fields = ['timestamp']
     date_hierarchy = 'timestamp'
 
@@ -49,7 +51,7 @@ class TicketRegistrationAdmin(admin.ModelAdmin):
 class DailyStatsAdmin(admin.ModelAdmin):
     list_display = [
         'date', 'new_events', 'new_users', 'new_tickets', 
-        'new_revenue_display', 'total_views', 'unique_visitors'
+        'new_revenue_display', 'total_views', 'unique_visitors', 'bot_views'
     ]
     list_filter = ['date']
     readonly_fields = [
@@ -57,7 +59,7 @@ class DailyStatsAdmin(admin.ModelAdmin):
         'total_users', 'new_users', 'active_users',
         'total_tickets', 'new_tickets', 'confirmed_tickets',
         'total_revenue', 'new_revenue',
-        'total_views', 'unique_visitors',
+        'total_views', 'unique_visitors', 'bot_views',
         'created_at', 'updated_at'
     ]
     date_hierarchy = 'date'
@@ -74,7 +76,7 @@ class OrganizerStatsAdmin(admin.ModelAdmin):
         'total_attendees', 'profile_views', 'revenue_display'
     ]
     list_filter = ['year', 'month']
-    search_fields = ['organizer__user__name', 'organizer__user__email']
+    search_fields = ['=organizer__id']
     readonly_fields = [
         'events_created', 'events_published', 'total_attendees',
         'profile_views', 'event_views', 'new_followers',
@@ -87,6 +89,43 @@ class OrganizerStatsAdmin(admin.ModelAdmin):
     revenue_display.short_description = "Revenue"
 
 
+@admin.register(BotRule)
+class BotRuleAdmin(admin.ModelAdmin):
+    list_display = ['pattern', 'description', 'is_active', 'updated_at']
+    list_filter = ['is_active']
+    list_editable = ['is_active']
+    search_fields = ['pattern', 'description']
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(UserAgent)
+class UserAgentAdmin(admin.ModelAdmin):
+    list_display = ['browser', 'os', 'device', 'user_agent']
+    list_filter = ['device', 'browser', 'os']
+    search_fields = ['user_agent']
+
+
+@admin.register(Referrer)
+class ReferrerAdmin(admin.ModelAdmin):
+    list_display = ['domain', 'path']
+    search_fields = ['domain', 'path']
+
+
+@admin.register(EventViewRollup)
+class EventViewRollupAdmin(admin.ModelAdmin):
+    list_display = ['event', 'hour', 'device', 'referrer_domain', 'views']
+    list_filter = ['device']
+    search_fields = ['=event__id', 'referrer_domain']
+    date_hierarchy = 'hour'
+
+
+@admin.register(SearchRollup)
+class SearchRollupAdmin(admin.ModelAdmin):
+    list_display = ['normalized_query', 'hour', 'searches']
+    search_fields = ['normalized_query']
+    date_hierarchy = 'hour'
+
+
 # Custom admin site for better organization
 class AnalyticsAdminSite(admin.AdminSite):
     site_header = "Experienciaas Analytics"
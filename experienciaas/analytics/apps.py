@@ -1,4 +1,8 @@
+import contextlib
+
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 from django.utils.translation import gettext_lazy as _
 
 
@@ -6,3 +10,12 @@ class AnalyticsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "experienciaas.analytics"
     verbose_name = _("Analytics")
+
+    def ready(self):
+        with contextlib.suppress(ImportError):
+            import experienciaas.analytics.signals  # noqa: F401, PLC0415
+
+        if settings.PERFORMANCE_METRICS:
+            from .performance import install_query_recorder  # noqa: PLC0415
+
+            connection_created.connect(install_query_recorder, dispatch_uid="performance_query_recorder")
@@ -0,0 +1,144 @@
+"""Crawler and monitor filtering at analytics ingestion.
+
+Views whose user agent matches a bot rule are dropped before anything is
+written, so crawlers and uptime checks neither inflate ``EventView`` and
+``Event.views`` nor slow down the aggregates. The built-in rules and the
+active ``BotRule`` rows are compiled into a single regular expression, and
+verdicts are cached per user agent string, since a handful of strings make up
+most of the traffic.
+
+Saving or deleting a ``BotRule`` bumps a version in the cache; every process
+checks it at most every ``RULES_CHECK_INTERVAL`` seconds and recompiles when it
+changed. Dropped views are counted per day and saved to
+``DailyStats.bot_views`` for audit.
+"""
+import re
+import time
+from functools import lru_cache
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import BotRule
+
+DEFAULT_PATTERNS = (
+    r'bot\b',
+    r'crawl',
+    r'spider',
+    r'slurp',
+    r'archiver',
+    r'facebookexternalhit',
+    r'embedly',
+    r'preview',
+    r'headless',
+    r'lighthouse',
+    r'uptime',
+    r'monitor',
+    r'pingdom',
+    r'statuscake',
+    r'^curl/',
+    r'^wget/',
+    r'python-requests',
+    r'python-urllib',
+    r'aiohttp',
+    r'httpx',
+    r'go-http-client',
+    r'okhttp',
+    r'^java/',
+    r'node-fetch',
+    r'axios/',
+    r'scrapy',
+)
+
+RULES_VERSION_KEY = 'analytics:bot_rules:version'
+RULES_CHECK_INTERVAL = 5
+USER_AGENT_CACHE_SIZE = 4096
+# Longer user agents are only matched on their start.
+MAX_USER_AGENT_LENGTH = 512
+COUNT_KEY = 'analytics:bot_views:{date:%Y%m%d}:{kind}'
+COUNT_TIMEOUT = 60 * 60 * 24 * 3
+
+EVENT = 'event'
+ORGANIZER = 'organizer'
+
+_matcher = None
+_rules_version = None
+_checked_at = 0.0
+
+
+def compile_rules():
+    """One case-insensitive expression matching any active rule."""
+    patterns = list(DEFAULT_PATTERNS)
+    for pattern in BotRule.objects.filter(is_active=True).values_list('pattern', flat=True):
+        try:
+            re.compile(pattern)
+        except re.error:
+            # Rules saved without validation mustn't break ingestion
+            continue
+        patterns.append(pattern)
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), re.IGNORECASE)
+
+
+def get_matcher():
+    """The compiled rules, recompiled when they changed."""
+    global _matcher, _rules_version, _checked_at  # noqa: PLW0603
+    now = time.monotonic()
+    if _matcher is not None and now - _checked_at < RULES_CHECK_INTERVAL:
+        return _matcher
+    _checked_at = now
+
+    version = cache.get(RULES_VERSION_KEY, 0)
+    if _matcher is None or version != _rules_version:
+        _matcher, _rules_version = compile_rules(), version
+        match_user_agent.cache_clear()
+    return _matcher
+
+
+def reload_bot_rules():
+    """Make every process recompile the rules on its next check."""
+    try:
+        cache.incr(RULES_VERSION_KEY)
+    except ValueError:
+        cache.set(RULES_VERSION_KEY, int(time.time()), timeout=None)
+
+
+@lru_cache(maxsize=USER_AGENT_CACHE_SIZE)
+def match_user_agent(user_agent):
+    return _matcher.search(user_agent) is not None
+
+
+def is_bot(user_agent):
+    """Whether a user agent belongs to a crawler, monitor or script.
+
+    Browsers always send a user agent, so requests without one are bots too.
+    """
+    if not user_agent:
+        return True
+    get_matcher()
+    return match_user_agent(user_agent[:MAX_USER_AGENT_LENGTH])
+
+
+def is_bot_request(request):
+    return is_bot(request.META.get('HTTP_USER_AGENT', ''))
+
+
+def record_filtered_view(kind, date=None):
+    """Count a dropped view of an event or organizer profile."""
+    if date is None:
+        date = timezone.localdate()
+    key = COUNT_KEY.format(date=date, kind=kind)
+    if cache.add(key, 1, timeout=COUNT_TIMEOUT):
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Expired in between
+        cache.add(key, 1, timeout=COUNT_TIMEOUT)
+
+
+def get_filtered_views(date):
+    """Dropped views of a day, by kind."""
+    keys = {kind: COUNT_KEY.format(date=date, kind=kind) for kind in (EVENT, ORGANIZER)}
+    counts = cache.get_many(keys.values())
+    return {kind: counts.get(key, 0) for kind, key in keys.items()}
+
@@ -0,0 +1,61 @@
+"""Windowed deduplication of page views.
+
+A visitor refreshing a page within ``ANALYTICS_VIEW_DEDUPE_WINDOW`` seconds
+counts once: the view is identified by the page, the user (or IP address for
+anonymous visitors) and a hash of the user agent, and the first one claims a
+Redis key with SET NX and the window as TTL. Later views find the key taken
+and are skipped before anything is written.
+
+Without Redis each process remembers the views it saw in a bounded LRU, which
+only dedupes refreshes served by the same process.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from redis.exceptions import RedisError
+
+from experienciaas.utils.redis import get_redis
+from experienciaas.utils.redis import mark_unavailable
+
+LOCAL_MAX_ENTRIES = 10000
+
+_local_seen = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def get_view_key(kind, object_id, visitor, user_agent):
+    agent = hashlib.blake2b(user_agent.encode(), digest_size=8).hexdigest()
+    return f"views:seen:{kind}:{object_id}:{visitor}:{agent}"
+
+
+def claim_locally(key, window):
+    """Whether ``key`` is new to this process within the window."""
+    now = time.monotonic()
+    with _local_lock:
+        expires_at = _local_seen.get(key)
+        if expires_at is not None and expires_at > now:
+            return False
+        _local_seen[key] = now + window
+        _local_seen.move_to_end(key)
+        while len(_local_seen) > LOCAL_MAX_ENTRIES:
+            _local_seen.popitem(last=False)
+    return True
+
+
+def is_duplicate_view(kind, object_id, visitor, user_agent):
+    """Whether the visitor already viewed the page within the window."""
+    window = settings.ANALYTICS_VIEW_DEDUPE_WINDOW
+    if window <= 0:
+        return False
+
+    key = get_view_key(kind, object_id, visitor, user_agent)
+    client = get_redis()
+    if client is not None:
+        try:
+            return not client.set(key, 1, nx=True, ex=window)
+        except RedisError as exc:
+            mark_unavailable(exc)
+    return not claim_locally(key, window)
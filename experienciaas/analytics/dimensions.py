@@ -0,0 +1,149 @@
+"""Dictionary-encoded user agent and referrer dimensions.
+
+View rows store small foreign keys to ``UserAgent`` and ``Referrer`` instead
+of the raw strings, which repeat on almost every row. User agents are parsed
+once into device, browser and OS when first seen; referrers are reduced to
+their domain and path, dropping query strings that would make every link
+unique.
+
+Each process keeps the string -> id mappings it resolved in bounded LRU
+caches, so a hot user agent or referrer costs no query at all. Rows created
+inside a transaction are only cached once it commits, so a rolled back
+request can't leave an id to a missing row behind.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from django.db import transaction
+
+from .models import Referrer, UserAgent
+from .routers import get_analytics_db
+
+CACHE_SIZE = 4096
+
+DEVICE_PATTERNS = (
+    ('tablet', re.compile(r'ipad|tablet|kindle|silk|playbook|android(?!.*mobile)', re.IGNORECASE)),
+    ('mobile', re.compile(r'mobi|iphone|ipod|android|blackberry|opera mini|windows phone', re.IGNORECASE)),
+)
+# Order matters: Edge and Opera also claim to be Chrome, Chrome claims to be Safari.
+BROWSER_PATTERNS = (
+    ('Edge', re.compile(r'edg(?:e|a|ios)?/', re.IGNORECASE)),
+    ('Opera', re.compile(r'opr/|opera', re.IGNORECASE)),
+    ('Samsung Internet', re.compile(r'samsungbrowser/', re.IGNORECASE)),
+    ('Firefox', re.compile(r'firefox/|fxios/', re.IGNORECASE)),
+    ('Chrome', re.compile(r'chrome/|crios/', re.IGNORECASE)),
+    ('Safari', re.compile(r'safari/', re.IGNORECASE)),
+)
+OS_PATTERNS = (
+    ('iOS', re.compile(r'iphone|ipad|ipod', re.IGNORECASE)),
+    ('Android', re.compile(r'android', re.IGNORECASE)),
+    ('Windows', re.compile(r'windows', re.IGNORECASE)),
+    ('macOS', re.compile(r'mac os x|macintosh', re.IGNORECASE)),
+    ('Linux', re.compile(r'linux|x11', re.IGNORECASE)),
+)
+
+MAX_PATH_LENGTH = 500
+
+
+def first_match(patterns, user_agent, default):
+    for name, pattern in patterns:
+        if pattern.search(user_agent):
+            return name
+    return default
+
+
+def parse_user_agent(user_agent):
+    """Device, browser and OS of a user agent string."""
+    return {
+        'device': first_match(DEVICE_PATTERNS, user_agent, 'desktop'),
+        'browser': first_match(BROWSER_PATTERNS, user_agent, 'Other'),
+        'os': first_match(OS_PATTERNS, user_agent, 'Other'),
+    }
+
+
+def hash_user_agent(user_agent):
+    return hashlib.blake2b(user_agent.encode(), digest_size=16).hexdigest()
+
+
+def split_referrer(referrer):
+    """Domain and path of a referrer URL, or ``None`` if it has no domain."""
+    parts = urlsplit(referrer.strip())
+    domain = (parts.hostname or '').removeprefix('www.')
+    if not domain:
+        return None
+    return domain[:255], (parts.path or '/')[:MAX_PATH_LENGTH]
+
+
+class IdCache:
+    """Bounded, thread-safe LRU mapping of strings to row ids."""
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.ids = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            pk = self.ids.get(key)
+            if pk is not None:
+                self.ids.move_to_end(key)
+            return pk
+
+    def set(self, key, pk):
+        with self.lock:
+            self.ids[key] = pk
+            while len(self.ids) > self.size:
+                self.ids.popitem(last=False)
+
+    def remember(self, key, pk, created):
+        if created:
+            transaction.on_commit(lambda: self.set(key, pk), using=get_analytics_db())
+        else:
+            self.set(key, pk)
+
+    def clear(self):
+        with self.lock:
+            self.ids.clear()
+
+
+user_agent_ids = IdCache()
+referrer_ids = IdCache()
+
+
+def get_user_agent_id(user_agent):
+    """Id of the ``UserAgent`` row of a string, created on first sight."""
+    if not user_agent:
+        return None
+    pk = user_agent_ids.get(user_agent)
+    if pk is None:
+        agent, created = UserAgent.objects.get_or_create(
+            hash=hash_user_agent(user_agent),
+            defaults={'user_agent': user_agent, **parse_user_agent(user_agent)}
+        )
+        pk = agent.pk
+        user_agent_ids.remember(user_agent, pk, created)
+    return pk
+
+
+def get_referrer_id(referrer):
+    """Id of the ``Referrer`` row of a URL, created on first sight."""
+    if not referrer:
+        return None
+    pk = referrer_ids.get(referrer)
+    if pk is None:
+        parts = split_referrer(referrer)
+        if parts is None:
+            return None
+        domain, path = parts
+        row, created = Referrer.objects.get_or_create(domain=domain, path=path)
+        pk = row.pk
+        referrer_ids.remember(referrer, pk, created)
+    return pk
+
+
+def clear_caches():
+    user_agent_ids.clear()
+    referrer_ids.clear()
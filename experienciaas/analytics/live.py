@@ -0,0 +1,174 @@
+"""Live activity feed for the organizer analytics dashboard.
+
+Ticket confirmations and event views increment per-organizer counters in Redis
+as they are ingested. A throttled task drains the counters of every active
+organizer and publishes their deltas in a single message on ``LIVE_CHANNEL``,
+which each ASGI process relays to the dashboards watching those organizers
+through ``live_hub``. Flushing doesn't touch the database, so the number of
+watching organizers doesn't change the query load.
+"""
+import asyncio
+import datetime
+import json
+import time
+from decimal import Decimal
+
+from django.db.models import Count
+from django.db.models import Sum
+from django.utils import timezone
+from redis.exceptions import RedisError
+
+from experienciaas.events.models import Ticket
+from experienciaas.utils.pubsub import PubSubHub
+from experienciaas.utils.redis import get_redis
+from experienciaas.utils.redis import mark_unavailable
+
+from .models import EventView
+from .routers import get_organizer_event_ids
+
+LIVE_CHANNEL = 'analytics:live'
+LIVE_DIRTY_KEY = 'analytics:live:dirty'
+LIVE_FLUSH_KEY = 'analytics:live:flush-scheduled'
+# Minimum delay between two published messages, in seconds.
+FLUSH_INTERVAL = 1
+# Safety expiry of the flush marker, in case the scheduled task is lost.
+FLUSH_MARKER_TIMEOUT = 30
+# Undrained counters expire instead of piling up.
+COUNTERS_TIMEOUT = 60 * 60
+
+DELTA_FIELDS = ('tickets', 'revenue', 'views')
+
+
+def get_counters_key(organizer_id):
+    return f"analytics:live:{organizer_id}"
+
+
+def record_live_activity(organizer_id, tickets=0, revenue=0, views=0):
+    """Add activity of an organizer to the next published delta."""
+    client = get_redis()
+    if client is None or organizer_id is None:
+        return
+
+    key = get_counters_key(organizer_id)
+    try:
+        pipe = client.pipeline()
+        if tickets:
+            pipe.hincrby(key, 'tickets', tickets)
+        if revenue:
+            # Stored in cents so increments stay exact
+            pipe.hincrby(key, 'revenue', int(Decimal(revenue) * 100))
+        if views:
+            pipe.hincrby(key, 'views', views)
+        pipe.expire(key, COUNTERS_TIMEOUT)
+        pipe.sadd(LIVE_DIRTY_KEY, organizer_id)
+        pipe.set(LIVE_FLUSH_KEY, 1, nx=True, ex=FLUSH_MARKER_TIMEOUT)
+        scheduled = pipe.execute()[-1]
+    except RedisError as exc:
+        mark_unavailable(exc)
+        return
+
+    if scheduled:
+        from .tasks import publish_live_activity
+        publish_live_activity.apply_async(countdown=FLUSH_INTERVAL)
+
+
+def flush_live_activity():
+    """Publish the pending deltas of every organizer. Returns the organizer count."""
+    client = get_redis()
+    if client is None:
+        return 0
+
+    try:
+        # Clear the marker first: activity recorded from now on schedules a
+        # new flush, while everything recorded before is drained below.
+        client.delete(LIVE_FLUSH_KEY)
+        pipe = client.pipeline(transaction=True)
+        pipe.smembers(LIVE_DIRTY_KEY)
+        pipe.delete(LIVE_DIRTY_KEY)
+        organizer_ids, _ = pipe.execute()
+        if not organizer_ids:
+            return 0
+
+        organizer_ids = [int(organizer_id) for organizer_id in organizer_ids]
+        pipe = client.pipeline(transaction=True)
+        for organizer_id in organizer_ids:
+            pipe.hgetall(get_counters_key(organizer_id))
+            pipe.delete(get_counters_key(organizer_id))
+        counters = pipe.execute()[::2]
+
+        timestamp = int(time.time())
+        deltas = [
+            build_delta(organizer_id, values, timestamp)
+            for organizer_id, values in zip(organizer_ids, counters, strict=True)
+            if values
+        ]
+        if deltas:
+            client.publish(LIVE_CHANNEL, json.dumps({'organizers': deltas}))
+    except RedisError as exc:
+        mark_unavailable(exc)
+        return 0
+    return len(deltas)
+
+
+def build_delta(organizer_id, values, timestamp):
+    return {
+        'organizer': organizer_id,
+        'tickets': int(values.get(b'tickets', 0)),
+        'revenue': int(values.get(b'revenue', 0)) / 100,
+        'views': int(values.get(b'views', 0)),
+        'timestamp': timestamp,
+    }
+
+
+def get_live_snapshot(user):
+    """Return today's sales and the views of the last minute of an organizer."""
+    now = timezone.now()
+    start_of_day = timezone.localtime(now).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    sales = Ticket.objects.filter(
+        event__organizer=user,
+        status='confirmed',
+        created_at__gte=start_of_day
+    ).aggregate(tickets=Count('id'), revenue=Sum('amount_paid'))
+    views = EventView.objects.filter(
+        event_id__in=get_organizer_event_ids(user.pk),
+        timestamp__gte=now - datetime.timedelta(minutes=1)
+    ).count()
+    return {
+        'organizer': user.pk,
+        'tickets_today': sales['tickets'],
+        'revenue_today': float(sales['revenue'] or 0),
+        'views_last_minute': views,
+        'timestamp': int(now.timestamp()),
+    }
+
+
+class LiveSubscription:
+    """Deltas waiting to be streamed to one dashboard.
+
+    Deltas that arrive while the client is busy are summed into one.
+    """
+
+    def __init__(self):
+        self.keys = set()
+        self.pending = None
+        self.ready = asyncio.Event()
+
+    def push(self, delta):
+        if self.pending is None:
+            self.pending = dict(delta)
+        else:
+            for field in DELTA_FIELDS:
+                self.pending[field] += delta[field]
+            self.pending['timestamp'] = delta['timestamp']
+        self.ready.set()
+
+    async def get(self):
+        await self.ready.wait()
+        self.ready.clear()
+        delta, self.pending = self.pending, None
+        return delta
+
+
+live_hub = PubSubHub(LIVE_CHANNEL, items_key='organizers', id_key='organizer')
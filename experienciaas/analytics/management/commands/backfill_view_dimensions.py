@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from experienciaas.analytics.dimensions import get_referrer_id
+from experienciaas.analytics.dimensions import get_user_agent_id
+from experienciaas.analytics.models import EventView, OrganizerView
+from experienciaas.analytics.routers import get_analytics_db
+
+
+class Command(BaseCommand):
+    help = 'Move the user agent and referrer strings of old views to the lookup tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Views updated per transaction',
+        )
+
+    def handle(self, *args, **options):
+        for model in (EventView, OrganizerView):
+            updated = self.backfill(model, options['batch_size'])
+            self.stdout.write(
+                self.style.SUCCESS(f'✓ {model._meta.verbose_name_plural}: {updated} updated')
+            )
+
+    def backfill(self, model, batch_size):
+        pending = model.objects.filter(~Q(raw_user_agent='') | ~Q(raw_referrer=''))
+        last_pk = 0
+        updated = 0
+        while True:
+            # Short transactions, walking the primary key
+            with transaction.atomic(using=get_analytics_db()):
+                views = list(
+                    pending.filter(pk__gt=last_pk).order_by('pk').only(
+                        'pk', 'user_agent', 'referrer', 'raw_user_agent', 'raw_referrer'
+                    )[:batch_size]
+                )
+                if not views:
+                    return updated
+                for view in views:
+                    if view.user_agent_id is None:
+                        view.user_agent_id = get_user_agent_id(view.raw_user_agent)
+                    if view.referrer_id is None:
+                        view.referrer_id = get_referrer_id(view.raw_referrer)
+                    view.raw_user_agent = ''
+                    view.raw_referrer = ''
+                model.objects.bulk_update(
+                    views, ['user_agent', 'referrer', 'raw_user_agent', 'raw_referrer']
+                )
+            last_pk = views[-1].pk
+            updated += len(views)
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {updated} updated...')
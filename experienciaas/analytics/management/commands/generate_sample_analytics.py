@@ -3,6 +3,8 @@ from django.utils import timezone
 from datetime import datetime, timedelta
 import random
 
+from experienciaas.analytics.dimensions import get_referrer_id
+from experienciaas.analytics.dimensions import get_user_agent_id
 from experienciaas.analytics.utils import generate_daily_stats
 from experienciaas.analytics.models import EventView, OrganizerView, SearchQuery
 from experienciaas.events.models import Event
@@ -73,8 +75,8 @@ class Command(BaseCommand):
                 event=event,
                 user=user,
                 ip_address=random.choice(sample_ips),
-                user_agent=random.choice(sample_user_agents),
-                referrer='https://google.com' if random.random() > 0.5 else '',
+                user_agent_id=get_user_agent_id(random.choice(sample_user_agents)),
+                referrer_id=get_referrer_id('https://google.com' if random.random() > 0.5 else ''),
                 timestamp=timestamp
             )
             event_views_created += 1
@@ -95,8 +97,8 @@ class Command(BaseCommand):
                     organizer=organizer,
                     user=user,
                     ip_address=random.choice(sample_ips),
-                    user_agent=random.choice(sample_user_agents),
-                    referrer='https://google.com' if random.random() > 0.5 else '',
+                    user_agent_id=get_user_agent_id(random.choice(sample_user_agents)),
+                    referrer_id=get_referrer_id('https://google.com' if random.random() > 0.5 else ''),
                     timestamp=timestamp
                 )
                 organizer_views_created += 1
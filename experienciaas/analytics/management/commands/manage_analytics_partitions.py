@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from experienciaas.analytics.partitions import MONTHS_AHEAD
+from experienciaas.analytics.partitions import RETENTION_MONTHS
+from experienciaas.analytics.partitions import ensure_partitions
+from experienciaas.analytics.partitions import expire_partitions
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming monthly analytics partitions and retire expired ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=MONTHS_AHEAD,
+            help='Months after the current one to create partitions for',
+        )
+        parser.add_argument(
+            '--retention-months',
+            type=int,
+            default=RETENTION_MONTHS,
+            help='Months of raw data to keep; older months are detached, views and searches rolled up first',
+        )
+        parser.add_argument(
+            '--drop',
+            action='store_true',
+            help='Drop expired partitions, and those detached earlier, instead of leaving them detached',
+        )
+
+    def handle(self, *args, **options):
+        for name in ensure_partitions(options['months_ahead']):
+            self.stdout.write(self.style.SUCCESS(f'✓ Created {name}'))
+
+        expired = expire_partitions(options['retention_months'], drop=options['drop'])
+        action = 'Dropped' if options['drop'] else 'Detached'
+        for name in expired:
+            self.stdout.write(self.style.SUCCESS(f'✓ {action} {name}'))
+
+        self.stdout.write(self.style.SUCCESS('Analytics partitions are up to date.'))
@@ -1,19 +1,75 @@
-from django.utils.deprecation import MiddlewareMixin
-from experienciaas.analytics.utils import track_event_view, track_organizer_view
-
-
-class AnalyticsMiddleware(MiddlewareMixin):
-    """Middleware to automatically track page views for analytics."""
-    
-    def process_view(self, request, view_func, view_args, view_kwargs):
-        # Track event views
-        if 'events.views' in str(view_func) and 'detail' in view_func.__name__.lower():
-            # This will be handled in the view itself to avoid duplicate tracking
-            pass
-        
-        # Track organizer profile views
-        if 'users.views' in str(view_func) and 'organizer' in view_func.__name__.lower():
-            # This will be handled in the view itself to avoid duplicate tracking
-            pass
-        
-        return None
+import json
+import logging
+import random
+
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from experienciaas.utils.public_pages import is_public_page
+
+from .performance import end_request
+from .performance import start_request
+
+logger = logging.getLogger(__name__)
+
+
+class PerformanceMiddleware:
+    """Measure each request, see ``experienciaas.analytics.performance``.
+
+    It should come first, so the total latency covers the other middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PERFORMANCE_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics, token = start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(metrics, token)
+        return self.report(request, response, metrics, is_staff=self.is_staff(request))
+
+    async def __acall__(self, request):
+        metrics, token = start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(metrics, token)
+        return self.report(request, response, metrics, is_staff=await self.ais_staff(request))
+
+    def report(self, request, response, metrics, is_staff):
+        if is_staff:
+            response["Server-Timing"] = metrics.as_server_timing()
+        if random.random() < settings.PERFORMANCE_LOG_SAMPLE_RATE:  # noqa: S311
+            match = request.resolver_match
+            logger.info(json.dumps({
+                "method": request.method,
+                "path": request.path,
+                "view": match.view_name if match else None,
+                "status": response.status_code,
+                **metrics.as_dict(),
+            }))
+        return response
+
+    def is_staff(self, request):
+        # Public pages never load the session
+        if is_public_page(request) or not hasattr(request, "user"):
+            return False
+        return request.user.is_staff
+
+    async def ais_staff(self, request):
+        if is_public_page(request) or not hasattr(request, "auser"):
+            return False
+        return (await request.auser()).is_staff
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.11 on 2026-10-19 04:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitorSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('site', 'Site'), ('event', 'Event'), ('organizer', 'Organizer')], max_length=20, verbose_name='Scope')),
+                ('object_id', models.PositiveIntegerField(default=0, verbose_name='Object id')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('sketch', models.BinaryField(verbose_name='Sketch')),
+            ],
+            options={
+                'verbose_name': 'Visitor Sketch',
+                'verbose_name_plural': 'Visitor Sketches',
+                'ordering': ['-date'],
+                'unique_together': {('scope', 'object_id', 'date')},
+            },
+        ),
+    ]
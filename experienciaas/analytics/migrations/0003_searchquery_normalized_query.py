@@ -0,0 +1,42 @@
+# Generated by Django 5.1.11 on 2026-10-19 04:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def normalize_queries(apps, schema_editor):
+    from experienciaas.analytics.searches import normalize_search_query
+
+    SearchQuery = apps.get_model('analytics', 'SearchQuery')
+    manager = SearchQuery.objects.db_manager(schema_editor.connection.alias)
+    searches = manager.filter(normalized_query='').only('pk', 'query')
+    batch = []
+    for search in searches.iterator(chunk_size=2000):
+        search.normalized_query = normalize_search_query(search.query)
+        batch.append(search)
+        if len(batch) == 2000:
+            manager.bulk_update(batch, ['normalized_query'])
+            batch = []
+    manager.bulk_update(batch, ['normalized_query'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_visitorsketch'),
+        ('events', '0010_event_trending_score'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchquery',
+            name='normalized_query',
+            field=models.CharField(blank=True, max_length=200, verbose_name='Normalized query'),
+        ),
+        migrations.AddIndex(
+            model_name='searchquery',
+            index=models.Index(fields=['timestamp', 'normalized_query'], name='analytics_s_timesta_920cee_idx'),
+        ),
+        migrations.RunPython(normalize_queries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.11 on 2026-10-19 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_searchquery_normalized_query'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BotRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pattern', models.CharField(help_text='Case-insensitive regular expression searched in the user agent', max_length=200, unique=True, verbose_name='Pattern')),
+                ('description', models.CharField(blank=True, max_length=200, verbose_name='Description')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Is active')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Bot Rule',
+                'verbose_name_plural': 'Bot Rules',
+                'ordering': ['pattern'],
+            },
+        ),
+        migrations.AddField(
+            model_name='dailystats',
+            name='bot_views',
+            field=models.PositiveIntegerField(default=0, verbose_name='Bot views'),
+        ),
+    ]
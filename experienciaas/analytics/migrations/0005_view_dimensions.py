@@ -0,0 +1,82 @@
+# Generated by Django 5.1.11 on 2026-10-19 05:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_botrule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Referrer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(max_length=255, verbose_name='Domain')),
+                ('path', models.CharField(max_length=500, verbose_name='Path')),
+            ],
+            options={
+                'verbose_name': 'Referrer',
+                'verbose_name_plural': 'Referrers',
+                'unique_together': {('domain', 'path')},
+            },
+        ),
+        migrations.CreateModel(
+            name='UserAgent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash', models.CharField(max_length=32, unique=True, verbose_name='Hash')),
+                ('user_agent', models.TextField(verbose_name='User agent')),
+                ('device', models.CharField(choices=[('desktop', 'Desktop'), ('mobile', 'Mobile'), ('tablet', 'Tablet')], max_length=20, verbose_name='Device')),
+                ('browser', models.CharField(max_length=50, verbose_name='Browser')),
+                ('os', models.CharField(max_length=50, verbose_name='Operating system')),
+            ],
+            options={
+                'verbose_name': 'User Agent',
+                'verbose_name_plural': 'User Agents',
+            },
+        ),
+        migrations.RenameField(
+            model_name='eventview',
+            old_name='user_agent',
+            new_name='raw_user_agent',
+        ),
+        migrations.RenameField(
+            model_name='eventview',
+            old_name='referrer',
+            new_name='raw_referrer',
+        ),
+        migrations.RenameField(
+            model_name='organizerview',
+            old_name='user_agent',
+            new_name='raw_user_agent',
+        ),
+        migrations.RenameField(
+            model_name='organizerview',
+            old_name='referrer',
+            new_name='raw_referrer',
+        ),
+        migrations.AddField(
+            model_name='eventview',
+            name='user_agent',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='analytics.useragent'),
+        ),
+        migrations.AddField(
+            model_name='eventview',
+            name='referrer',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='analytics.referrer'),
+        ),
+        migrations.AddField(
+            model_name='organizerview',
+            name='user_agent',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='analytics.useragent'),
+        ),
+        migrations.AddField(
+            model_name='organizerview',
+            name='referrer',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='analytics.referrer'),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Converts the raw analytics tables to tables partitioned by month of
+# ``timestamp``. Django's state is unchanged: the models keep ``id`` as their
+# primary key, while the database key becomes ``(id, timestamp)``. Other
+# databases, such as SQLite for tests, keep plain tables.
+
+from django.db import migrations
+
+TABLES = [
+    'analytics_eventview',
+    'analytics_organizerview',
+    'analytics_searchquery',
+    'analytics_ticketregistration',
+]
+
+PARTITION_SQL = """
+DO $$
+DECLARE
+    definitions text[];
+    definition text;
+    month date;
+    last_month date := date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months';
+    max_id bigint;
+BEGIN
+    -- Indexes and foreign keys to recreate, under their current names
+    SELECT coalesce(array_agg(pg_get_indexdef(indexrelid)), '{{}}') INTO definitions
+    FROM pg_index WHERE indrelid = '{table}'::regclass AND NOT indisprimary;
+    SELECT definitions || coalesce(array_agg(
+        format('ALTER TABLE {table} ADD CONSTRAINT %I %s', conname, pg_get_constraintdef(oid))
+    ), '{{}}') INTO definitions
+    FROM pg_constraint WHERE conrelid = '{table}'::regclass AND contype = 'f';
+
+    ALTER TABLE {table} RENAME TO {table}_unpartitioned;
+    CREATE TABLE {table} (LIKE {table}_unpartitioned INCLUDING DEFAULTS)
+        PARTITION BY RANGE ("timestamp");
+
+    SELECT date_trunc('month', coalesce(min("timestamp"), now()) AT TIME ZONE 'UTC')
+    INTO month FROM {table}_unpartitioned;
+    WHILE month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+            '{table}_p' || to_char(month, 'YYYYMM'),
+            month::text || ' 00:00:00+00',
+            (month + interval '1 month')::date::text || ' 00:00:00+00'
+        );
+        month := month + interval '1 month';
+    END LOOP;
+    CREATE TABLE {table}_default PARTITION OF {table} DEFAULT;
+
+    INSERT INTO {table} SELECT * FROM {table}_unpartitioned;
+    SELECT max(id) INTO max_id FROM {table}_unpartitioned;
+    DROP TABLE {table}_unpartitioned;
+
+    CREATE SEQUENCE {table}_id_seq OWNED BY {table}.id;
+    PERFORM setval('{table}_id_seq', coalesce(max_id, 0) + 1, false);
+    ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{table}_id_seq');
+    ALTER TABLE {table} ADD PRIMARY KEY (id, "timestamp");
+    FOREACH definition IN ARRAY definitions LOOP
+        EXECUTE definition;
+    END LOOP;
+END
+$$;
+"""
+
+
+def partition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in TABLES:
+        schema_editor.execute(PARTITION_SQL.format(table=table), params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0005_view_dimensions'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_tables, migrations.RunPython.noop),
+    ]
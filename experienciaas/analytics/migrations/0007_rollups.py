@@ -0,0 +1,78 @@
+# Generated by Django 5.1.11 on 2026-10-19 04:41
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class AddPostgresIndex(migrations.AddIndex):
+    """``AddIndex`` of an index type only PostgreSQL has, skipped elsewhere."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0006_partition_raw_tables'),
+        ('events', '0010_event_trending_score'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventViewRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(verbose_name='Hour')),
+                ('device', models.CharField(blank=True, max_length=20, verbose_name='Device')),
+                ('referrer_domain', models.CharField(blank=True, max_length=255, verbose_name='Referrer domain')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='Views')),
+            ],
+            options={
+                'verbose_name': 'Event View Rollup',
+                'verbose_name_plural': 'Event View Rollups',
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(verbose_name='Hour')),
+                ('normalized_query', models.CharField(max_length=200, verbose_name='Normalized query')),
+                ('searches', models.PositiveIntegerField(default=0, verbose_name='Searches')),
+            ],
+            options={
+                'verbose_name': 'Search Rollup',
+                'verbose_name_plural': 'Search Rollups',
+            },
+        ),
+        AddPostgresIndex(
+            model_name='eventview',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['timestamp'], name='analytics_eventview_ts_brin'),
+        ),
+        migrations.AddField(
+            model_name='eventviewrollup',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_rollups', to='events.event'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='searchrollup',
+            unique_together={('hour', 'normalized_query')},
+        ),
+        migrations.AddIndex(
+            model_name='eventviewrollup',
+            index=models.Index(fields=['hour'], name='analytics_e_hour_3c68a3_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='eventviewrollup',
+            unique_together={('event', 'hour', 'device', 'referrer_domain')},
+        ),
+    ]
@@ -1,18 +1,76 @@
+import re
+
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import BrinIndex
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 User = get_user_model()
 
+# Analytics tables may live on another database (see
+# experienciaas.analytics.routers), so foreign keys to other apps have no
+# database constraint; experienciaas.analytics.signals cleans up after deletes.
+
+
+class UserAgent(models.Model):
+    """Distinct user agent string seen in views, parsed once."""
+    DEVICE_CHOICES = [
+        ('desktop', _('Desktop')),
+        ('mobile', _('Mobile')),
+        ('tablet', _('Tablet')),
+    ]
+
+    # Hash of the string, which may be too long to index
+    hash = models.CharField(_("Hash"), max_length=32, unique=True)
+    user_agent = models.TextField(_("User agent"))
+    device = models.CharField(_("Device"), max_length=20, choices=DEVICE_CHOICES)
+    browser = models.CharField(_("Browser"), max_length=50)
+    os = models.CharField(_("Operating system"), max_length=50)
+
+    class Meta:
+        verbose_name = _("User Agent")
+        verbose_name_plural = _("User Agents")
+
+    def __str__(self):
+        return f"{self.browser} / {self.os} ({self.device})"
+
+
+class Referrer(models.Model):
+    """Distinct referring page seen in views, without its query string."""
+    domain = models.CharField(_("Domain"), max_length=255)
+    path = models.CharField(_("Path"), max_length=500)
+
+    class Meta:
+        verbose_name = _("Referrer")
+        verbose_name_plural = _("Referrers")
+        unique_together = [('domain', 'path')]
+
+    def __str__(self):
+        return f"{self.domain}{self.path}"
+
 
 class EventView(models.Model):
     """Track event page views for analytics."""
-    event = models.ForeignKey('events.Event', on_delete=models.CASCADE, related_name='event_views')
-    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    # Partitioned by month of timestamp, see experienciaas.analytics.partitions
+    event = models.ForeignKey(
+        'events.Event', on_delete=models.DO_NOTHING, db_constraint=False, related_name='event_views'
+    )
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True)
     ip_address = models.GenericIPAddressField()
-    user_agent = models.TextField(blank=True)
-    referrer = models.URLField(blank=True)
+    # Views are grouped by these after filtering by event or organizer, so
+    # they aren't indexed on their own
+    user_agent = models.ForeignKey(
+        UserAgent, on_delete=models.PROTECT, null=True, blank=True, db_index=False, related_name='+'
+    )
+    referrer = models.ForeignKey(
+        Referrer, on_delete=models.PROTECT, null=True, blank=True, db_index=False, related_name='+'
+    )
+    # Strings of views recorded before the lookup tables, emptied by the
+    # ``backfill_view_dimensions`` command
+    raw_user_agent = models.TextField(blank=True)
+    raw_referrer = models.URLField(blank=True)
     timestamp = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -22,16 +80,31 @@ class EventView(models.Model):
             models.Index(fields=['event', 'timestamp']),
             models.Index(fields=['user', 'timestamp']),
             models.Index(fields=['ip_address', 'timestamp']),
+            # Compaction reads and deletes views by time window
+            BrinIndex(fields=['timestamp'], name='analytics_eventview_ts_brin'),
         ]
 
 
 class OrganizerView(models.Model):
     """Track organizer profile views for analytics."""
-    organizer = models.ForeignKey('users.OrganizerProfile', on_delete=models.CASCADE, related_name='profile_views')
-    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    # Partitioned by month of timestamp, see experienciaas.analytics.partitions
+    organizer = models.ForeignKey(
+        'users.OrganizerProfile', on_delete=models.DO_NOTHING, db_constraint=False, related_name='profile_views'
+    )
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True)
     ip_address = models.GenericIPAddressField()
-    user_agent = models.TextField(blank=True)
-    referrer = models.URLField(blank=True)
+    # Views are grouped by these after filtering by event or organizer, so
+    # they aren't indexed on their own
+    user_agent = models.ForeignKey(
+        UserAgent, on_delete=models.PROTECT, null=True, blank=True, db_index=False, related_name='+'
+    )
+    referrer = models.ForeignKey(
+        Referrer, on_delete=models.PROTECT, null=True, blank=True, db_index=False, related_name='+'
+    )
+    # Strings of views recorded before the lookup tables, emptied by the
+    # ``backfill_view_dimensions`` command
+    raw_user_agent = models.TextField(blank=True)
+    raw_referrer = models.URLField(blank=True)
     timestamp = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -45,12 +118,17 @@ class OrganizerView(models.Model):
 
 class SearchQuery(models.Model):
     """Track search queries for analytics and improvements."""
+    # Partitioned by month of timestamp, see experienciaas.analytics.partitions
     query = models.CharField(_("Search query"), max_length=200)
-    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    # Lowercase, accent- and punctuation-free form popular searches are counted by
+    normalized_query = models.CharField(_("Normalized query"), max_length=200, blank=True)
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True)
     ip_address = models.GenericIPAddressField()
     results_count = models.PositiveIntegerField(_("Results count"), default=0)
-    category = models.ForeignKey('events.Category', on_delete=models.SET_NULL, null=True, blank=True)
-    city = models.ForeignKey('events.City', on_delete=models.SET_NULL, null=True, blank=True)
+    category = models.ForeignKey(
+        'events.Category', on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True
+    )
+    city = models.ForeignKey('events.City', on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True)
     timestamp = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -59,11 +137,56 @@ class SearchQuery(models.Model):
         indexes = [
             models.Index(fields=['query']),
             models.Index(fields=['timestamp']),
+            models.Index(fields=['timestamp', 'normalized_query']),
         ]
 
+    def save(self, *args, **kwargs):
+        if not self.normalized_query:
+            from .searches import normalize_search_query
+            self.normalized_query = normalize_search_query(self.query)
+        super().save(*args, **kwargs)
+
+
+class EventViewRollup(models.Model):
+    """Hourly view counts of an event, compacted from old ``EventView`` rows."""
+    event = models.ForeignKey(
+        'events.Event', on_delete=models.DO_NOTHING, db_constraint=False, related_name='view_rollups'
+    )
+    hour = models.DateTimeField(_("Hour"))
+    device = models.CharField(_("Device"), max_length=20, blank=True)
+    referrer_domain = models.CharField(_("Referrer domain"), max_length=255, blank=True)
+    views = models.PositiveIntegerField(_("Views"), default=0)
+
+    class Meta:
+        verbose_name = _("Event View Rollup")
+        verbose_name_plural = _("Event View Rollups")
+        unique_together = [('event', 'hour', 'device', 'referrer_domain')]
+        indexes = [
+            models.Index(fields=['hour']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} - {self.hour}: {self.views}"
+
+
+class SearchRollup(models.Model):
+    """Hourly counts of a normalized search, compacted from old ``SearchQuery`` rows."""
+    hour = models.DateTimeField(_("Hour"))
+    normalized_query = models.CharField(_("Normalized query"), max_length=200)
+    searches = models.PositiveIntegerField(_("Searches"), default=0)
+
+    class Meta:
+        verbose_name = _("Search Rollup")
+        verbose_name_plural = _("Search Rollups")
+        unique_together = [('hour', 'normalized_query')]
+
+    def __str__(self):
+        return f"{self.normalized_query} - {self.hour}: {self.searches}"
+
 
 class TicketRegistration(models.Model):
     """Track ticket registration funnel for analytics."""
+    # Partitioned by month of timestamp, see experienciaas.analytics.partitions
     STEP_CHOICES = [
         ('started', _('Registration Started')),
         ('form_filled', _('Form Filled')),
@@ -72,8 +195,10 @@ class TicketRegistration(models.Model):
         ('abandoned', _('Registration Abandoned')),
     ]
     
-    event = models.ForeignKey('events.Event', on_delete=models.CASCADE, related_name='registration_analytics')
-    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    event = models.ForeignKey(
+        'events.Event', on_delete=models.DO_NOTHING, db_constraint=False, related_name='registration_analytics'
+    )
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True)
     session_id = models.CharField(_("Session ID"), max_length=50)
     step = models.CharField(_("Registration step"), max_length=20, choices=STEP_CHOICES)
     ip_address = models.GenericIPAddressField()
@@ -114,6 +239,8 @@ class DailyStats(models.Model):
     # Traffic stats
     total_views = models.PositiveIntegerField(_("Total views"), default=0)
     unique_visitors = models.PositiveIntegerField(_("Unique visitors"), default=0)
+    # Views from crawlers and monitors, not recorded
+    bot_views = models.PositiveIntegerField(_("Bot views"), default=0)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -127,7 +254,9 @@ class DailyStats(models.Model):
 
 class OrganizerStats(models.Model):
     """Monthly organizer statistics for analytics dashboard."""
-    organizer = models.ForeignKey('users.OrganizerProfile', on_delete=models.CASCADE, related_name='monthly_stats')
+    organizer = models.ForeignKey(
+        'users.OrganizerProfile', on_delete=models.DO_NOTHING, db_constraint=False, related_name='monthly_stats'
+    )
     year = models.PositiveIntegerField(_("Year"))
     month = models.PositiveIntegerField(_("Month"))
     
@@ -153,3 +282,63 @@ class OrganizerStats(models.Model):
         verbose_name_plural = _("Organizer Statistics")
         unique_together = [('organizer', 'year', 'month')]
         ordering = ['-year', '-month']
+
+
+class VisitorSketch(models.Model):
+    """HyperLogLog sketch of one day's unique visitors, saved from Redis.
+
+    Sketches of several days can be merged to count the unique visitors of
+    any period without scanning views.
+    """
+    SCOPE_CHOICES = [
+        ('site', _('Site')),
+        ('event', _('Event')),
+        ('organizer', _('Organizer')),
+    ]
+
+    scope = models.CharField(_("Scope"), max_length=20, choices=SCOPE_CHOICES)
+    # Event or organizer (user) id, 0 for the whole site
+    object_id = models.PositiveIntegerField(_("Object id"), default=0)
+    date = models.DateField(_("Date"))
+    sketch = models.BinaryField(_("Sketch"))
+
+    class Meta:
+        verbose_name = _("Visitor Sketch")
+        verbose_name_plural = _("Visitor Sketches")
+        unique_together = [('scope', 'object_id', 'date')]
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.scope}:{self.object_id} - {self.date}"
+
+
+class BotRule(models.Model):
+    """User agent pattern of traffic that isn't recorded in analytics.
+
+    Complements the built-in rules of ``experienciaas.analytics.bots``; changes
+    are picked up by running processes without a restart.
+    """
+    pattern = models.CharField(
+        _("Pattern"),
+        max_length=200,
+        unique=True,
+        help_text=_("Case-insensitive regular expression searched in the user agent")
+    )
+    description = models.CharField(_("Description"), max_length=200, blank=True)
+    is_active = models.BooleanField(_("Is active"), default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Bot Rule")
+        verbose_name_plural = _("Bot Rules")
+        ordering = ['pattern']
+
+    def __str__(self):
+        return self.pattern
+
+    def clean(self):
+        try:
+            re.compile(self.pattern)
+        except re.error as exc:
+            raise ValidationError({'pattern': _("Invalid regular expression: %(error)s") % {'error': exc}})
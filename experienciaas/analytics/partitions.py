@@ -0,0 +1,203 @@
+"""Monthly partitions of the raw analytics tables.
+
+``EventView``, ``OrganizerView``, ``SearchQuery`` and ``TicketRegistration``
+are PostgreSQL tables partitioned by range of ``timestamp``, one partition per
+calendar month (UTC) named ``<table>_pYYYYMM``, plus a default partition that
+only catches rows no monthly partition exists for. Queries filtering on a
+``timestamp`` range only scan the months they need, and old months are
+removed by detaching or dropping their partition instead of a huge DELETE.
+
+In the database their primary key is ``(id, timestamp)``, as PostgreSQL
+requires the partition key in unique constraints; ids still come from one
+sequence per table, so Django keeps treating ``id`` as the primary key.
+
+``manage_analytics_partitions`` (or the ``maintain_analytics_partitions``
+task) creates the coming months ahead of time and retires months past the
+retention window by detaching or dropping their partition. Months of views
+and searches are rolled up (see ``experienciaas.analytics.rollups``) in the
+transaction detaching them, so readers count a month either from its rows or
+from its rollups, never both and never neither. Compaction retires them
+the same way once they're past ``ANALYTICS_COMPACT_AFTER_DAYS``, keeping the
+detached partitions until the retention window drops them. Organizer views
+and ticket registrations are only read over recent periods and are retired
+without rollups.
+Analytics databases other than PostgreSQL keep plain tables and are left alone.
+"""
+import datetime
+
+from django.db import connections
+from django.db import transaction
+
+from .models import EventView, OrganizerView, SearchQuery, TicketRegistration
+from .rollups import roll_up_searches
+from .rollups import roll_up_views
+from .routers import get_analytics_db
+
+PARTITIONED_MODELS = (EventView, OrganizerView, SearchQuery, TicketRegistration)
+# Rolling up the rows of a month before its partition is retired
+ROLLUPS = {EventView: roll_up_views, SearchQuery: roll_up_searches}
+MONTHS_AHEAD = 3
+RETENTION_MONTHS = 13
+
+
+def month_start(date):
+    return datetime.date(date.year, date.month, 1)
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def get_partition_name(table, month):
+    return f"{table}_p{month:%Y%m}"
+
+
+def get_month_range(month):
+    """Start and end of ``month`` (UTC), the bounds of its partition."""
+    return (
+        datetime.datetime.combine(month, datetime.time(), tzinfo=datetime.UTC),
+        datetime.datetime.combine(add_months(month, 1), datetime.time(), tzinfo=datetime.UTC),
+    )
+
+
+def is_partitioned():
+    return connections[get_analytics_db()].vendor == 'postgresql'
+
+
+def get_months(table, names):
+    prefix = f"{table}_p"
+    return sorted(
+        datetime.datetime.strptime(name.removeprefix(prefix), '%Y%m').date()
+        for name in names
+        if name.startswith(prefix) and name.removeprefix(prefix).isdigit()
+    )
+
+
+def get_partition_months(table):
+    """Months with a partition of ``table``, oldest first."""
+    with connections[get_analytics_db()].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [table],
+        )
+        return get_months(table, [name for name, in cursor.fetchall()])
+
+
+def get_detached_months(table):
+    """Months with a detached partition of ``table``, oldest first."""
+    with connections[get_analytics_db()].cursor() as cursor:
+        cursor.execute(
+            "SELECT relname FROM pg_class WHERE relkind = 'r' AND NOT relispartition AND relname LIKE %s",
+            [f"{table}_p%"],
+        )
+        return get_months(table, [name for name, in cursor.fetchall()])
+
+
+def create_partition(table, month):
+    """Create the partition of ``table`` for ``month`` if it doesn't exist."""
+    connection = connections[get_analytics_db()]
+    quote = connection.ops.quote_name
+    name = get_partition_name(table, month)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {quote(name)} PARTITION OF {quote(table)} "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+            f"TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+        )
+    return name
+
+
+def ensure_partitions(months_ahead=MONTHS_AHEAD, today=None):
+    """Create the partitions up to ``months_ahead`` months from now.
+
+    Returns the names of the partitions that were missing.
+    """
+    if not is_partitioned():
+        return []
+    current = month_start(today or datetime.datetime.now(tz=datetime.UTC).date())
+    months = [add_months(current, offset) for offset in range(months_ahead + 1)]
+    created = []
+    for model in PARTITIONED_MODELS:
+        table = model._meta.db_table
+        existing = set(get_partition_months(table))
+        for month in months:
+            if month not in existing:
+                # Moving default partition rows in would need a lock of the
+                # whole table, so this is meant to run well ahead of time
+                with transaction.atomic(using=get_analytics_db()):
+                    created.append(create_partition(table, month))
+    return created
+
+
+def retire_partition(model, month, drop=False):  # noqa: FBT002
+    """Detach (or drop) the partition of ``model`` for ``month``.
+
+    Views and searches are rolled up in the same transaction. Returns the
+    number of rows rolled up.
+    """
+    connection = connections[get_analytics_db()]
+    quote = connection.ops.quote_name
+    table = model._meta.db_table
+    name = get_partition_name(table, month)
+    with transaction.atomic(using=connection.alias):
+        rolled_up = ROLLUPS[model](*get_month_range(month)) if model in ROLLUPS else 0
+        with connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {quote(table)} DETACH PARTITION {quote(name)}")
+            if drop:
+                cursor.execute(f"DROP TABLE {quote(name)}")
+    return rolled_up
+
+
+def compact_partitions(cutoff):
+    """Roll up and detach the months of views and searches ending by ``cutoff``.
+
+    Returns the number of views and searches rolled up.
+    """
+    if not is_partitioned():
+        return 0, 0
+    totals = []
+    for model in ROLLUPS:
+        total = 0
+        for month in get_partition_months(model._meta.db_table):
+            if get_month_range(month)[1] <= cutoff:
+                total += retire_partition(model, month)
+        totals.append(total)
+    return tuple(totals)
+
+
+def expire_partitions(retention_months=RETENTION_MONTHS, drop=False, today=None):  # noqa: FBT002
+    """Detach (or drop) the partitions older than the retention window.
+
+    Detached partitions remain as standalone tables for archiving, including
+    those detached by compaction, until a run with ``drop``. Returns the names
+    of the partitions detached or dropped.
+    """
+    if not is_partitioned():
+        return []
+    current = month_start(today or datetime.datetime.now(tz=datetime.UTC).date())
+    cutoff = add_months(current, -retention_months)
+    connection = connections[get_analytics_db()]
+    quote = connection.ops.quote_name
+    expired = []
+    for model in PARTITIONED_MODELS:
+        table = model._meta.db_table
+        for month in get_partition_months(table):
+            if month < cutoff:
+                retire_partition(model, month, drop=drop)
+                expired.append(get_partition_name(table, month))
+        if not drop:
+            continue
+        for month in get_detached_months(table):
+            if month < cutoff:
+                name = get_partition_name(table, month)
+                with connection.cursor() as cursor:
+                    cursor.execute(f"DROP TABLE {quote(name)}")
+                expired.append(name)
+    return expired
@@ -0,0 +1,197 @@
+"""Per-request performance metrics.
+
+``PerformanceMiddleware`` measures every request while ``PERFORMANCE_METRICS``
+is on:
+
+- SQL queries and their duration, over all database aliases, recorded by an
+  execute wrapper installed on each connection as it's created;
+- cache hits and misses of the ``Instrumented*Cache`` backends;
+- template rendering of the ``InstrumentedDjangoTemplates`` backend, counting
+  only the outermost render so includes and form widgets aren't added twice;
+- time spent in the ``track_*`` analytics helpers (``timed``); queries run by
+  them or by templates also count as SQL;
+- total latency.
+
+Metrics live in a context variable, so queries run from async views through
+``sync_to_async`` count for their request, and recording outside a request
+costs a single lookup. Staff get the metrics in a ``Server-Timing`` header,
+and ``PERFORMANCE_LOG_SAMPLE_RATE`` of the requests are logged as JSON.
+
+With ``PERFORMANCE_METRICS`` off the middleware removes itself and no execute
+wrapper is installed.
+"""
+
+import contextvars
+import functools
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.core.cache.backends.locmem import LocMemCache
+from django.template.backends.django import DjangoTemplates
+from django.template.backends.django import Template
+from django_redis.cache import RedisCache
+
+_metrics = contextvars.ContextVar("performance_metrics", default=None)
+
+_MISSING = object()
+
+
+class RequestMetrics:
+    """What a request spent its time on, durations in seconds."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.query_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.tracking_time = 0.0
+        self.template_time = 0.0
+        self.rendering = False
+        self.total_time = 0.0
+
+    def as_dict(self):
+        return {
+            "total_ms": round(self.total_time * 1000, 2),
+            "db_queries": self.queries,
+            "db_ms": round(self.query_time * 1000, 2),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "track_ms": round(self.tracking_time * 1000, 2),
+            "template_ms": round(self.template_time * 1000, 2),
+        }
+
+    def as_server_timing(self):
+        return ", ".join([
+            f'db;dur={self.query_time * 1000:.2f};desc="{self.queries} queries"',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            f"track;dur={self.tracking_time * 1000:.2f}",
+            f"tpl;dur={self.template_time * 1000:.2f}",
+            f"total;dur={self.total_time * 1000:.2f}",
+        ])
+
+
+def start_request():
+    """Measure the current context, returning its metrics and reset token."""
+    metrics = RequestMetrics()
+    return metrics, _metrics.set(metrics)
+
+
+def end_request(metrics, token):
+    metrics.total_time = time.perf_counter() - metrics.started
+    _metrics.reset(token)
+
+
+def get_metrics():
+    """Metrics of the request being measured, ``None`` outside of one."""
+    return _metrics.get()
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = _metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.query_time += time.perf_counter() - started
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """``connection_created`` receiver adding ``record_query`` to the connection."""
+    # Wrappers survive reconnections
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def record_cache_lookups(hits, misses):
+    metrics = _metrics.get()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+
+
+def timed(func):
+    """Add the time spent in ``func`` to the request's tracking time."""
+    if iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            metrics = _metrics.get()
+            if metrics is None:
+                return await func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                metrics.tracking_time += time.perf_counter() - started
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        metrics = _metrics.get()
+        if metrics is None:
+            return func(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.tracking_time += time.perf_counter() - started
+
+    return wrapper
+
+
+class InstrumentedCacheMixin:
+    """Count the hits and misses of a cache backend.
+
+    ``get_or_set``, the async methods and the default ``get_many`` go through
+    ``get``.
+    """
+
+    def get(self, key, default=None, version=None, **kwargs):
+        value = super().get(key, _MISSING, version, **kwargs)
+        if value is _MISSING:
+            record_cache_lookups(0, 1)
+            return default
+        record_cache_lookups(1, 0)
+        return value
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    pass
+
+
+class InstrumentedRedisCache(InstrumentedCacheMixin, RedisCache):
+    def get_many(self, keys, version=None, **kwargs):
+        # Fetched with a single MGET
+        keys = list(keys)
+        values = super().get_many(keys, version=version, **kwargs)
+        record_cache_lookups(len(values), len(keys) - len(values))
+        return values
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        metrics = _metrics.get()
+        if metrics is None or metrics.rendering:
+            return super().render(context, request)
+        metrics.rendering = True
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.rendering = False
+            metrics.template_time += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Django templates adding their render time to the request's metrics."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return InstrumentedTemplate(super().get_template(template_name).template, self)
@@ -0,0 +1,197 @@
+"""Compaction of old raw analytics rows into hourly rollups.
+
+Past ``ANALYTICS_COMPACT_AFTER_DAYS`` raw views are only read in aggregate,
+so ``compact_analytics`` folds them into ``EventViewRollup`` rows keyed by
+(event, hour, device, referrer domain) and old searches into
+``SearchRollup`` rows keyed by (hour, normalized query).
+
+On PostgreSQL whole months are compacted: each monthly partition is rolled
+up and detached in one transaction, without deleting its rows (see
+``experienciaas.analytics.partitions``). Rows no partition holds, and those
+of other databases, are folded and deleted an hour at a time, each hour in
+its own transaction, so a crash never counts a view twice and deletes stay
+small.
+
+``count_views`` and ``count_searches`` add the rollups to the raw rows that
+are left, so readers get the same totals whether rows were compacted or not.
+Rollups have hourly resolution: a period starting mid-hour leaves out the
+compacted views of that first hour. Per-user and per-IP details (recommendations,
+distinct IP fallbacks for unique visitors) only cover the raw rows.
+"""
+import datetime
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import EventView, EventViewRollup, SearchQuery, SearchRollup
+from .routers import get_analytics_db
+from .routers import get_organizer_event_ids
+
+WINDOW = datetime.timedelta(hours=1)
+
+VIEW_GROUPS = {
+    'day': (TruncDate('timestamp'), TruncDate('hour')),
+    'event': (F('event_id'), F('event_id')),
+    'device': (F('user_agent__device'), F('device')),
+    'referrer': (F('referrer__domain'), F('referrer_domain')),
+}
+
+
+def get_cutoff(days=None):
+    if days is None:
+        days = settings.ANALYTICS_COMPACT_AFTER_DAYS
+    cutoff = timezone.now() - datetime.timedelta(days=days)
+    return cutoff.replace(minute=0, second=0, microsecond=0)
+
+
+def get_windows(queryset, cutoff):
+    """Hour windows with rows of ``queryset`` before ``cutoff``, oldest first."""
+    hours = queryset.filter(timestamp__lt=cutoff).annotate(
+        hour=TruncHour('timestamp', tzinfo=datetime.UTC)
+    ).values_list('hour', flat=True).distinct().order_by('hour')
+    # Read up front, the windows' rows are deleted as they're compacted
+    for start in list(hours):
+        yield start, start + WINDOW
+
+
+def merge_rollups(model, key_fields, count_field, counts, start, end):
+    """Add ``counts`` (key tuple -> count) to the rollups between ``start`` and ``end``.
+
+    Keys start with the hour, followed by the other ``key_fields``.
+    """
+    key_fields = ('hour', *key_fields)
+    existing = {
+        tuple(getattr(rollup, field) for field in key_fields): rollup
+        for rollup in model.objects.filter(hour__gte=start, hour__lt=end)
+    }
+    created, updated = [], []
+    for key, count in counts.items():
+        rollup = existing.get(key)
+        if rollup is None:
+            fields = dict(zip(key_fields, key, strict=True))
+            created.append(model(**fields, **{count_field: count}))
+        else:
+            setattr(rollup, count_field, getattr(rollup, count_field) + count)
+            updated.append(rollup)
+    model.objects.bulk_create(created, batch_size=1000)
+    model.objects.bulk_update(updated, [count_field], batch_size=1000)
+
+
+def roll_up_views(start, end):
+    """Add the views between ``start`` and ``end`` to the rollups. Returns their number.
+
+    The views are left in place, callers delete or detach them in the same
+    transaction.
+    """
+    views = EventView.objects.filter(timestamp__gte=start, timestamp__lt=end).annotate(
+        hour=TruncHour('timestamp', tzinfo=datetime.UTC)
+    )
+    counts = {
+        (row['hour'], row['event_id'], row['user_agent__device'] or '', row['referrer__domain'] or ''):
+            row['total']
+        for row in views.values('hour', 'event_id', 'user_agent__device', 'referrer__domain').annotate(
+            total=Count('id')
+        )
+    }
+    merge_rollups(EventViewRollup, ('event_id', 'device', 'referrer_domain'), 'views', counts, start, end)
+    return sum(counts.values())
+
+
+def roll_up_searches(start, end):
+    """Add the searches between ``start`` and ``end`` to the rollups. Returns their number."""
+    searches = SearchQuery.objects.filter(timestamp__gte=start, timestamp__lt=end)
+    counts = {
+        (row['hour'], row['normalized_query']): row['total']
+        for row in searches.exclude(normalized_query='').annotate(
+            hour=TruncHour('timestamp', tzinfo=datetime.UTC)
+        ).values('hour', 'normalized_query').annotate(total=Count('id'))
+    }
+    merge_rollups(SearchRollup, ('normalized_query',), 'searches', counts, start, end)
+    # Searches normalized to nothing aren't kept
+    return searches.count()
+
+
+def compact_views(cutoff):
+    """Fold the views before ``cutoff`` into rollups. Returns the rows deleted."""
+    deleted = 0
+    for start, end in get_windows(EventView.objects.all(), cutoff):
+        with transaction.atomic(using=get_analytics_db()):
+            if roll_up_views(start, end):
+                deleted += EventView.objects.filter(timestamp__gte=start, timestamp__lt=end).delete()[0]
+    return deleted
+
+
+def compact_searches(cutoff):
+    """Fold the searches before ``cutoff`` into rollups. Returns the rows deleted."""
+    deleted = 0
+    for start, end in get_windows(SearchQuery.objects.all(), cutoff):
+        with transaction.atomic(using=get_analytics_db()):
+            if roll_up_searches(start, end):
+                deleted += SearchQuery.objects.filter(timestamp__gte=start, timestamp__lt=end).delete()[0]
+    return deleted
+
+
+def compact_analytics(days=None):
+    """Compact the raw views and searches older than ``days``.
+
+    Returns the number of views and searches compacted.
+    """
+    from .partitions import compact_partitions  # noqa: PLC0415
+    from .partitions import is_partitioned  # noqa: PLC0415
+
+    cutoff = get_cutoff(days)
+    views, searches = compact_partitions(cutoff)
+    if is_partitioned():
+        # Months before the cutoff's were detached, leaving the rows of
+        # months without a partition
+        cutoff = cutoff.replace(day=1, hour=0)
+    return views + compact_views(cutoff), searches + compact_searches(cutoff)
+
+
+def count_views(group=None, start=None, end=None, organizer=None):
+    """Count views from the raw rows and the rollups.
+
+    Without ``group`` returns the total. Otherwise returns a ``Counter`` by
+    ``'day'``, ``'event'``, ``'device'`` or ``'referrer'`` (domain); views
+    without a device or referrer are counted under ``None``.
+    """
+    raw = EventView.objects.all()
+    rolled = EventViewRollup.objects.all()
+    if organizer is not None:
+        event_ids = get_organizer_event_ids(organizer.pk)
+        raw = raw.filter(event_id__in=event_ids)
+        rolled = rolled.filter(event_id__in=event_ids)
+    if start is not None:
+        raw = raw.filter(timestamp__gte=start)
+        rolled = rolled.filter(hour__gte=start)
+    if end is not None:
+        raw = raw.filter(timestamp__lt=end)
+        rolled = rolled.filter(hour__lt=end)
+
+    if group is None:
+        return raw.count() + (rolled.aggregate(total=Sum('views'))['total'] or 0)
+
+    raw_key, rolled_key = VIEW_GROUPS[group]
+    counts = Counter()
+    for row in raw.annotate(key=raw_key).values('key').annotate(total=Count('id')):
+        counts[row['key']] += row['total']
+    for row in rolled.annotate(key=rolled_key).values('key').annotate(total=Sum('views')):
+        counts[row['key'] or None] += row['total']
+    return counts
+
+
+def count_searches(start):
+    """Counts of normalized searches since ``start``, from raw rows and rollups."""
+    counts = Counter()
+    raw = SearchQuery.objects.filter(timestamp__gte=start).exclude(normalized_query='')
+    for row in raw.values('normalized_query').annotate(total=Count('id')):
+        counts[row['normalized_query']] += row['total']
+    rolled = SearchRollup.objects.filter(hour__gte=start)
+    for row in rolled.values('normalized_query').annotate(total=Sum('searches')):
+        counts[row['normalized_query']] += row['total']
+    return counts
@@ -0,0 +1,57 @@
+"""Database router sending the analytics app to its own alias.
+
+Dashboard queries over the raw analytics tables are heavy, so the analytics
+app can live on another database (``ANALYTICS_DATABASE_URL``) without
+competing with ticket sales. It defaults to the main database, but still
+through its own connection: analytics writes autocommit instead of joining a
+transaction open on the primary, so they neither hold its locks nor roll back
+with it.
+
+Analytics rows reference events, users and organizers by id only (foreign
+keys without database constraints), so queries on the analytics alias must
+never join the tables of other apps. Every alias carries the whole schema,
+which keeps the historic migrations applying; only the analytics tables of
+the analytics alias are used. Run ``migrate --database=analytics`` when it
+points to another database.
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+APP_LABEL = 'analytics'
+ANALYTICS_DB_ALIAS = 'analytics'
+
+
+def get_analytics_db():
+    """Alias of the analytics tables, the default one if not configured."""
+    if ANALYTICS_DB_ALIAS in settings.DATABASES:
+        return ANALYTICS_DB_ALIAS
+    return DEFAULT_DB_ALIAS
+
+
+def get_organizer_event_ids(organizer_id):
+    """Ids of an organizer's events, to filter analytics rows without a join."""
+    from experienciaas.events.models import Event
+    return list(Event.objects.filter(organizer_id=organizer_id).values_list('pk', flat=True))
+
+
+def is_analytics(model):
+    return model._meta.app_label == APP_LABEL
+
+
+class AnalyticsRouter:
+    def db_for_read(self, model, **hints):
+        if is_analytics(model):
+            return get_analytics_db()
+        # Events or users fetched through an analytics row live on the
+        # default database, not on the row's one
+        instance = hints.get('instance')
+        if instance is not None and is_analytics(instance):
+            return DEFAULT_DB_ALIAS
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if is_analytics(obj1) or is_analytics(obj2):
+            return True
+        return None
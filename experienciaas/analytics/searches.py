@@ -0,0 +1,115 @@
+"""Popular searches.
+
+Queries are normalized when they are recorded (case, accents, punctuation and
+spacing), so "Concierto", "concierto " and "conciertó" count as one search.
+Each day's counts are a Redis sorted set incremented with ZINCRBY. Closed days
+are trimmed to their ``MAX_TERMS_PER_BUCKET`` most frequent terms, which keeps
+the heavy hitters while bounding memory. The top searches of any window are
+the ZUNIONSTORE of its days, cached for a few minutes, so the dashboard reads
+the top K with a single ZREVRANGE. Without Redis the counts are grouped from
+``SearchQuery`` rows and their hourly rollups.
+"""
+import datetime
+import re
+import unicodedata
+
+from django.utils import timezone
+from redis.exceptions import RedisError
+
+from experienciaas.utils.redis import get_redis
+from experienciaas.utils.redis import mark_unavailable
+
+from .rollups import count_searches
+
+BUCKET_RETENTION_DAYS = 40
+MAX_TERMS_PER_BUCKET = 1000
+WINDOW_CACHE_TIMEOUT = 5 * 60
+
+COMBINING_TILDE = '\u0303'
+
+
+def normalize_search_query(query):
+    """Lowercase ``query``, strip accents and punctuation and collapse spaces.
+
+    The Spanish "ñ" is kept.
+    """
+    characters = []
+    for character in unicodedata.normalize('NFKD', query.casefold()):
+        if unicodedata.combining(character):
+            if character == COMBINING_TILDE and characters and characters[-1] == 'n':
+                characters.append(character)
+            continue
+        characters.append(character)
+    text = unicodedata.normalize('NFC', ''.join(characters))
+    text = re.sub(r'[^\w\s]|_', ' ', text)
+    return ' '.join(text.split())[:200]
+
+
+def get_bucket_key(date):
+    return f"searches:top:{date:%Y%m%d}"
+
+
+def get_window_key(end_date, days):
+    return f"searches:top:window:{end_date:%Y%m%d}:{days}"
+
+
+def record_search(normalized_query, date=None):
+    """Count a normalized search in the day's bucket."""
+    client = get_redis()
+    if client is None or not normalized_query:
+        return
+    if date is None:
+        date = timezone.localdate()
+
+    key = get_bucket_key(date)
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.zincrby(key, 1, normalized_query)
+        pipe.expire(key, BUCKET_RETENTION_DAYS * 24 * 60 * 60)
+        pipe.execute()
+    except RedisError as exc:
+        mark_unavailable(exc)
+
+
+def get_popular_searches(days=30, limit=10):
+    """The ``limit`` most frequent searches of the last ``days`` days.
+
+    Returns a list of ``{'query': ..., 'count': ...}`` dicts.
+    """
+    end_date = timezone.localdate()
+    client = get_redis()
+    if client is not None:
+        try:
+            top = get_top_from_buckets(client, end_date, days, limit)
+        except RedisError as exc:
+            mark_unavailable(exc)
+        else:
+            if top is not None:
+                return top
+
+    counts = count_searches(timezone.now() - datetime.timedelta(days=days))
+    top = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [{'query': query, 'count': count} for query, count in top]
+
+
+def get_top_from_buckets(client, end_date, days, limit):
+    """Top searches from the day buckets, or ``None`` if there are none."""
+    window_key = get_window_key(end_date, days)
+    if not client.exists(window_key):
+        bucket_keys = [
+            get_bucket_key(end_date - datetime.timedelta(days=offset))
+            for offset in range(days)
+        ]
+        pipe = client.pipeline(transaction=False)
+        # Closed days keep their heavy hitters only
+        for key in bucket_keys[1:]:
+            pipe.zremrangebyrank(key, 0, -(MAX_TERMS_PER_BUCKET + 1))
+        pipe.zunionstore(window_key, bucket_keys)
+        pipe.expire(window_key, WINDOW_CACHE_TIMEOUT)
+        if not pipe.execute()[-2]:
+            return None
+
+    return [
+        {'query': term.decode(), 'count': int(score)}
+        for term, score in client.zrevrange(window_key, 0, limit - 1, withscores=True)
+    ]
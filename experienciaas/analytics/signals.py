@@ -0,0 +1,128 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+from experienciaas.events.models import Category
+from experienciaas.events.models import City
+from experienciaas.events.models import Event
+from experienciaas.events.models import Ticket
+from experienciaas.events.trending import TICKET_WEIGHT
+from experienciaas.events.trending import record_trending_activity
+from experienciaas.users.models import OrganizerProfile
+from experienciaas.users.models import User
+
+from .live import record_live_activity
+from .models import BotRule
+from .models import EventView
+from .models import EventViewRollup
+from .models import OrganizerStats
+from .models import OrganizerView
+from .models import SearchQuery
+from .models import TicketRegistration
+from .routers import get_analytics_db
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_status(sender, instance, **kwargs):
+    """Remember whether the ticket was confirmed before this save."""
+    instance._was_confirmed = bool(
+        instance.pk
+        and Ticket.objects.filter(pk=instance.pk, status='confirmed').exists()
+    )
+
+
+@receiver(post_save, sender=Ticket)
+def record_ticket_sale(sender, instance, **kwargs):
+    """Feed confirmations and cancellations to the live organizer dashboard."""
+    was_confirmed = getattr(instance, '_was_confirmed', False)
+    is_confirmed = instance.status == 'confirmed'
+    if was_confirmed == is_confirmed:
+        return
+
+    sign = 1 if is_confirmed else -1
+    organizer_id = instance.event.organizer_id
+    amount = instance.amount_paid
+    transaction.on_commit(
+        lambda: record_live_activity(organizer_id, tickets=sign, revenue=sign * amount)
+    )
+
+
+@receiver(post_save, sender=Ticket)
+def record_ticket_trending(sender, instance, **kwargs):
+    """Count new confirmations towards the event's trending score.
+
+    Cancellations aren't subtracted, the confirmation decays away instead.
+    """
+    if getattr(instance, '_was_confirmed', False) or instance.status != 'confirmed':
+        return
+
+    event_id = instance.event_id
+    transaction.on_commit(lambda: record_trending_activity(event_id, TICKET_WEIGHT))
+
+
+@receiver(post_delete, sender=Ticket)
+def record_ticket_removal(sender, instance, **kwargs):
+    if instance.status != 'confirmed':
+        return
+
+    organizer_id = instance.event.organizer_id
+    amount = instance.amount_paid
+    transaction.on_commit(
+        lambda: record_live_activity(organizer_id, tickets=-1, revenue=-amount)
+    )
+
+
+@receiver(post_save, sender=BotRule)
+@receiver(post_delete, sender=BotRule)
+def reload_bot_rules(sender, instance, **kwargs):
+    """Make running processes pick up changed bot rules."""
+    from .bots import reload_bot_rules as reload
+    transaction.on_commit(reload, using=get_analytics_db())
+
+
+# Analytics rows reference other apps without database constraints, so the
+# cascades of their foreign keys are applied here once the delete commits.
+
+@receiver(post_delete, sender=Event)
+def delete_event_analytics(sender, instance, **kwargs):
+    event_id = instance.pk
+
+    def delete():
+        for model in (EventView, EventViewRollup, TicketRegistration):
+            model.objects.filter(event_id=event_id).delete()
+
+    transaction.on_commit(delete)
+
+
+@receiver(post_delete, sender=OrganizerProfile)
+def delete_organizer_analytics(sender, instance, **kwargs):
+    organizer_id = instance.pk
+
+    def delete():
+        for model in (OrganizerView, OrganizerStats):
+            model.objects.filter(organizer_id=organizer_id).delete()
+
+    transaction.on_commit(delete)
+
+
+@receiver(post_delete, sender=User)
+def anonymize_user_analytics(sender, instance, **kwargs):
+    user_id = instance.pk
+
+    def anonymize():
+        for model in (EventView, OrganizerView, SearchQuery, TicketRegistration):
+            model.objects.filter(user_id=user_id).update(user=None)
+
+    transaction.on_commit(anonymize)
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=City)
+def clear_search_filter(sender, instance, **kwargs):
+    field = 'category' if sender is Category else 'city'
+    pk = instance.pk
+    transaction.on_commit(
+        lambda: SearchQuery.objects.filter(**{f'{field}_id': pk}).update(**{field: None})
+    )
@@ -0,0 +1,23 @@
+from celery import shared_task
+
+
+@shared_task(ignore_result=True)
+def publish_live_activity():
+    """Publish the pending live dashboard deltas."""
+    from .live import flush_live_activity
+    return flush_live_activity()
+
+
+@shared_task(ignore_result=True)
+def maintain_analytics_partitions():
+    """Create the coming monthly partitions and retire expired ones. Meant to run daily."""
+    from .partitions import ensure_partitions, expire_partitions
+    ensure_partitions()
+    expire_partitions()
+
+
+@shared_task(ignore_result=True, soft_time_limit=60 * 60, time_limit=60 * 65)
+def compact_analytics():
+    """Fold old raw views and searches into hourly rollups. Meant to run daily."""
+    from .rollups import compact_analytics as compact
+    return compact()
@@ -0,0 +1,124 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from experienciaas.analytics import dedupe
+from experienciaas.analytics import searches
+from experienciaas.analytics import uniques
+from experienciaas.analytics.utils import atrack_event_view
+
+
+class FakeRedis:
+    """Just enough Redis for the analytics helpers.
+
+    HyperLogLogs are exact sets, dumped as JSON by ``get``, and expirations
+    are only remembered in ``ttls``.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def pipeline(self, transaction=True):  # noqa: FBT002
+        return FakePipeline(self)
+
+    def get(self, key):
+        value = self.data.get(key)
+        if isinstance(value, set):
+            return json.dumps(sorted(value)).encode()
+        return value
+
+    def set(self, key, value, nx=False, ex=None):  # noqa: FBT002
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        self.ttls[key] = ex
+        return True
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+            self.ttls.pop(key, None)
+
+    def expire(self, key, timeout):
+        if key in self.data:
+            self.ttls[key] = timeout
+
+    def get_hll(self, key):
+        value = self.data.get(key, set())
+        # Sketches saved with get() and loaded back with set()
+        return set(json.loads(value)) if isinstance(value, bytes) else value
+
+    def pfadd(self, key, *values):
+        self.data[key] = self.get_hll(key) | set(values)
+
+    def pfcount(self, *keys):
+        return len(set().union(*(self.get_hll(key) for key in keys)))
+
+    def sadd(self, key, *values):
+        self.data.setdefault(key, set()).update(value.encode() for value in values)
+
+    def smembers(self, key):
+        return self.data.get(key, set())
+
+    def zincrby(self, key, amount, member):
+        bucket = self.data.setdefault(key, {})
+        bucket[member.encode()] = bucket.get(member.encode(), 0) + amount
+
+    def zunionstore(self, dest, keys):
+        union = {}
+        for key in keys:
+            for member, score in self.data.get(key, {}).items():
+                union[member] = union.get(member, 0) + score
+        self.data[dest] = union
+        return len(union)
+
+    def zrevrange(self, key, start, end, withscores=False):  # noqa: FBT002
+        items = sorted(self.data.get(key, {}).items(), key=lambda item: -item[1])
+        return items[start : end + 1]
+
+    def zremrangebyrank(self, key, start, end):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        calls, self.calls = self.calls, []
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in calls]
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    """A ``FakeRedis`` returned by ``get_redis`` to the analytics helpers."""
+    client = FakeRedis()
+    for module in (dedupe, searches, uniques):
+        monkeypatch.setattr(module, "get_redis", lambda: client)
+    return client
+
+
+@pytest.fixture
+def track_event_view():
+    """Track a view of ``event`` with a ``RequestFactory`` request.
+
+    ``request.user`` is what ``request.auser()`` returns, as it would be
+    once the authentication middleware ran.
+    """
+    def track(event, request):
+        async def auser():
+            return request.user
+
+        request.auser = auser
+        async_to_sync(atrack_event_view)(event, request)
+
+    return track
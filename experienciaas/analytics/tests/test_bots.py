@@ -0,0 +1,69 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory
+from django.utils import timezone
+
+from experienciaas.analytics import bots
+from experienciaas.analytics.bots import is_bot
+from experienciaas.analytics.models import BotRule
+from experienciaas.analytics.models import EventView
+from experienciaas.analytics.utils import generate_daily_stats
+from experienciaas.events.tests.factories import EventFactory
+
+pytestmark = pytest.mark.django_db
+
+BROWSER = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/126.0 Safari/537.36"
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_rules(monkeypatch):
+    cache.clear()
+    monkeypatch.setattr(bots, "_matcher", None)
+    monkeypatch.setattr(bots, "RULES_CHECK_INTERVAL", 0)
+
+
+@pytest.mark.parametrize(
+    ("user_agent", "expected"),
+    [
+        (BROWSER, False),
+        ("Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)", True),
+        ("facebookexternalhit/1.1", True),
+        ("UptimeRobot/2.0", True),
+        ("curl/8.4.0", True),
+        ("python-requests/2.32", True),
+        ("", True),
+    ],
+)
+def test_is_bot(user_agent, expected):
+    assert is_bot(user_agent) is expected
+
+
+def test_rules_reload_without_restart(django_capture_on_commit_callbacks):
+    agent = "AcmeChecker/1.0"
+    assert not is_bot(agent)
+
+    with django_capture_on_commit_callbacks(using="analytics", execute=True):
+        rule = BotRule.objects.create(pattern=r"acmechecker")
+    assert is_bot(agent)
+
+    with django_capture_on_commit_callbacks(using="analytics", execute=True):
+        rule.delete()
+    assert not is_bot(agent)
+
+
+def test_bot_views_are_dropped_and_counted(track_event_view):
+    event = EventFactory()
+    factory = RequestFactory()
+    for user_agent in [BROWSER, "Googlebot/2.1", "curl/8.4.0"]:
+        request = factory.get("/", HTTP_USER_AGENT=user_agent)
+        request.user = AnonymousUser()
+        track_event_view(event, request)
+
+    event.refresh_from_db()
+    assert event.views == 1
+    assert EventView.objects.count() == 1
+    assert generate_daily_stats(timezone.localdate()).bot_views == 2  # noqa: PLR2004
@@ -0,0 +1,56 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+
+from experienciaas.analytics import dedupe
+from experienciaas.analytics.dedupe import is_duplicate_view
+from experienciaas.analytics.models import EventView
+from experienciaas.events.tests.factories import EventFactory
+
+pytestmark = pytest.mark.django_db
+
+BROWSER = "Mozilla/5.0 (X11; Linux x86_64) Firefox/128.0"
+
+
+@pytest.fixture(autouse=True)
+def _fresh_local_views(monkeypatch):
+    monkeypatch.setattr(dedupe, "_local_seen", dedupe.OrderedDict())
+
+
+@pytest.fixture
+def view(track_event_view):
+    def view(event, user_agent=BROWSER, ip="10.0.0.1"):
+        request = RequestFactory().get("/", HTTP_USER_AGENT=user_agent, REMOTE_ADDR=ip)
+        request.user = AnonymousUser()
+        track_event_view(event, request)
+
+    return view
+
+
+def test_refreshes_are_recorded_once(view):
+    event = EventFactory()
+
+    for _ in range(5):
+        view(event)
+    view(event, ip="10.0.0.2")
+    view(event, user_agent=f"{BROWSER} Mobile")
+
+    event.refresh_from_db()
+    assert event.views == 3  # noqa: PLR2004
+    assert EventView.objects.filter(event=event).count() == 3  # noqa: PLR2004
+
+
+def test_views_are_claimed_in_redis(redis):
+    assert not is_duplicate_view("event", 1, "user:7", BROWSER)
+    assert is_duplicate_view("event", 1, "user:7", BROWSER)
+    assert not is_duplicate_view("event", 2, "user:7", BROWSER)
+    assert set(redis.ttls.values()) == {30 * 60}
+    # Nothing was remembered locally
+    assert not dedupe._local_seen  # noqa: SLF001
+
+
+def test_zero_window_disables_dedupe(settings):
+    settings.ANALYTICS_VIEW_DEDUPE_WINDOW = 0
+
+    assert not is_duplicate_view("event", 1, "10.0.0.1", BROWSER)
+    assert not is_duplicate_view("event", 1, "10.0.0.1", BROWSER)
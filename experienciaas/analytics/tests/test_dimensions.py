@@ -0,0 +1,90 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.test import RequestFactory
+
+from experienciaas.analytics.dimensions import get_user_agent_id
+from experienciaas.analytics.dimensions import parse_user_agent
+from experienciaas.analytics.dimensions import split_referrer
+from experienciaas.analytics.models import EventView
+from experienciaas.analytics.models import Referrer
+from experienciaas.analytics.models import UserAgent
+from experienciaas.analytics.utils import get_traffic_breakdowns
+from experienciaas.events.tests.factories import EventFactory
+
+pytestmark = pytest.mark.django_db
+
+IPHONE = (
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/17.5 Mobile/15E148 Safari/604.1"
+)
+EDGE = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/126.0 Safari/537.36 Edg/126.0"
+)
+
+
+@pytest.mark.parametrize(
+    ("user_agent", "expected"),
+    [
+        (IPHONE, {"device": "mobile", "browser": "Safari", "os": "iOS"}),
+        (EDGE, {"device": "desktop", "browser": "Edge", "os": "Windows"}),
+        (
+            "Mozilla/5.0 (Linux; Android 13; SM-X700) AppleWebKit/537.36 Chrome/126.0 Safari/537.36",
+            {"device": "tablet", "browser": "Chrome", "os": "Android"},
+        ),
+    ],
+)
+def test_parse_user_agent(user_agent, expected):
+    assert parse_user_agent(user_agent) == expected
+
+
+def test_split_referrer_drops_query_strings():
+    assert split_referrer("https://www.Google.com/search?q=rock") == ("google.com", "/search")
+    assert split_referrer("https://instagram.com") == ("instagram.com", "/")
+    assert split_referrer("not a url") is None
+
+
+def test_views_store_dimension_ids(track_event_view, django_assert_num_queries):
+    events = EventFactory.create_batch(2)
+    factory = RequestFactory()
+    for event, ip in zip(events, ["10.0.0.1", "10.0.0.2"], strict=True):
+        request = factory.get(
+            "/",
+            HTTP_USER_AGENT=IPHONE,
+            HTTP_REFERER=f"https://instagram.com/p/1?utm={ip}",
+            REMOTE_ADDR=ip,
+        )
+        request.user = AnonymousUser()
+        track_event_view(event, request)
+
+    views = EventView.objects.select_related("user_agent", "referrer")
+    assert {(view.user_agent.browser, view.referrer.domain) for view in views} == {
+        ("Safari", "instagram.com")
+    }
+    assert UserAgent.objects.count() == 1
+    assert Referrer.objects.count() == 1
+    # Known strings are resolved without queries
+    with django_assert_num_queries(0):
+        get_user_agent_id(IPHONE)
+
+    assert get_traffic_breakdowns() == {
+        "devices": [{"device": "mobile", "views": 2}],
+        "referrers": [{"domain": "instagram.com", "views": 2}],
+    }
+
+
+def test_backfill_moves_raw_strings_to_lookup_tables():
+    event = EventFactory()
+    EventView.objects.bulk_create([
+        EventView(event=event, ip_address="10.0.0.1", raw_user_agent=EDGE, raw_referrer="https://google.com/"),
+        EventView(event=event, ip_address="10.0.0.2", raw_user_agent=EDGE),
+        EventView(event=event, ip_address="10.0.0.3"),
+    ])
+
+    call_command("backfill_view_dimensions", batch_size=1)
+
+    assert not EventView.objects.exclude(raw_user_agent="").exists()
+    assert not EventView.objects.exclude(raw_referrer="").exists()
+    assert EventView.objects.filter(user_agent__browser="Edge").count() == 2  # noqa: PLR2004
+    assert EventView.objects.filter(referrer__domain="google.com").count() == 1
@@ -0,0 +1,99 @@
+import asyncio
+from decimal import Decimal
+from http import HTTPStatus
+
+import pytest
+from django.test import Client
+from django.urls import reverse
+
+from experienciaas.analytics import signals
+from experienciaas.analytics.live import live_hub
+from experienciaas.analytics.views import stream_live_activity
+from experienciaas.events.tests.factories import EventFactory
+from experienciaas.events.tests.factories import TicketFactory
+from experienciaas.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_ticket_confirmation_feeds_live_activity(
+    monkeypatch,
+    django_capture_on_commit_callbacks,
+):
+    recorded = []
+    monkeypatch.setattr(
+        signals,
+        "record_live_activity",
+        lambda organizer_id, **kwargs: recorded.append((organizer_id, kwargs)),
+    )
+    event = EventFactory()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ticket = TicketFactory(
+            event=event, status="pending", amount_paid=Decimal("25.00")
+        )
+    with django_capture_on_commit_callbacks(execute=True):
+        ticket.status = "confirmed"
+        ticket.save()
+    with django_capture_on_commit_callbacks(execute=True):
+        ticket.attendee_name = "Renamed"
+        ticket.save()
+    with django_capture_on_commit_callbacks(execute=True):
+        ticket.status = "cancelled"
+        ticket.save()
+
+    assert recorded == [
+        (event.organizer_id, {"tickets": 1, "revenue": Decimal("25.00")}),
+        (event.organizer_id, {"tickets": -1, "revenue": Decimal("-25.00")}),
+    ]
+
+
+def test_stream_sends_snapshot_then_summed_deltas():
+    snapshot = {"organizer": 7, "tickets_today": 3, "revenue_today": 30.0}
+
+    async def run():
+        stream = stream_live_activity(snapshot, keepalive=0.05)
+        messages = [await anext(stream), await anext(stream)]
+        messages.append(await anext(stream))
+        for views in (2, 3):
+            live_hub.dispatch(
+                {
+                    "organizers": [
+                        {
+                            "organizer": 7,
+                            "tickets": 1,
+                            "revenue": 10.0,
+                            "views": views,
+                            "timestamp": 1,
+                        },
+                        {
+                            "organizer": 8,
+                            "tickets": 5,
+                            "revenue": 0,
+                            "views": 0,
+                            "timestamp": 1,
+                        },
+                    ],
+                },
+            )
+        messages.append(await anext(stream))
+        await stream.aclose()
+        return messages
+
+    retry, snapshot_message, keepalive, delta = asyncio.run(run())
+    assert retry.startswith("retry:")
+    assert snapshot_message.startswith("event: snapshot\n")
+    assert keepalive == ": keepalive\n\n"
+    assert delta == (
+        'event: delta\ndata: {"organizer": 7, "tickets": 2, "revenue": 20.0, '
+        '"views": 5, "timestamp": 1}\n\n'
+    )
+    assert not live_hub.subscriptions
+
+
+def test_live_stream_requires_organizer(client: Client):
+    url = reverse("analytics:organizer_live")
+    assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+
+    client.force_login(UserFactory())
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,121 @@
+import datetime
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from experienciaas.analytics.models import EventView
+from experienciaas.analytics.models import SearchQuery
+from experienciaas.analytics.partitions import PARTITIONED_MODELS
+from experienciaas.analytics.partitions import add_months
+from experienciaas.analytics.partitions import create_partition
+from experienciaas.analytics.partitions import ensure_partitions
+from experienciaas.analytics.partitions import expire_partitions
+from experienciaas.analytics.partitions import get_detached_months
+from experienciaas.analytics.partitions import get_month_range
+from experienciaas.analytics.partitions import get_partition_months
+from experienciaas.analytics.partitions import is_partitioned
+from experienciaas.analytics.rollups import compact_analytics
+from experienciaas.analytics.rollups import count_searches
+from experienciaas.analytics.rollups import count_views
+from experienciaas.analytics.uniques import get_view_queryset
+from experienciaas.events.tests.factories import EventFactory
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(not is_partitioned(), reason="Partitions need PostgreSQL"),
+]
+
+TABLE = "analytics_eventview"
+
+
+def test_ensure_partitions_creates_coming_months():
+    today = datetime.date(2040, 11, 20)
+
+    created = ensure_partitions(months_ahead=2, today=today)
+
+    months = [datetime.date(2040, 11, 1), datetime.date(2040, 12, 1), datetime.date(2041, 1, 1)]
+    assert set(months) <= set(get_partition_months(TABLE))
+    assert f"{TABLE}_p204101" in created
+    assert ensure_partitions(months_ahead=2, today=today) == []
+
+
+def test_partitions_are_maintained_daily(settings):
+    tasks = [entry["task"] for entry in settings.CELERY_BEAT_SCHEDULE.values()]
+
+    assert "experienciaas.analytics.tasks.maintain_analytics_partitions" in tasks
+
+
+def create_view(event, timestamp):
+    view = EventView.objects.create(event=event, ip_address="10.0.0.1")
+    EventView.objects.filter(pk=view.pk).update(timestamp=timestamp)
+
+
+def create_month(month, views=3):
+    """Partitions of ``month`` with ``views`` views and a search."""
+    for model in PARTITIONED_MODELS:
+        create_partition(model._meta.db_table, month)
+    event = EventFactory()
+    for day in range(1, views + 1):
+        create_view(event, datetime.datetime(month.year, month.month, day, 12, tzinfo=datetime.UTC))
+    search = SearchQuery.objects.create(query="Rock", ip_address="10.0.0.1")
+    SearchQuery.objects.filter(pk=search.pk).update(
+        timestamp=datetime.datetime(month.year, month.month, 5, tzinfo=datetime.UTC)
+    )
+    return get_month_range(month)
+
+
+def count_rows(table):
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT count(*) FROM {connection.ops.quote_name(table)}")  # noqa: S608
+        return cursor.fetchone()[0]
+
+
+# Detaching and dropping partitions written in the same transaction fails on
+# their deferred constraint checks, so these tests commit
+@pytest.mark.django_db(transaction=True)
+def test_compaction_rolls_up_and_detaches_whole_months():
+    month = datetime.date(2001, 1, 1)
+    start, end = create_month(month)
+
+    views, searches = compact_analytics(days=(timezone.now() - end).days)
+
+    assert (views, searches) == (3, 1)
+    assert month not in get_partition_months(TABLE)
+    # Detached with its rows, counted from the rollups instead
+    assert count_rows(f"{TABLE}_p200101") == 3  # noqa: PLR2004
+    assert count_views(start=start, end=end) == 3  # noqa: PLR2004
+    assert count_searches(start) == {"rock": 1}
+    # Kept until the retention window drops it
+    assert f"{TABLE}_p200101" in expire_partitions(retention_months=12, drop=True)
+    assert month not in get_detached_months(TABLE)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_dropping_partitions_keeps_the_rollup_totals():
+    month = datetime.date(2001, 1, 1)
+    start, end = create_month(month)
+
+    call_command("manage_analytics_partitions", "--drop", stdout=StringIO())
+
+    for model in PARTITIONED_MODELS:
+        table = model._meta.db_table
+        assert month not in get_partition_months(table)
+        assert month not in get_detached_months(table)
+    assert count_views(start=start, end=end) == 3  # noqa: PLR2004
+    assert count_searches(start) == {"rock": 1}
+
+
+def test_day_queries_only_scan_their_month():
+    event = EventFactory()
+    EventView.objects.create(event=event, ip_address="10.0.0.1")
+    today = timezone.localdate()
+    current = datetime.date(today.year, today.month, 1)
+
+    plan = get_view_queryset("event", event.pk, today, today).explain()
+
+    assert f"{TABLE}_p{add_months(current, 1):%Y%m}" not in plan
+    assert f"{TABLE}_p{add_months(current, -1):%Y%m}" not in plan
+    assert f"{TABLE}_default" not in plan
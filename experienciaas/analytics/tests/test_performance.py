@@ -0,0 +1,132 @@
+import json
+import logging
+import re
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.template import engines
+from django.test import AsyncClient
+from django.test import Client
+from django.test import RequestFactory
+from django.test import override_settings
+from django.urls import reverse
+
+from experienciaas.analytics.performance import end_request
+from experienciaas.analytics.performance import start_request
+from experienciaas.analytics.utils import track_search_query
+from experienciaas.events.tests.factories import EventFactory
+from experienciaas.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+INSTRUMENTED_CACHES = {
+    "default": {"BACKEND": "experienciaas.analytics.performance.InstrumentedLocMemCache"},
+}
+
+
+def get_queries(server_timing):
+    return int(re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', server_timing).group(1))
+
+
+def get_template_time(server_timing):
+    return float(re.search(r"tpl;dur=([\d.]+)", server_timing).group(1))
+
+
+def test_staff_get_server_timing(client):
+    event = EventFactory()
+    client.force_login(UserFactory(is_staff=True))
+
+    response = client.get(event.get_absolute_url())
+
+    assert get_queries(response["Server-Timing"]) > 0
+    assert get_template_time(response["Server-Timing"]) > 0
+    assert "total;dur=" in response["Server-Timing"]
+
+
+def test_staff_get_server_timing_from_async_views():
+    event = EventFactory()
+    client = AsyncClient()
+    client.force_login(UserFactory(is_staff=True))
+
+    response = async_to_sync(client.get)(event.get_absolute_url())
+
+    assert get_queries(response["Server-Timing"]) > 0
+
+
+def test_other_visitors_get_no_server_timing(client):
+    event = EventFactory()
+
+    anonymous = client.get(event.get_absolute_url())
+    client.force_login(UserFactory())
+    user = client.get(event.get_absolute_url())
+
+    assert "Server-Timing" not in anonymous
+    assert "Cookie" not in anonymous["Vary"]
+    assert "Server-Timing" not in user
+
+
+@override_settings(CACHES=INSTRUMENTED_CACHES)
+def test_cache_lookups_are_counted():
+    metrics, token = start_request()
+    cache.get("missing")
+    cache.set("present", 1)
+    cache.get("present")
+    cache.get_many(["present", "missing"])
+    end_request(metrics, token)
+
+    assert metrics.cache_hits == 2  # noqa: PLR2004
+    assert metrics.cache_misses == 2  # noqa: PLR2004
+
+
+def test_tracking_is_measured():
+    request = RequestFactory().get("/")
+    request.user = type("Anonymous", (), {"is_authenticated": False})()
+
+    metrics, token = start_request()
+    track_search_query("concierto", 1, request=request)
+    end_request(metrics, token)
+
+    assert metrics.queries > 0
+    assert 0 < metrics.tracking_time <= metrics.total_time
+
+
+def test_nested_renders_are_measured_once():
+    template = engines["django"].from_string("{% for _ in items %}{{ render }}{% endfor %}")
+    inner = engines["django"].from_string("inner")
+    measured = []
+
+    def render():
+        inner.render()
+        measured.append(metrics.template_time)
+        return ""
+
+    metrics, token = start_request()
+    template.render({"items": range(3), "render": render})
+    end_request(metrics, token)
+
+    # Inner renders are part of the outer one
+    assert measured == [0, 0, 0]
+    assert 0 < metrics.template_time <= metrics.total_time
+
+
+@override_settings(PERFORMANCE_LOG_SAMPLE_RATE=1)
+def test_sampled_requests_are_logged(client, caplog):
+    with caplog.at_level(logging.INFO, logger="experienciaas.analytics.middleware"):
+        client.get(reverse("events:list"))
+
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["view"] == "events:list"
+    assert record["status"] == 200  # noqa: PLR2004
+    assert record["db_queries"] > 0
+    assert record["template_ms"] > 0
+
+
+@override_settings(PERFORMANCE_METRICS=False)
+def test_metrics_can_be_disabled():
+    client = Client()
+    client.force_login(UserFactory(is_staff=True))
+
+    response = client.get(reverse("events:list"))
+
+    assert "Server-Timing" not in response
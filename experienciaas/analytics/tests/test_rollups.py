@@ -0,0 +1,96 @@
+import datetime
+
+import pytest
+from django.utils import timezone
+
+from experienciaas.analytics.dimensions import get_referrer_id
+from experienciaas.analytics.dimensions import get_user_agent_id
+from experienciaas.analytics.models import EventView
+from experienciaas.analytics.models import EventViewRollup
+from experienciaas.analytics.models import SearchQuery
+from experienciaas.analytics.rollups import compact_analytics
+from experienciaas.analytics.rollups import get_cutoff
+from experienciaas.analytics.rollups import get_windows
+from experienciaas.analytics.searches import get_popular_searches
+from experienciaas.analytics.utils import get_organizer_analytics
+from experienciaas.analytics.utils import get_platform_analytics
+from experienciaas.events.tests.factories import EventFactory
+from experienciaas.users.models import OrganizerProfile
+from experienciaas.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+IPHONE = "Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) Safari/604.1"
+
+
+def summarize(analytics):
+    return {
+        "views": analytics.get("recent_event_views", analytics.get("new_views")),
+        "total_views": analytics.get("total_views"),
+        "traffic": analytics["traffic"],
+        "daily_views": analytics.get("daily_views"),
+        "top_events": [(event.pk, event.views_count) for event in analytics.get("top_events", [])],
+    }
+
+
+def test_compaction_keeps_analytics_identical():
+    profile = OrganizerProfile.objects.create(user=UserFactory())
+    events = EventFactory.create_batch(2, organizer=profile.user)
+    now = timezone.now()
+    for days_ago, event, user_agent, referrer in [
+        (200, events[0], IPHONE, "https://google.com/search?q=a"),
+        (150, events[0], IPHONE, "https://google.com/"),
+        (150, events[1], "", ""),
+        (130, events[1], IPHONE, ""),
+        (1, events[1], IPHONE, "https://instagram.com/p/1"),
+    ]:
+        view = EventView.objects.create(
+            event=event,
+            ip_address="10.0.0.1",
+            user_agent_id=get_user_agent_id(user_agent),
+            referrer_id=get_referrer_id(referrer),
+        )
+        EventView.objects.filter(pk=view.pk).update(
+            timestamp=now - datetime.timedelta(days=days_ago, hours=1)
+        )
+    # Compacted by whole months when partitioned, so 130 days is past the
+    # start of the cutoff's month
+    for query, days_ago in [("rock", 130), ("rock", 2), ("jazz", 130)]:
+        search = SearchQuery.objects.create(query=query, ip_address="10.0.0.1")
+        SearchQuery.objects.filter(pk=search.pk).update(
+            timestamp=now - datetime.timedelta(days=days_ago)
+        )
+
+    def snapshot():
+        return (
+            summarize(get_organizer_analytics(profile, days=365)),
+            summarize(get_platform_analytics(days=365)),
+            get_popular_searches(days=365),
+        )
+
+    before = snapshot()
+    deleted_views, deleted_searches = compact_analytics(days=90)
+
+    assert (deleted_views, deleted_searches) == (4, 2)
+    assert EventView.objects.count() == 1
+    assert EventViewRollup.objects.count() == 4  # noqa: PLR2004
+    assert snapshot() == before
+    assert before[2] == [{"query": "rock", "count": 2}, {"query": "jazz", "count": 1}]
+    # Nothing left to compact
+    assert compact_analytics(days=90) == (0, 0)
+
+
+def test_only_hours_with_rows_are_compacted(settings):
+    event = EventFactory()
+    now = timezone.now()
+    for days_ago in (200, 200, 100):
+        view = EventView.objects.create(event=event, ip_address="10.0.0.1")
+        EventView.objects.filter(pk=view.pk).update(timestamp=now - datetime.timedelta(days=days_ago))
+
+    windows = list(get_windows(EventView.objects.all(), get_cutoff(90)))
+
+    assert [end - start for start, end in windows] == [datetime.timedelta(hours=1)] * 2
+    assert windows[0][0] <= now - datetime.timedelta(days=200) < windows[0][1]
+    assert "experienciaas.analytics.tasks.compact_analytics" in [
+        entry["task"] for entry in settings.CELERY_BEAT_SCHEDULE.values()
+    ]
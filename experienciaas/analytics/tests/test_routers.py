@@ -0,0 +1,56 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import router
+from django.db import transaction
+from django.test import RequestFactory
+
+from experienciaas.analytics.models import EventView
+from experienciaas.events.models import Event
+from experienciaas.events.tests.factories import EventFactory
+
+pytestmark = pytest.mark.django_db
+
+BROWSER = "Mozilla/5.0 (X11; Linux x86_64) Firefox/128.0"
+
+
+@pytest.fixture
+def view(track_event_view):
+    def view(event):
+        request = RequestFactory().get("/", HTTP_USER_AGENT=BROWSER, REMOTE_ADDR="10.0.0.1")
+        request.user = AnonymousUser()
+        track_event_view(event, request)
+
+    return view
+
+
+def test_analytics_models_use_their_alias(view):
+    event = EventFactory()
+    view(event)
+    event_view = EventView.objects.get()
+
+    assert router.db_for_write(EventView) == "analytics"
+    assert router.db_for_read(Event) == "default"
+    assert event_view._state.db == "analytics"
+    # The event is fetched from the default database
+    assert event_view.event == event
+
+
+def test_views_are_kept_when_the_request_rolls_back(view):
+    event = EventFactory()
+
+    with pytest.raises(RuntimeError), transaction.atomic():
+        view(event)
+        raise RuntimeError
+
+    assert EventView.objects.filter(event_id=event.pk).count() == 1
+
+
+def test_deleting_an_event_deletes_its_analytics(view, django_capture_on_commit_callbacks):
+    event, other = EventFactory.create_batch(2)
+    view(event)
+    view(other)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        event.delete()
+
+    assert list(EventView.objects.values_list("event_id", flat=True)) == [other.pk]
@@ -0,0 +1,51 @@
+import datetime
+
+import pytest
+from django.test import RequestFactory
+from django.utils import timezone
+
+from experienciaas.analytics import searches
+from experienciaas.analytics.models import SearchQuery
+from experienciaas.analytics.searches import get_popular_searches
+from experienciaas.analytics.searches import normalize_search_query
+from experienciaas.analytics.utils import track_search_query
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("Concierto", "concierto"),
+        ("  concierto  ", "concierto"),
+        ("conciertó", "concierto"),
+        ("¡Rock   en el PARQUE!", "rock en el parque"),
+        ("Año Nuevo", "año nuevo"),
+    ],
+)
+def test_normalize_search_query(query, expected):
+    assert normalize_search_query(query) == expected
+
+
+def test_popular_searches_are_counted_by_normalized_query():
+    request = RequestFactory().get("/")
+    request.user = type("Anonymous", (), {"is_authenticated": False})()
+    for query in ["Concierto", "concierto ", "conciertó", "teatro"]:
+        track_search_query(query, 1, request=request)
+
+    assert get_popular_searches(days=7, limit=1) == [
+        {"query": "concierto", "count": 3}
+    ]
+    assert SearchQuery.objects.filter(normalized_query="concierto").count() == 3  # noqa: PLR2004
+
+
+@pytest.mark.usefixtures("redis")
+def test_popular_searches_merge_day_buckets():
+    today = timezone.localdate()
+    for days_ago, query in [(0, "jazz"), (1, "jazz"), (1, "rock"), (10, "salsa")]:
+        searches.record_search(query, today - datetime.timedelta(days=days_ago))
+
+    assert get_popular_searches(days=7, limit=5) == [
+        {"query": "jazz", "count": 2},
+        {"query": "rock", "count": 1},
+    ]
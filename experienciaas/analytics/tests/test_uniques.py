@@ -0,0 +1,72 @@
+import datetime
+
+import pytest
+from django.utils import timezone
+
+from experienciaas.analytics.models import EventView
+from experienciaas.analytics.models import VisitorSketch
+from experienciaas.analytics.uniques import EVENT
+from experienciaas.analytics.uniques import ORGANIZER
+from experienciaas.analytics.uniques import SITE
+from experienciaas.analytics.uniques import checkpoint_visitor_sketches
+from experienciaas.analytics.uniques import count_unique_visitors
+from experienciaas.analytics.uniques import record_unique_visitor
+from experienciaas.analytics.utils import generate_daily_stats
+from experienciaas.events.tests.factories import EventFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_counts_fall_back_to_views_without_redis():
+    event = EventFactory()
+    today = timezone.localdate()
+    for ip in ["10.0.0.1", "10.0.0.1", "10.0.0.2"]:
+        EventView.objects.create(event=event, ip_address=ip)
+    EventView.objects.create(event=EventFactory(), ip_address="10.0.0.3")
+
+    assert count_unique_visitors(EVENT, event.pk, today, today) == 2  # noqa: PLR2004
+    assert count_unique_visitors(SITE, 0, today, today) == 3  # noqa: PLR2004
+
+
+def test_counts_merge_redis_and_saved_sketches(redis):
+    today = timezone.localdate()
+    last_week = today - datetime.timedelta(days=7)
+    record_unique_visitor(1, 10, "10.0.0.1", last_week)
+    record_unique_visitor(2, 10, "10.0.0.2", last_week)
+    assert checkpoint_visitor_sketches(last_week) == 4  # noqa: PLR2004
+    # Expired from Redis, only the saved sketches remain
+    redis.data.clear()
+    record_unique_visitor(1, 10, "10.0.0.1", today)
+    record_unique_visitor(1, 10, "10.0.0.3", today)
+
+    assert count_unique_visitors(ORGANIZER, 10, last_week, today) == 3  # noqa: PLR2004
+    assert count_unique_visitors(EVENT, 1, last_week, today) == 2  # noqa: PLR2004
+    assert count_unique_visitors(EVENT, 2, today, today) == 0
+    # Temporary keys are cleaned up
+    assert not [key for key in redis.data if key.startswith("hll:tmp:")]
+
+
+def test_days_without_sketches_count_their_views(redis):
+    event = EventFactory()
+    today = timezone.localdate()
+    yesterday = today - datetime.timedelta(days=1)
+    record_unique_visitor(event.pk, event.organizer_id, "10.0.0.1", today)
+    # Recorded while Redis was down, no sketch of the day
+    for ip in ["10.0.0.1", "10.0.0.2", "10.0.0.2"]:
+        view = EventView.objects.create(event=event, ip_address=ip)
+        EventView.objects.filter(pk=view.pk).update(timestamp=view.timestamp - datetime.timedelta(days=1))
+
+    assert count_unique_visitors(EVENT, event.pk, yesterday, today) == 2  # noqa: PLR2004
+    assert count_unique_visitors(SITE, 0, yesterday, today) == 2  # noqa: PLR2004
+    assert not [key for key in redis.data if key.startswith("hll:tmp:")]
+
+
+def test_daily_stats_save_sketches(redis):
+    today = timezone.localdate()
+    record_unique_visitor(1, 10, "10.0.0.1", today)
+    record_unique_visitor(1, 10, "10.0.0.2", today)
+
+    stats = generate_daily_stats(today)
+
+    assert stats.unique_visitors == 2  # noqa: PLR2004
+    assert VisitorSketch.objects.filter(date=today, scope=SITE).exists()
@@ -0,0 +1,200 @@
+"""Unique visitor counts with HyperLogLog sketches.
+
+Every event view adds the visitor to three Redis HyperLogLogs of the day: the
+whole site, the event and its organizer (PFADD). A sketch takes at most 12 KB
+whatever the traffic and counts with ~0.8% standard error. Sketches of
+several days are merged by PFCOUNT itself, so weekly or monthly uniques never
+rescan ``EventView``.
+
+Sketches live in Redis for ``REDIS_RETENTION_DAYS``. ``checkpoint_visitor_sketches``
+saves each day's sketches to ``VisitorSketch`` (run by ``generate_daily_stats``),
+and older days are loaded back into temporary keys when counted. Days no
+sketch was recorded for, e.g. while Redis was down, have the distinct IPs of
+their views added to a temporary sketch. Without Redis, or without any
+sketch of the period, counts come from the views.
+"""
+import datetime
+import uuid
+
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from redis.exceptions import RedisError
+
+from experienciaas.utils.redis import get_redis
+from experienciaas.utils.redis import mark_unavailable
+
+from .models import EventView, VisitorSketch
+from .routers import get_organizer_event_ids
+
+SITE = 'site'
+EVENT = 'event'
+ORGANIZER = 'organizer'
+
+REDIS_RETENTION_DAYS = 40
+# Temporary keys of sketches loaded from the database.
+TEMPORARY_KEY_TIMEOUT = 60
+# Visitors added per PFADD to the sketch of days without one
+PFADD_BATCH_SIZE = 1000
+
+
+def get_sketch_key(scope, object_id, date):
+    return f"hll:visitors:{scope}:{object_id}:{date:%Y%m%d}"
+
+
+def get_day_index_key(date):
+    # Event and organizer sketches written on a day, for checkpoints
+    return f"hll:visitors:{date:%Y%m%d}:keys"
+
+
+def record_unique_visitor(event_id, organizer_id, visitor, date=None):
+    """Add a visitor of an event to the day's site, event and organizer sketches."""
+    client = get_redis()
+    if client is None or not visitor:
+        return
+    if date is None:
+        date = timezone.localdate()
+
+    timeout = REDIS_RETENTION_DAYS * 24 * 60 * 60
+    try:
+        pipe = client.pipeline(transaction=False)
+        for scope, object_id in ((SITE, 0), (EVENT, event_id), (ORGANIZER, organizer_id)):
+            key = get_sketch_key(scope, object_id, date)
+            pipe.pfadd(key, visitor)
+            pipe.expire(key, timeout)
+        pipe.sadd(get_day_index_key(date), f"{EVENT}:{event_id}", f"{ORGANIZER}:{organizer_id}")
+        pipe.expire(get_day_index_key(date), timeout)
+        pipe.execute()
+    except RedisError as exc:
+        mark_unavailable(exc)
+
+
+def checkpoint_visitor_sketches(date):
+    """Save the sketches of a day to the database. Returns the number saved."""
+    client = get_redis()
+    if client is None:
+        return 0
+
+    try:
+        members = [(SITE, 0)] + [
+            (scope, int(object_id))
+            for scope, object_id in (
+                member.decode().split(':') for member in client.smembers(get_day_index_key(date))
+            )
+        ]
+        pipe = client.pipeline(transaction=False)
+        for scope, object_id in members:
+            pipe.get(get_sketch_key(scope, object_id, date))
+        sketches = pipe.execute()
+    except RedisError as exc:
+        mark_unavailable(exc)
+        return 0
+
+    rows = [
+        VisitorSketch(scope=scope, object_id=object_id, date=date, sketch=sketch)
+        for (scope, object_id), sketch in zip(members, sketches, strict=True)
+        if sketch is not None
+    ]
+    VisitorSketch.objects.bulk_create(
+        rows,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['scope', 'object_id', 'date'],
+        update_fields=['sketch']
+    )
+    return len(rows)
+
+
+def get_day_start(date):
+    return timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+
+
+def get_view_queryset(scope, object_id, start_date, end_date):
+    # A timestamp range, unlike __date, lets PostgreSQL skip partitions
+    views = EventView.objects.filter(
+        timestamp__gte=get_day_start(start_date),
+        timestamp__lt=get_day_start(end_date + datetime.timedelta(days=1))
+    )
+    if scope == EVENT:
+        views = views.filter(event_id=object_id)
+    elif scope == ORGANIZER:
+        views = views.filter(event_id__in=get_organizer_event_ids(object_id))
+    return views
+
+
+def count_unique_visitors(scope, object_id, start_date, end_date):
+    """Estimate the unique visitors between two dates, both included."""
+    days = [
+        start_date + datetime.timedelta(days=offset)
+        for offset in range((end_date - start_date).days + 1)
+    ]
+    client = get_redis()
+    if client is not None:
+        try:
+            count = count_from_sketches(client, scope, object_id, days)
+        except RedisError as exc:
+            mark_unavailable(exc)
+        else:
+            if count is not None:
+                return count
+
+    return get_view_queryset(scope, object_id, start_date, end_date).values(
+        'ip_address'
+    ).distinct().count()
+
+
+def get_day_visitors(scope, object_id, days):
+    """Distinct IPs of the views of ``days``."""
+    return get_view_queryset(scope, object_id, min(days), max(days)).annotate(
+        day=TruncDate('timestamp')
+    ).filter(day__in=days).values_list('ip_address', flat=True).distinct().iterator()
+
+
+def count_from_sketches(client, scope, object_id, days):
+    """PFCOUNT the union of the days' sketches, or ``None`` if there are none.
+
+    Days without a sketch count the distinct IPs of their views, added to a
+    temporary sketch.
+    """
+    keys = [get_sketch_key(scope, object_id, day) for day in days]
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        pipe.exists(key)
+    in_redis = pipe.execute()
+
+    missing_days = [day for day, exists in zip(days, in_redis, strict=True) if not exists]
+    saved = dict(VisitorSketch.objects.filter(
+        scope=scope,
+        object_id=object_id,
+        date__in=missing_days
+    ).values_list('date', 'sketch')) if missing_days else {}
+
+    sources = [key for key, exists in zip(keys, in_redis, strict=True) if exists]
+    if not sources and not saved:
+        return None
+
+    temporary_keys = []
+    pipe = client.pipeline(transaction=False)
+    prefix = uuid.uuid4().hex
+    for position, sketch in enumerate(saved.values()):
+        key = f"hll:tmp:{prefix}:{position}"
+        pipe.set(key, bytes(sketch), ex=TEMPORARY_KEY_TIMEOUT)
+        temporary_keys.append(key)
+
+    unsketched_days = [day for day in missing_days if day not in saved]
+    if unsketched_days:
+        key = f"hll:tmp:{prefix}:views"
+        batch = []
+        for ip_address in get_day_visitors(scope, object_id, unsketched_days):
+            batch.append(ip_address)
+            if len(batch) == PFADD_BATCH_SIZE:
+                pipe.pfadd(key, *batch)
+                batch = []
+        if batch:
+            pipe.pfadd(key, *batch)
+        pipe.expire(key, TEMPORARY_KEY_TIMEOUT)
+        temporary_keys.append(key)
+
+    pipe.pfcount(*sources, *temporary_keys)
+    if temporary_keys:
+        pipe.delete(*temporary_keys)
+    return pipe.execute()[-2 if temporary_keys else -1]
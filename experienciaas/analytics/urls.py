@@ -16,6 +16,11 @@ urlpatterns = [
         views.organizer_analytics_api,
         name="organizer_api"
     ),
+    path(
+        "organizer/live/",
+        views.organizer_live_stream,
+        name="organizer_live"
+    ),
     
     # Platform analytics (admin only)
     path(
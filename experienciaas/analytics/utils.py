@@ -1,60 +1,135 @@
 import datetime
-from django.db.models import Count, Sum, Avg, Q
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Sum, Avg, F, Q
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
+from .bots import EVENT as BOT_EVENT_VIEW
+from .bots import ORGANIZER as BOT_ORGANIZER_VIEW
+from .bots import get_filtered_views
+from .bots import is_bot
+from .bots import record_filtered_view
+from .dedupe import is_duplicate_view
+from .dimensions import get_referrer_id
+from .dimensions import get_user_agent_id
+from .live import record_live_activity
+from .performance import timed
+from .rollups import count_views
+from .searches import get_popular_searches
+from .searches import record_search
+from .uniques import ORGANIZER
+from .uniques import SITE
+from .uniques import checkpoint_visitor_sketches
+from .uniques import count_unique_visitors
+from .uniques import record_unique_visitor
 from .models import (
     EventView, OrganizerView, SearchQuery, TicketRegistration,
     DailyStats, OrganizerStats
 )
 from experienciaas.events.models import Event, Ticket
+from experienciaas.events.trending import VIEW_WEIGHT as TRENDING_VIEW_WEIGHT
+from experienciaas.events.trending import record_trending_activity
 from experienciaas.users.models import OrganizerProfile
 
 User = get_user_model()
 
 
-def track_event_view(event, request):
-    """Track an event page view."""
-    user = request.user if request.user.is_authenticated else None
-    ip_address = get_client_ip(request)
+def get_view_fields(kind, object_id, request, user, referrer=None):
+    """Fields of a page view to record, ``None`` if it must be skipped.
+
+    Views from bots are only counted, and refreshes within the dedupe window
+    are skipped. ``referrer`` defaults to the request's one.
+    """
     user_agent = request.META.get('HTTP_USER_AGENT', '')
-    referrer = request.META.get('HTTP_REFERER', '')
-    
-    EventView.objects.create(
-        event=event,
-        user=user,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        referrer=referrer
-    )
-    
-    # Update event view count
-    event.views += 1
-    event.save(update_fields=['views'])
+    if is_bot(user_agent):
+        record_filtered_view(kind)
+        return None
+
+    ip_address = get_client_ip(request)
+    visitor = f"user:{user.pk}" if user else ip_address
+    if is_duplicate_view(kind, object_id, visitor, user_agent):
+        return None
+    if referrer is None:
+        referrer = request.META.get('HTTP_REFERER', '')
+    return {
+        'user': user,
+        'ip_address': ip_address,
+        'user_agent_id': get_user_agent_id(user_agent),
+        'referrer_id': get_referrer_id(referrer),
+    }
 
 
+def record_event_view_activity(event, ip_address):
+    """Update the Redis counters fed by an event view."""
+    record_live_activity(event.organizer_id, views=1)
+    record_unique_visitor(event.pk, event.organizer_id, ip_address)
+    record_trending_activity(event.pk, TRENDING_VIEW_WEIGHT)
+
+
+@timed
+async def atrack_event_view(event, request, referrer=None):
+    """Track an event page view, sent by the view beacon.
+
+    Views from bots are only counted, and refreshes within the dedupe window
+    are skipped. ``referrer`` defaults to the request's one.
+    """
+    user = await request.auser()
+    user = user if user.is_authenticated else None
+    # Bot rules, dedupe keys and dimension ids are cached in Redis
+    fields = await sync_to_async(get_view_fields)(BOT_EVENT_VIEW, event.pk, request, user, referrer)
+    if fields is None:
+        return
+
+    await EventView.objects.acreate(event=event, **fields)
+    # Beacons of a popular page arrive concurrently
+    await Event.objects.filter(pk=event.pk).aupdate(views=F('views') + 1)
+
+    await sync_to_async(record_event_view_activity)(event, fields['ip_address'])
+
+
+@timed
 def track_organizer_view(organizer, request):
-    """Track an organizer profile view."""
+    """Track an organizer profile view.
+
+    Views from bots are only counted, and refreshes within the dedupe window
+    are skipped.
+    """
     user = request.user if request.user.is_authenticated else None
-    ip_address = get_client_ip(request)
-    user_agent = request.META.get('HTTP_USER_AGENT', '')
-    referrer = request.META.get('HTTP_REFERER', '')
-    
-    OrganizerView.objects.create(
-        organizer=organizer,
-        user=user,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        referrer=referrer
-    )
+    fields = get_view_fields(BOT_ORGANIZER_VIEW, organizer.pk, request, user)
+    if fields is None:
+        return
+
+    OrganizerView.objects.create(organizer=organizer, **fields)
 
 
+@timed
 def track_search_query(query, results_count, category=None, city=None, request=None):
     """Track a search query."""
     user = request.user if request and request.user.is_authenticated else None
     ip_address = get_client_ip(request) if request else '127.0.0.1'
     
-    SearchQuery.objects.create(
+    search = SearchQuery.objects.create(
+        query=query,
+        user=user,
+        ip_address=ip_address,
+        results_count=results_count,
+        category=category,
+        city=city
+    )
+    record_search(search.normalized_query)
+
+
+@timed
+async def atrack_search_query(query, results_count, category=None, city=None, request=None):
+    """Async ``track_search_query``, for async views."""
+    user = None
+    if request:
+        user = await request.auser()
+        user = user if user.is_authenticated else None
+    ip_address = get_client_ip(request) if request else '127.0.0.1'
+
+    search = await SearchQuery.objects.acreate(
         query=query,
         user=user,
         ip_address=ip_address,
@@ -62,8 +137,10 @@ def track_search_query(query, results_count, category=None, city=None, request=N
         category=category,
         city=city
     )
+    await sync_to_async(record_search)(search.normalized_query)
 
 
+@timed
 def track_ticket_registration(event, step, request, session_id=None):
     """Track ticket registration funnel."""
     user = request.user if request.user.is_authenticated else None
@@ -91,6 +168,28 @@ def get_client_ip(request):
     return ip
 
 
+def get_traffic_breakdowns(start=None, organizer=None, limit=5):
+    """Views by device and by referring domain, including compacted views.
+
+    Raw views group by the small dimension foreign keys, joining tables of
+    distinct values only.
+    """
+    devices = count_views('device', start=start, organizer=organizer)
+    referrers = count_views('referrer', start=start, organizer=organizer)
+    return {
+        'devices': [
+            {'device': device, 'views': views} for device, views in most_common(devices)
+        ],
+        'referrers': [
+            {'domain': domain, 'views': views} for domain, views in most_common(referrers)[:limit]
+        ],
+    }
+
+
+def most_common(counts):
+    return sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+
+
 def get_organizer_analytics(organizer, days=30):
     """Get comprehensive analytics for an organizer."""
     end_date = timezone.now()
@@ -105,10 +204,11 @@ def get_organizer_analytics(organizer, days=30):
     ).count()
     
     # Recent event views
-    recent_event_views = EventView.objects.filter(
-        event__organizer=organizer.user,
-        timestamp__gte=start_date
-    ).count()
+    recent_event_views = count_views(start=start_date, organizer=organizer.user)
+    traffic = get_traffic_breakdowns(start=start_date, organizer=organizer.user)
+    unique_visitors = count_unique_visitors(
+        ORGANIZER, organizer.user_id, timezone.localdate(start_date), timezone.localdate(end_date)
+    )
     
     # Profile views
     profile_views = OrganizerView.objects.filter(
@@ -139,28 +239,30 @@ def get_organizer_analytics(organizer, days=30):
     )['total_revenue'] or 0
     
     # Top performing events
-    top_events = organizer.user.organized_events.filter(
-        status='published'
-    ).annotate(
-        views_count=Count('event_views'),
-        tickets_count=Count('tickets', filter=Q(tickets__status='confirmed'))
-    ).order_by('-views_count')[:5]
+    published = organizer.user.organized_events.filter(status='published')
+    event_views = count_views('event', organizer=organizer.user)
+    top_events = sorted(
+        published.annotate(
+            tickets_count=Count('tickets', filter=Q(tickets__status='confirmed'))
+        ),
+        key=lambda event: -event_views[event.pk]
+    )[:5]
+    for event in top_events:
+        event.views_count = event_views[event.pk]
     
     # Engagement by day
-    daily_views = EventView.objects.filter(
-        event__organizer=organizer.user,
-        timestamp__gte=start_date
-    ).extra(
-        select={'day': 'date(timestamp)'}
-    ).values('day').annotate(
-        views=Count('id')
-    ).order_by('day')
+    daily_views = [
+        {'day': day, 'views': views}
+        for day, views in sorted(count_views('day', start=start_date, organizer=organizer.user).items())
+    ]
     
     return {
         'total_events': total_events,
         'published_events': published_events,
         'upcoming_events': upcoming_events,
         'recent_event_views': recent_event_views,
+        'unique_visitors': unique_visitors,
+        'traffic': traffic,
         'profile_views': profile_views,
         'total_followers': total_followers,
         'new_followers': new_followers,
@@ -209,15 +311,15 @@ def get_platform_analytics(days=30):
     )['total'] or 0
     
     # Views
-    total_views = EventView.objects.count()
-    new_views = EventView.objects.filter(timestamp__gte=start_date).count()
+    total_views = count_views()
+    new_views = count_views(start=start_date)
+    traffic = get_traffic_breakdowns(start=start_date)
+    unique_visitors = count_unique_visitors(
+        SITE, 0, timezone.localdate(start_date), timezone.localdate(end_date)
+    )
     
     # Popular searches
-    popular_searches = SearchQuery.objects.filter(
-        timestamp__gte=start_date
-    ).values('query').annotate(
-        count=Count('id')
-    ).order_by('-count')[:10]
+    popular_searches = get_popular_searches(days=days, limit=10)
     
     return {
         'total_events': total_events,
@@ -235,6 +337,8 @@ def get_platform_analytics(days=30):
         'new_revenue': new_revenue,
         'total_views': total_views,
         'new_views': new_views,
+        'unique_visitors': unique_visitors,
+        'traffic': traffic,
         'popular_searches': popular_searches,
         'period_days': days
     }
@@ -287,10 +391,10 @@ def generate_daily_stats(date=None):
     ).aggregate(total=Sum('amount_paid'))['total'] or 0
     
     # Traffic stats
-    total_views = EventView.objects.filter(timestamp__date__lte=date).count()
-    unique_visitors = EventView.objects.filter(
-        timestamp__range=(start_of_day, end_of_day)
-    ).values('ip_address').distinct().count()
+    total_views = count_views(end=start_of_day + datetime.timedelta(days=1))
+    checkpoint_visitor_sketches(date)
+    unique_visitors = count_unique_visitors(SITE, 0, date, date)
+    bot_views = sum(get_filtered_views(date).values())
     
     # Update or create daily stats
     daily_stats, created = DailyStats.objects.update_or_create(
@@ -309,6 +413,7 @@ def generate_daily_stats(date=None):
             'new_revenue': new_revenue,
             'total_views': total_views,
             'unique_visitors': unique_visitors,
+            'bot_views': bot_views,
         }
     )
     
@@ -1,18 +1,25 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.admin.views.decorators import staff_member_required
+from django.db import transaction
 from django.shortcuts import render, get_object_or_404
 from django.views.generic import TemplateView
 from django.utils.decorators import method_decorator
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from asgiref.sync import sync_to_async
+import asyncio
 import datetime
+import json
 
+from .live import LiveSubscription, get_live_snapshot, live_hub
 from .utils import get_organizer_analytics, get_platform_analytics
 from .models import DailyStats, OrganizerStats
 from experienciaas.users.models import OrganizerProfile
+from experienciaas.utils.replicas import ReplicaReadMixin
+from experienciaas.utils.replicas import replica_reads
 
 
-class OrganizerAnalyticsView(LoginRequiredMixin, TemplateView):
+class OrganizerAnalyticsView(ReplicaReadMixin, LoginRequiredMixin, TemplateView):
     """Analytics dashboard for organizers."""
     template_name = 'analytics/organizer_dashboard.html'
     
@@ -41,7 +48,7 @@ class OrganizerAnalyticsView(LoginRequiredMixin, TemplateView):
 
 
 @method_decorator(staff_member_required, name='dispatch')
-class PlatformAnalyticsView(TemplateView):
+class PlatformAnalyticsView(ReplicaReadMixin, TemplateView):
     """Platform analytics dashboard for admin users."""
     template_name = 'analytics/platform_dashboard.html'
     
@@ -66,6 +73,7 @@ class PlatformAnalyticsView(TemplateView):
         return context
 
 
+@replica_reads
 def organizer_analytics_api(request):
     """API endpoint for organizer analytics data."""
     if not request.user.is_authenticated or not request.user.is_staff:
@@ -110,6 +118,7 @@ def organizer_analytics_api(request):
     })
 
 
+@replica_reads
 @staff_member_required
 def platform_analytics_api(request):
     """API endpoint for platform analytics data."""
@@ -160,5 +169,54 @@ def platform_analytics_api(request):
     })
 
 
+# Comment lines sent when idle so proxies don't close the stream.
+LIVE_KEEPALIVE_INTERVAL = 15
+
+
+def format_server_sent_event(data, event=None):
+    message = f"data: {json.dumps(data)}\n\n"
+    if event:
+        message = f"event: {event}\n{message}"
+    return message
+
+
+async def stream_live_activity(snapshot, keepalive=LIVE_KEEPALIVE_INTERVAL):
+    """Yield the snapshot, then every live delta of the organizer, as SSE messages."""
+    subscription = LiveSubscription()
+    live_hub.subscribe(subscription, [snapshot['organizer']])
+    try:
+        yield "retry: 5000\n\n"
+        yield format_server_sent_event(snapshot, event='snapshot')
+        while True:
+            try:
+                delta = await asyncio.wait_for(subscription.get(), timeout=keepalive)
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_server_sent_event(delta, event='delta')
+    finally:
+        live_hub.unsubscribe(subscription)
+
+
+@transaction.non_atomic_requests
+async def organizer_live_stream(request):
+    """Server-Sent Events stream of the organizer's sales and views."""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'error': 'Unauthorized'}, status=401)
+    if not await OrganizerProfile.objects.filter(user=user).aexists():
+        raise Http404
+
+    snapshot = await sync_to_async(get_live_snapshot)(user)
+    response = StreamingHttpResponse(
+        stream_live_activity(snapshot),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Disable response buffering in nginx
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 organizer_analytics_view = OrganizerAnalyticsView.as_view()
 platform_analytics_view = PlatformAnalyticsView.as_view()
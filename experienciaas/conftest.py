@@ -1,9 +1,31 @@
 import pytest
 
+from experienciaas.analytics.dimensions import clear_caches
 from experienciaas.users.models import User
 from experienciaas.users.tests.factories import UserFactory
 
 
+def pytest_collection_modifyitems(items):
+    # Analytics rows go through their own database alias (see
+    # experienciaas.analytics.routers), which database tests need access to
+    for item in items:
+        marker = item.get_closest_marker("django_db")
+        if marker is not None:
+            if "databases" not in marker.kwargs:
+                item.add_marker(
+                    pytest.mark.django_db(*marker.args, **marker.kwargs, databases="__all__"),
+                    append=False,
+                )
+        elif {"db", "transactional_db"} & set(item.fixturenames):
+            item.add_marker(
+                pytest.mark.django_db(
+                    transaction="transactional_db" in item.fixturenames,
+                    databases="__all__",
+                ),
+                append=False,
+            )
+
+
 @pytest.fixture(autouse=True)
 def _media_storage(settings, tmpdir) -> None:
     settings.MEDIA_ROOT = tmpdir.strpath
@@ -12,3 +34,10 @@ def _media_storage(settings, tmpdir) -> None:
 @pytest.fixture
 def user(db) -> User:
     return UserFactory()
+
+
+@pytest.fixture(autouse=True)
+def _analytics_dimension_caches():
+    # Ids cached by one test point to rows rolled back after it
+    yield
+    clear_caches()
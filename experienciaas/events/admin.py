@@ -5,7 +5,8 @@ from django.utils.safestring import mark_safe
 from django.db.models import Count, Sum
 from django.utils.translation import gettext_lazy as _
 
-from .models import Category, City, Event, Ticket
+from .models import Category, City, Event, EventNotificationFanout, Ticket
+from .notifications import start_new_event_notifications
 
 
 @admin.register(City)
@@ -146,7 +147,9 @@ class EventAdmin(admin.ModelAdmin):
     remove_featured.short_description = "Remove from featured"
     
     def publish_events(self, request, queryset):
+        newly_published = list(queryset.exclude(status='published').values_list('pk', flat=True))
         updated = queryset.update(status='published')
+        start_new_event_notifications(newly_published)
         self.message_user(request, f"{updated} events published.")
     publish_events.short_description = "Publish selected events"
     
@@ -179,3 +182,14 @@ class TicketAdmin(admin.ModelAdmin):
         updated = queryset.update(status='cancelled')
         self.message_user(request, f"{updated} tickets cancelled.")
     cancel_tickets.short_description = "Cancel selected tickets"
+
+
+@admin.register(EventNotificationFanout)
+class EventNotificationFanoutAdmin(admin.ModelAdmin):
+    list_display = ["event", "status", "sent_count", "failed_count", "created_at", "completed_at"]
+    list_filter = ["status"]
+    search_fields = ["event__title"]
+    readonly_fields = [
+        "event", "status", "last_follow_id", "sent_count", "failed_count",
+        "created_at", "completed_at"
+    ]
@@ -22,6 +22,7 @@ from .forms import (
 from .models import (
     Category, City, Event, Ticket, Sponsor, EventSponsor, SponsorshipApplication, EventPhoto
 )
+from .notifications import start_new_event_notifications
 
 
 class StaffRequiredMixin(UserPassesTestMixin):
@@ -211,7 +212,10 @@ class AdminBulkActionView(StaffRequiredMixin, TemplateView):
             return redirect('events:admin_events')
         
         if action == 'publish':
+            # update() skips signals, so notify followers explicitly
+            newly_published = list(events.exclude(status='published').values_list('pk', flat=True))
             events.update(status='published')
+            start_new_event_notifications(newly_published)
             messages.success(request, f"{count} events published successfully.")
         
         elif action == 'unpublish':
@@ -0,0 +1,26 @@
+from rest_framework import serializers
+
+from experienciaas.events.models import Event
+
+
+class EventSerializer(serializers.ModelSerializer[Event]):
+    url = serializers.CharField(source="get_absolute_url", read_only=True)
+    organizer = serializers.CharField(source="organizer.name", read_only=True)
+    city = serializers.CharField(source="city.name", read_only=True)
+    category = serializers.CharField(source="category.name", read_only=True)
+
+    class Meta:
+        model = Event
+        fields = [
+            "id",
+            "title",
+            "slug",
+            "url",
+            "organizer",
+            "city",
+            "category",
+            "start_date",
+            "status",
+            "price_type",
+            "price",
+        ]
@@ -0,0 +1,39 @@
+from rest_framework.mixins import ListModelMixin
+from rest_framework.mixins import RetrieveModelMixin
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.viewsets import GenericViewSet
+
+from experienciaas.events.feed import Feed
+from experienciaas.events.trending import TrendingEvents
+from experienciaas.events.trending import get_listed_events
+
+from .serializers import EventSerializer
+
+
+class EventPagination(LimitOffsetPagination):
+    default_limit = 20
+    max_limit = 100
+
+
+class EventViewSet(RetrieveModelMixin, ListModelMixin, GenericViewSet):
+    """Upcoming events, by start date or with ``?sort=trending``."""
+
+    serializer_class = EventSerializer
+    pagination_class = EventPagination
+    lookup_field = "slug"
+
+    def get_queryset(self):
+        queryset = get_listed_events().select_related("city", "category", "organizer")
+        if self.action == "list" and self.request.query_params.get("sort") == "trending":
+            return TrendingEvents(queryset)
+        return queryset.order_by("start_date")
+
+
+class FeedViewSet(ListModelMixin, GenericViewSet):
+    """Upcoming events of the organizers the current user follows."""
+
+    serializer_class = EventSerializer
+    pagination_class = EventPagination
+
+    def get_queryset(self):
+        return Feed(self.request.user)
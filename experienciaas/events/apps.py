@@ -1,3 +1,5 @@
+import contextlib
+
 from django.apps import AppConfig
 from django.utils.translation import gettext_lazy as _
 
@@ -6,3 +8,7 @@ class EventsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "experienciaas.events"
     verbose_name = _("Events")
+
+    def ready(self):
+        with contextlib.suppress(ImportError):
+            import experienciaas.events.signals  # noqa: F401, PLC0415
@@ -0,0 +1,214 @@
+"""Upcoming events of the organizers a user follows.
+
+Each user's feed is a Redis sorted set of event ids scored by start date,
+written when events are published (fan-out on write) and when the user follows
+or unfollows an organizer, so reading a page is a single range query. Feeds are
+capped to the ``FEED_MAX_LENGTH`` soonest events and expire when unused; a feed
+that doesn't exist is rebuilt from the database on the next read. Without Redis
+the feed is read from the database directly.
+"""
+from django.utils import timezone
+from redis.exceptions import RedisError
+
+from experienciaas.users.models import Follow
+from experienciaas.utils.redis import get_redis
+from experienciaas.utils.redis import mark_unavailable
+
+from .models import Event
+
+FEED_STATUSES = ('published', 'sold_out')
+FEED_MAX_LENGTH = 500
+# Feeds not read or written for this long expire and are rebuilt on demand.
+FEED_TIMEOUT = 60 * 60 * 24 * 7
+# Followers whose feeds are written per Redis round trip.
+FANOUT_CHUNK_SIZE = 1000
+
+
+def get_feed_key(user_id):
+    return f"feed:{user_id}"
+
+
+def get_feed_ready_key(user_id):
+    # Tells an empty feed apart from one that was never built
+    return f"feed:{user_id}:ready"
+
+
+def get_feed_events(user_id):
+    """Upcoming feed events of a user, straight from the database."""
+    return Event.objects.filter(
+        organizer__organizer_profile__followers__follower_id=user_id,
+        status__in=FEED_STATUSES,
+        start_date__gte=timezone.now()
+    )
+
+
+def add_to_feed(pipe, user_id, scores):
+    """Queue on ``pipe`` the commands adding ``scores`` to a user's feed."""
+    key = get_feed_key(user_id)
+    if scores:
+        pipe.zadd(key, scores)
+    pipe.zremrangebyscore(key, '-inf', f"({timezone.now().timestamp()}")
+    pipe.zremrangebyrank(key, FEED_MAX_LENGTH, -1)
+    pipe.expire(key, FEED_TIMEOUT)
+
+
+def rebuild_feed(client, user_id):
+    events = get_feed_events(user_id).order_by('start_date').values_list(
+        'pk', 'start_date'
+    )[:FEED_MAX_LENGTH]
+    pipe = client.pipeline(transaction=True)
+    pipe.delete(get_feed_key(user_id))
+    add_to_feed(pipe, user_id, {pk: start_date.timestamp() for pk, start_date in events})
+    pipe.set(get_feed_ready_key(user_id), 1, ex=FEED_TIMEOUT)
+    pipe.execute()
+
+
+def update_event_feeds(event_id):
+    """Add an event to, or remove it from, the feeds of the organizer's followers.
+
+    The event is added while it's upcoming and published, and removed otherwise.
+    Returns the number of feeds written.
+    """
+    client = get_redis()
+    if client is None:
+        return 0
+
+    event = Event.objects.filter(pk=event_id).values(
+        'organizer_id', 'status', 'start_date'
+    ).first()
+    if event is None:
+        return 0
+    visible = event['status'] in FEED_STATUSES and event['start_date'] >= timezone.now()
+    follower_ids = Follow.objects.filter(
+        organizer__user_id=event['organizer_id']
+    ).values_list('follower_id', flat=True)
+
+    count = 0
+    try:
+        pipe = client.pipeline(transaction=False)
+        for follower_id in follower_ids.iterator(chunk_size=FANOUT_CHUNK_SIZE):
+            if visible:
+                add_to_feed(pipe, follower_id, {event_id: event['start_date'].timestamp()})
+            else:
+                pipe.zrem(get_feed_key(follower_id), event_id)
+            count += 1
+            if count % FANOUT_CHUNK_SIZE == 0:
+                pipe.execute()
+        pipe.execute()
+    except RedisError as exc:
+        mark_unavailable(exc)
+    return count
+
+
+def follow_organizer_feed(user_id, organizer_id):
+    """Backfill a feed with the upcoming events of a newly followed organizer."""
+    client = get_redis()
+    if client is None:
+        return
+
+    events = Event.objects.filter(
+        organizer__organizer_profile=organizer_id,
+        status__in=FEED_STATUSES,
+        start_date__gte=timezone.now()
+    ).order_by('start_date').values_list('pk', 'start_date')[:FEED_MAX_LENGTH]
+    try:
+        if not client.exists(get_feed_ready_key(user_id)):
+            # Built with the new organizer on the next read
+            return
+        pipe = client.pipeline(transaction=True)
+        add_to_feed(pipe, user_id, {pk: start_date.timestamp() for pk, start_date in events})
+        pipe.execute()
+    except RedisError as exc:
+        mark_unavailable(exc)
+
+
+def unfollow_organizer_feed(user_id, organizer_id):
+    """Remove the events of an unfollowed organizer from a feed."""
+    client = get_redis()
+    if client is None:
+        return
+
+    event_ids = list(Event.objects.filter(
+        organizer__organizer_profile=organizer_id,
+        start_date__gte=timezone.now()
+    ).values_list('pk', flat=True))
+    if not event_ids:
+        return
+    try:
+        client.zrem(get_feed_key(user_id), *event_ids)
+    except RedisError as exc:
+        mark_unavailable(exc)
+
+
+class Feed:
+    """The feed of a user as a sliceable sequence of events.
+
+    Paginators call ``count()`` and slice it, so each page is one range query
+    on the user's sorted set, followed by one query loading its events.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.client = get_redis()
+        self.ready = False
+
+    def get_client(self):
+        if self.client is None or self.ready:
+            return self.client
+        try:
+            if not self.client.exists(get_feed_ready_key(self.user.pk)):
+                rebuild_feed(self.client, self.user.pk)
+        except RedisError as exc:
+            mark_unavailable(exc)
+            self.client = None
+        self.ready = True
+        return self.client
+
+    def get_fallback_queryset(self):
+        return get_feed_events(self.user.pk).select_related(
+            'city', 'category', 'organizer'
+        ).order_by('start_date', 'pk')
+
+    def count(self):
+        client = self.get_client()
+        if client is not None:
+            try:
+                return client.zcount(
+                    get_feed_key(self.user.pk), timezone.now().timestamp(), '+inf'
+                )
+            except RedisError as exc:
+                mark_unavailable(exc)
+                self.client = None
+        return self.get_fallback_queryset().count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        stop = index.stop if index.stop is not None else start + FEED_MAX_LENGTH
+
+        client = self.get_client()
+        if client is None:
+            return list(self.get_fallback_queryset()[start:stop])
+        try:
+            event_ids = [int(pk) for pk in client.zrangebyscore(
+                get_feed_key(self.user.pk),
+                timezone.now().timestamp(),
+                '+inf',
+                start=start,
+                num=stop - start
+            )]
+        except RedisError as exc:
+            mark_unavailable(exc)
+            self.client = None
+            return list(self.get_fallback_queryset()[start:stop])
+
+        # Events changed since they were written are dropped from the page
+        events = Event.objects.filter(
+            pk__in=event_ids,
+            status__in=FEED_STATUSES
+        ).select_related('city', 'category', 'organizer').in_bulk()
+        return [events[pk] for pk in event_ids if pk in events]
@@ -0,0 +1,113 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import close_old_connections
+from django.test import RequestFactory
+from django.urls import reverse
+
+from experienciaas.events import async_views
+from experienciaas.events import views
+from experienciaas.events.views import get_upcoming_events
+
+BROWSER = 'Mozilla/5.0 (X11; Linux x86_64) Firefox/128.0'
+
+
+async def get_anonymous_user():
+    return AnonymousUser()
+
+
+def build_request(path):
+    request = RequestFactory().get(path, HTTP_USER_AGENT=BROWSER)
+    request.user = AnonymousUser()
+    request.auser = get_anonymous_user
+    return request
+
+
+def serve_sync(view, path, kwargs):
+    try:
+        response = view(build_request(path), **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+    finally:
+        # What request_finished does after each request
+        close_old_connections()
+
+
+async def serve_async(view, path, kwargs):
+    # Each ASGI request gets its own thread for sync code, as in ASGIHandler
+    async with ThreadSensitiveContext():
+        try:
+            await view(build_request(path), **kwargs)
+        finally:
+            await sync_to_async(close_old_connections)()
+
+
+class Command(BaseCommand):
+    help = 'Compare the throughput of the sync and async public event pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Requests sent to each page and implementation',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=20,
+            help='Requests in flight at once (threads for the sync views)',
+        )
+
+    def handle(self, *args, **options):
+        event = get_upcoming_events().order_by('start_date').first()
+        if event is None:
+            raise CommandError('No upcoming events to benchmark, run populate_events first.')
+
+        pages = [
+            ('list', views.EventListView, async_views.AsyncEventListView, {}),
+            ('detail', views.EventDetailView, async_views.AsyncEventDetailView,
+             {'slug': event.slug}),
+            ('by_location', views.EventsByLocationView, async_views.AsyncEventsByLocationView,
+             {'city_slug': event.city.slug}),
+            ('by_category', views.EventsByCategoryView, async_views.AsyncEventsByCategoryView,
+             {'category_slug': event.category.slug}),
+        ]
+        total = options['requests']
+        concurrency = options['concurrency']
+        self.stdout.write(f'{total} requests per page, {concurrency} at once')
+
+        for name, sync_view, async_view, kwargs in pages:
+            path = reverse(f'events:{name}', kwargs=kwargs)
+            sync_rate = self.run_sync(sync_view.as_view(), path, kwargs, total, concurrency)
+            async_rate = asyncio.run(self.run_async(async_view.as_view(), path, kwargs, total, concurrency))
+            self.stdout.write(
+                f'  {name:<12} sync {sync_rate:8.1f} req/s   async {async_rate:8.1f} req/s'
+                f'   ({async_rate / sync_rate:.2f}x)'
+            )
+
+    def run_sync(self, view, path, kwargs, total, concurrency):
+        serve_sync(view, path, kwargs)
+        with ThreadPoolExecutor(concurrency) as executor:
+            started = time.perf_counter()
+            for future in [executor.submit(serve_sync, view, path, kwargs) for _ in range(total)]:
+                future.result()
+            return total / (time.perf_counter() - started)
+
+    async def run_async(self, view, path, kwargs, total, concurrency):
+        await serve_async(view, path, kwargs)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def serve():
+            async with semaphore:
+                await serve_async(view, path, kwargs)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(serve() for _ in range(total)))
+        return total / (time.perf_counter() - started)
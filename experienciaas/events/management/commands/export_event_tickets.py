@@ -0,0 +1,70 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from experienciaas.events.models import Event
+from experienciaas.events.printing import DEFAULT_BATCH_SIZE
+from experienciaas.events.printing import export_event_tickets
+
+
+class Command(BaseCommand):
+    help = 'Render printable tickets for every confirmed attendee of an event into a ZIP archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_slug', help='Slug of the event')
+        parser.add_argument(
+            '--output',
+            help='Path of the ZIP archive (default: tickets-<event-slug>.zip)',
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            help='Number of worker processes (default: up to 4, 1 renders in-process)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Tickets rendered per worker job',
+        )
+        parser.add_argument(
+            '--async',
+            action='store_true',
+            dest='run_async',
+            help='Queue the export as a Celery task instead of rendering here',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            event = Event.objects.select_related('city').get(slug=options['event_slug'])
+        except Event.DoesNotExist as exc:
+            raise CommandError(f"Event '{options['event_slug']}' does not exist.") from exc
+
+        if options['run_async']:
+            from experienciaas.events.tasks import export_event_tickets as export_task
+
+            result = export_task.delay(
+                event.pk,
+                processes=options['processes'],
+                batch_size=options['batch_size'],
+            )
+            self.stdout.write(self.style.SUCCESS(f'Queued ticket export task {result.id}'))
+            return
+
+        output = Path(options['output'] or f'tickets-{event.slug}.zip')
+        self.stdout.write(f'Rendering tickets for "{event.title}" into {output}...')
+
+        def report_progress(done, total):
+            self.stdout.write(f'  {done}/{total} tickets rendered')
+
+        with output.open('wb') as archive:
+            count = export_event_tickets(
+                event,
+                archive,
+                processes=options['processes'],
+                batch_size=options['batch_size'],
+                progress=report_progress,
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully rendered {count} tickets into {output}'))
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.11 on 2026-10-19 04:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_remove_event_post_event_photos_eventphoto'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventNotificationFanout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed')], default='pending', max_length=20, verbose_name='Status')),
+                ('last_follow_id', models.PositiveBigIntegerField(default=0, verbose_name='Last follow id')),
+                ('sent_count', models.PositiveIntegerField(default=0, verbose_name='Sent')),
+                ('failed_count', models.PositiveIntegerField(default=0, verbose_name='Failed')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='Completed at')),
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='notification_fanout', to='events.event')),
+            ],
+            options={
+                'verbose_name': 'Event Notification Fan-out',
+                'verbose_name_plural': 'Event Notification Fan-outs',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EventNotificationDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('sent', 'Sent'), ('failed', 'Failed')], max_length=20, verbose_name='Status')),
+                ('error', models.CharField(blank=True, max_length=255, verbose_name='Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_deliveries', to='events.event')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Event Notification Delivery',
+                'verbose_name_plural': 'Event Notification Deliveries',
+                'unique_together': {('event', 'user')},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.11 on 2026-10-19 04:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_eventnotificationfanout_eventnotificationdelivery'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventRecommendations',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_ids', models.JSONField(default=list, verbose_name='Events')),
+                ('computed_at', models.DateTimeField(verbose_name='Computed at')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='event_recommendations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Event Recommendations',
+                'verbose_name_plural': 'Event Recommendations',
+            },
+        ),
+    ]
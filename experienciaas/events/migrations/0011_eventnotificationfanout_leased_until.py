@@ -0,0 +1,18 @@
+# Generated by Django 5.1.11 on 2026-10-19 05:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0010_event_trending_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventnotificationfanout',
+            name='leased_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Leased until'),
+        ),
+    ]
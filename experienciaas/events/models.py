@@ -142,6 +142,8 @@ class Event(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
     is_featured = models.BooleanField(_("Is featured"), default=False)
     views = models.PositiveIntegerField(_("Views"), default=0)
+    # Time-decayed activity, checkpointed from the trending ranking
+    trending_score = models.FloatField(_("Trending score"), default=0)
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -155,6 +157,7 @@ class Event(models.Model):
             models.Index(fields=["city", "start_date"]),
             models.Index(fields=["category", "start_date"]),
             models.Index(fields=["status", "start_date"]),
+            models.Index(fields=["status", "-trending_score"]),
         ]
     
     def __str__(self):
@@ -482,3 +485,74 @@ class EventPhoto(models.Model):
     
     def __str__(self):
         return f"Photo {self.id} - {self.event.title}"
+
+
+class EventNotificationFanout(models.Model):
+    """Progress of the new-event notification sent to the organizer's followers."""
+    STATUS_CHOICES = [
+        ('pending', _('Pending')),
+        ('running', _('Running')),
+        ('completed', _('Completed')),
+    ]
+
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, related_name="notification_fanout")
+    status = models.CharField(_("Status"), max_length=20, choices=STATUS_CHOICES, default='pending')
+
+    # Keyset pagination cursor: followers up to this Follow id were processed
+    last_follow_id = models.PositiveBigIntegerField(_("Last follow id"), default=0)
+    sent_count = models.PositiveIntegerField(_("Sent"), default=0)
+    failed_count = models.PositiveIntegerField(_("Failed"), default=0)
+    # A worker is sending a chunk until then
+    leased_until = models.DateTimeField(_("Leased until"), null=True, blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(_("Completed at"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Event Notification Fan-out")
+        verbose_name_plural = _("Event Notification Fan-outs")
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.event.title} ({self.get_status_display()})"
+
+
+class EventNotificationDelivery(models.Model):
+    """New-event notification delivered (or not) to one follower."""
+    STATUS_CHOICES = [
+        ('sent', _('Sent')),
+        ('failed', _('Failed')),
+    ]
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="notification_deliveries")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="event_notifications")
+    status = models.CharField(_("Status"), max_length=20, choices=STATUS_CHOICES)
+    error = models.CharField(_("Error"), max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Event Notification Delivery")
+        verbose_name_plural = _("Event Notification Deliveries")
+        unique_together = [["event", "user"]]
+
+    def __str__(self):
+        return f"{self.event.title} -> {self.user} ({self.get_status_display()})"
+
+
+class EventRecommendations(models.Model):
+    """Upcoming events recommended to a user, best first.
+
+    Computed periodically by the ``compute_event_recommendations`` task.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="event_recommendations")
+    # Event ids only, so a user's recommendations are a single small row
+    event_ids = models.JSONField(_("Events"), default=list)
+    computed_at = models.DateTimeField(_("Computed at"))
+
+    class Meta:
+        verbose_name = _("Event Recommendations")
+        verbose_name_plural = _("Event Recommendations")
+
+    def __str__(self):
+        return f"{self.user} ({len(self.event_ids)})"
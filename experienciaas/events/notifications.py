@@ -0,0 +1,214 @@
+"""New-event notifications for the followers of an organizer.
+
+Publishing an event starts a fan-out (``EventNotificationFanout``) that the
+``send_new_event_notifications`` task processes one chunk of followers per run,
+re-queueing itself until every follower was handled, so a large audience never
+blocks a request or a worker for long.
+
+Followers are paginated by ``Follow`` id (keyset pagination) and the cursor is
+saved with every chunk, so an interrupted fan-out resumes where it stopped.
+A worker leases the fan-out for the time a chunk takes to send instead of
+locking its row. Deliveries are buffered and saved with one query every
+``DELIVERY_FLUSH_SIZE`` emails and whenever sending stops, so a connection
+lost mid-chunk keeps the deliveries made before it; only a worker killed
+outright can resend the emails of its last unsaved buffer. Deliveries are
+unique per event and user: a follower is never notified twice about the same
+event, even if a chunk is retried or the event is re-published.
+"""
+import smtplib
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail import get_connection
+from django.db import transaction
+from django.db.models import F
+from django.db.models import Q
+from django.template.loader import get_template
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from experienciaas.users.models import Follow
+from experienciaas.users.models import OrganizerProfile
+
+from .models import Event, EventNotificationDelivery, EventNotificationFanout
+
+DEFAULT_CHUNK_SIZE = 200
+# Emails per second sent by each worker.
+DEFAULT_RATE_LIMIT = 10
+# Added to the expected sending time of a chunk to lease its fan-out
+LEASE_MARGIN = 5 * 60
+# Deliveries saved together while a chunk is sent
+DELIVERY_FLUSH_SIZE = 50
+
+
+class RateLimiter:
+    """Space out calls so there are at most ``rate`` per second."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_call = time.monotonic()
+
+    def wait(self):
+        now = time.monotonic()
+        if self.next_call > now:
+            time.sleep(self.next_call - now)
+        self.next_call = max(now, self.next_call) + self.interval
+
+
+def start_new_event_notifications(event_ids):
+    """Schedule the follower notifications of newly published, upcoming events.
+
+    Events whose followers were already notified are skipped.
+    """
+    from .tasks import send_new_event_notifications
+
+    upcoming = Event.objects.filter(
+        pk__in=event_ids,
+        status='published',
+        start_date__gte=timezone.now()
+    ).values_list('pk', flat=True)
+    for event_id in upcoming:
+        fanout, _ = EventNotificationFanout.objects.get_or_create(event_id=event_id)
+        if fanout.status != 'completed':
+            transaction.on_commit(
+                lambda event_id=event_id: send_new_event_notifications.delay(event_id)
+            )
+
+
+def build_shared_context(event):
+    """Template context shared by every notification of an event."""
+    site = Site.objects.get_current()
+    protocol = getattr(settings, 'ACCOUNT_DEFAULT_HTTP_PROTOCOL', 'https')
+    return {
+        'event': event,
+        'organizer_name': event.organizer.name or event.organizer.email,
+        'event_url': f"{protocol}://{site.domain}{event.get_absolute_url()}",
+        'current_site': site,
+    }
+
+
+def send_notifications(
+    event, recipients, rate_limit=DEFAULT_RATE_LIMIT, flush_size=DELIVERY_FLUSH_SIZE
+):
+    """Email ``recipients`` (``(user_id, email, name)`` tuples) about ``event``.
+
+    All messages go through a single connection. Yields each delivery once
+    sent; they are saved every ``flush_size`` emails and when sending stops, so
+    connection errors propagate after the deliveries made before them are saved.
+    """
+    shared_context = build_shared_context(event)
+    subject = render_to_string('events/email/new_event_subject.txt', shared_context).strip()
+    shared_context['subject'] = subject
+    text_template = get_template('events/email/new_event_message.txt')
+    html_template = get_template('events/email/new_event_message.html')
+    limiter = RateLimiter(rate_limit)
+    pending = []
+
+    with get_connection() as connection:
+        try:
+            for user_id, email, name in recipients:
+                context = {**shared_context, 'recipient_name': name}
+                message = EmailMultiAlternatives(
+                    subject,
+                    text_template.render(context),
+                    to=[email],
+                    connection=connection
+                )
+                message.attach_alternative(html_template.render(context), 'text/html')
+                limiter.wait()
+                try:
+                    message.send()
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError) as exc:
+                    # Problems with this recipient only; others still get theirs
+                    delivery = EventNotificationDelivery(
+                        event=event, user_id=user_id, status='failed', error=str(exc)[:255]
+                    )
+                else:
+                    delivery = EventNotificationDelivery(event=event, user_id=user_id, status='sent')
+                pending.append(delivery)
+                if len(pending) >= flush_size:
+                    EventNotificationDelivery.objects.bulk_create(pending, ignore_conflicts=True)
+                    pending.clear()
+                yield delivery
+        finally:
+            # Saves the rest of the batch, also when a connection error stops it
+            EventNotificationDelivery.objects.bulk_create(pending, ignore_conflicts=True)
+
+
+def lease_fanout(event_id, seconds):
+    """Lease the event's unfinished fan-out, ``False`` if another worker holds it."""
+    now = timezone.now()
+    return bool(EventNotificationFanout.objects.filter(
+        Q(leased_until__isnull=True) | Q(leased_until__lt=now),
+        event_id=event_id,
+    ).exclude(status='completed').update(
+        status='running', leased_until=now + timedelta(seconds=seconds)
+    ))
+
+
+def process_notification_chunk(event_id, chunk_size=None, rate_limit=None):
+    """Notify the next chunk of followers of the event's organizer.
+
+    Returns ``True`` if the fan-out should continue with another chunk.
+    """
+    if chunk_size is None:
+        chunk_size = getattr(settings, 'EVENT_NOTIFICATION_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    if rate_limit is None:
+        rate_limit = getattr(settings, 'EVENT_NOTIFICATION_RATE_LIMIT', DEFAULT_RATE_LIMIT)
+
+    # Another worker leasing the fan-out is already processing it
+    if not lease_fanout(event_id, chunk_size / rate_limit + LEASE_MARGIN if rate_limit else LEASE_MARGIN):
+        return False
+    fanout = EventNotificationFanout.objects.select_related('event__organizer').get(event_id=event_id)
+    event = fanout.event
+
+    follows = []
+    organizer_id = OrganizerProfile.objects.filter(
+        user_id=event.organizer_id
+    ).values_list('pk', flat=True).first()
+    if organizer_id is not None:
+        follows = list(Follow.objects.filter(
+            organizer_id=organizer_id,
+            pk__gt=fanout.last_follow_id
+        ).order_by('pk').values_list(
+            'pk', 'follower_id', 'follower__email', 'follower__name', 'follower__is_active'
+        )[:chunk_size])
+
+    if not follows:
+        EventNotificationFanout.objects.filter(pk=fanout.pk).update(
+            status='completed', completed_at=timezone.now(), leased_until=None
+        )
+        return False
+
+    notified = set(EventNotificationDelivery.objects.filter(
+        event=event,
+        user_id__in=[follow[1] for follow in follows]
+    ).values_list('user_id', flat=True))
+    recipients = [
+        (user_id, email, name)
+        for _, user_id, email, name, is_active in follows
+        if is_active and email and user_id not in notified
+    ]
+
+    sent = failed = 0
+    chunk_done = False
+    try:
+        for delivery in send_notifications(event, recipients, rate_limit) if recipients else ():
+            if delivery.status == 'sent':
+                sent += 1
+            else:
+                failed += 1
+        chunk_done = True
+    finally:
+        # A retry resumes the chunk, skipping the followers already notified
+        progress = {'last_follow_id': follows[-1][0]} if chunk_done else {}
+        EventNotificationFanout.objects.filter(pk=fanout.pk).update(
+            leased_until=None,
+            sent_count=F('sent_count') + sent,
+            failed_count=F('failed_count') + failed,
+            **progress
+        )
+    return True
@@ -0,0 +1,73 @@
+"""Full-page cache of event detail pages for anonymous visitors.
+
+Anonymous visitors all see the same page, so it's rendered once per event
+slug and language and stored in the cache for ``EVENT_PAGE_CACHE_TIMEOUT``
+seconds. Saving or deleting an event, its sponsors or its photos drops the
+page; related events, organizer and seat counts may lag until it expires
+(seats are pushed live over the websocket anyway).
+
+Cached pages hold a placeholder instead of a CSRF token, replaced by a token
+of each visitor when served (none on the session-free path of
+``experienciaas.utils.public_pages``), and never include flash messages,
+which stay queued for the next page. Page views are counted by a beacon the page sends
+once loaded, so cache hits count too.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.csrf import get_token
+from django.utils import translation
+
+from experienciaas.utils.public_pages import is_public_page
+
+PAGE_KEY = 'events:page:{slug}:{language}'
+CSRF_PLACEHOLDER = 'csrf-token-for-cached-page'
+
+
+def get_page_key(slug, language=None):
+    return PAGE_KEY.format(slug=slug, language=language or translation.get_language())
+
+
+def get_cacheable_context():
+    """Context entries overriding the visitor-specific ones of a cached page."""
+    return {'csrf_token': CSRF_PLACEHOLDER, 'messages': []}
+
+
+def personalize(request, content):
+    token = '' if is_public_page(request) else get_token(request)
+    return content.replace(CSRF_PLACEHOLDER, token)
+
+
+def get_cached_page(request, slug):
+    """The cached page as served to the visitor, ``None`` on a miss."""
+    content = cache.get(get_page_key(slug))
+    if content is None:
+        return None
+    return personalize(request, content)
+
+
+async def aget_cached_page(request, slug):
+    content = await cache.aget(get_page_key(slug))
+    if content is None:
+        return None
+    return personalize(request, content)
+
+
+def cache_page(request, slug, response):
+    """Store a page rendered with ``get_cacheable_context`` and personalize it."""
+    content = response.content.decode(response.charset)
+    cache.set(get_page_key(slug), content, settings.EVENT_PAGE_CACHE_TIMEOUT)
+    response.content = personalize(request, content)
+    return response
+
+
+async def acache_page(request, slug, response):
+    content = response.content.decode(response.charset)
+    await cache.aset(get_page_key(slug), content, settings.EVENT_PAGE_CACHE_TIMEOUT)
+    response.content = personalize(request, content)
+    return response
+
+
+def delete_cached_pages(slugs):
+    cache.delete_many([
+        get_page_key(slug, language) for slug in slugs for language, _name in settings.LANGUAGES
+    ])
@@ -0,0 +1,238 @@
+"""Batch rendering of printable tickets.
+
+Tickets of an event are rendered to one-page PDFs in a pool of worker
+processes and written, in order, into a single ZIP archive. Shared assets
+(event banner, fonts and the event texts) are prepared once and handed to each
+worker when it starts, so every document only carries its own attendee data.
+
+The pool comes from billiard, Celery's fork of ``multiprocessing``: unlike the
+standard library, it lets the daemonic children of a prefork Celery worker
+start processes of their own, so exports queued as tasks are rendered in
+parallel too.
+
+Memory stays bounded regardless of the number of attendees: tickets are read
+from the database with a server-side iterator and only a fixed number of
+batches are in flight at any time.
+"""
+import io
+import zipfile
+from collections import deque
+from itertools import islice
+
+import billiard
+import segno
+from django.conf import settings
+from django.db import connections
+from django.utils import formats
+from django.utils import timezone
+from PIL import Image
+from PIL import ImageDraw
+from PIL import ImageFont
+
+from .models import Ticket
+from .qr import build_qr_payload
+from .qr import serialize_qr_payload
+
+# A5 landscape at 150 dpi.
+PAGE_SIZE = (1240, 874)
+PAGE_DPI = 150
+BANNER_HEIGHT = 300
+MARGIN = 60
+QR_SIZE = 320
+
+DEFAULT_BATCH_SIZE = 50
+
+TICKET_FIELDS = ('ticket_number', 'attendee_name', 'attendee_email', 'status')
+
+# Per-process shared assets, set by ``init_worker``.
+_worker_assets = None
+
+
+def build_shared_assets(event):
+    """Collect the event data shared by every ticket of the event.
+
+    Only plain, picklable values are returned so they can be sent to worker
+    processes once instead of with every ticket.
+    """
+    banner = None
+    if event.image:
+        try:
+            with event.image.open('rb') as image_file:
+                image = Image.open(image_file)
+                image = image.convert('RGB')
+                image.thumbnail((PAGE_SIZE[0], PAGE_SIZE[0]))
+                buffer = io.BytesIO()
+                image.save(buffer, format='JPEG', quality=85)
+                banner = buffer.getvalue()
+        except (OSError, ValueError):
+            banner = None
+
+    start_date = timezone.localtime(event.start_date)
+    return {
+        'title': event.title,
+        'date': formats.date_format(start_date, 'DATETIME_FORMAT'),
+        'venue': f"{event.venue_name} - {event.city.name}",
+        'banner': banner,
+        'font_path': getattr(settings, 'TICKET_PRINT_FONT', None),
+    }
+
+
+def load_font(font_path, size):
+    if font_path:
+        try:
+            return ImageFont.truetype(font_path, size)
+        except OSError:
+            pass
+    return ImageFont.load_default(size=size)
+
+
+def prepare_assets(shared):
+    """Decode the shared assets into ready-to-use Pillow objects."""
+    banner = None
+    if shared['banner']:
+        image = Image.open(io.BytesIO(shared['banner']))
+        # Crop to a full-width strip at the top of the page
+        ratio = PAGE_SIZE[0] / image.width
+        image = image.resize((PAGE_SIZE[0], max(1, int(image.height * ratio))))
+        top = max(0, (image.height - BANNER_HEIGHT) // 2)
+        banner = image.crop((0, top, PAGE_SIZE[0], top + BANNER_HEIGHT))
+
+    font_path = shared['font_path']
+    return {
+        **shared,
+        'banner': banner,
+        'title_font': load_font(font_path, 48),
+        'text_font': load_font(font_path, 30),
+        'small_font': load_font(font_path, 24),
+    }
+
+
+def init_worker(shared):
+    """Process pool initializer: prepare the shared assets once per worker."""
+    global _worker_assets  # noqa: PLW0603
+    _worker_assets = prepare_assets(shared)
+
+
+def render_ticket(ticket, assets):
+    """Render a single ticket as a one-page PDF and return its bytes."""
+    page = Image.new('RGB', PAGE_SIZE, 'white')
+    draw = ImageDraw.Draw(page)
+
+    if assets['banner'] is not None:
+        page.paste(assets['banner'], (0, 0))
+        top = BANNER_HEIGHT + MARGIN // 2
+    else:
+        draw.rectangle((0, 0, PAGE_SIZE[0], MARGIN * 2), fill='#3B82F6')
+        top = MARGIN * 2 + MARGIN // 2
+
+    text_width = PAGE_SIZE[0] - QR_SIZE - MARGIN * 3
+    lines = [
+        (assets['title'], assets['title_font'], 'black'),
+        (assets['date'], assets['text_font'], '#374151'),
+        (assets['venue'], assets['text_font'], '#374151'),
+        (ticket['attendee_name'], assets['text_font'], 'black'),
+        (f"#{ticket['ticket_number']}", assets['small_font'], '#6B7280'),
+    ]
+    y = top
+    for text, font, fill in lines:
+        draw.text((MARGIN, y), fit_text(draw, text, font, text_width), font=font, fill=fill)
+        y += int(font.size * 1.6)
+
+    qr = segno.make(ticket['qr_data'], error='m')
+    qr_buffer = io.BytesIO()
+    qr.save(qr_buffer, kind='png', scale=8, border=2)
+    qr_image = Image.open(qr_buffer).convert('RGB').resize((QR_SIZE, QR_SIZE), Image.NEAREST)
+    page.paste(qr_image, (PAGE_SIZE[0] - QR_SIZE - MARGIN, top))
+
+    output = io.BytesIO()
+    page.save(output, format='PDF', resolution=PAGE_DPI)
+    return output.getvalue()
+
+
+def fit_text(draw, text, font, max_width):
+    """Truncate ``text`` with an ellipsis so it fits in ``max_width`` pixels."""
+    if draw.textlength(text, font=font) <= max_width:
+        return text
+    while text and draw.textlength(f"{text}…", font=font) > max_width:
+        text = text[:-1]
+    return f"{text}…"
+
+
+def render_batch(tickets):
+    """Render a batch of tickets in a worker process."""
+    return [
+        (f"ticket-{ticket['ticket_number']}.pdf", render_ticket(ticket, _worker_assets))
+        for ticket in tickets
+    ]
+
+
+def iter_ticket_batches(event, batch_size):
+    """Yield batches of plain ticket dicts, streamed from the database."""
+    tickets = Ticket.objects.filter(
+        event=event,
+        status='confirmed'
+    ).order_by('pk').only(*TICKET_FIELDS).iterator(chunk_size=batch_size * 4)
+
+    def as_dict(ticket):
+        # The payload reads the event, which is the same for every ticket
+        ticket.event = event
+        return {
+            **{field: getattr(ticket, field) for field in TICKET_FIELDS},
+            'qr_data': serialize_qr_payload(build_qr_payload(ticket)),
+        }
+
+    while batch := [as_dict(ticket) for ticket in islice(tickets, batch_size)]:
+        yield batch
+
+
+def get_default_processes():
+    return min(4, billiard.cpu_count())
+
+
+def export_event_tickets(event, fileobj, processes=None, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Render the confirmed tickets of ``event`` into a ZIP written to ``fileobj``.
+
+    ``progress`` is called as ``progress(done, total)`` after every batch.
+    Returns the number of rendered tickets.
+    """
+    if processes is None:
+        processes = get_default_processes()
+
+    total = Ticket.objects.filter(event=event, status='confirmed').count()
+    shared = build_shared_assets(event)
+    batches = iter_ticket_batches(event, batch_size)
+    done = 0
+
+    with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_STORED) as archive:
+        def write_batch(documents):
+            nonlocal done
+            for name, content in documents:
+                archive.writestr(name, content)
+            done += len(documents)
+            if progress:
+                progress(done, total)
+
+        if processes <= 1:
+            init_worker(shared)
+            for batch in batches:
+                write_batch(render_batch(batch))
+            return done
+
+        max_in_flight = processes * 2
+        pending = deque()
+        # Forked workers must not inherit open database connections, so close
+        # them and start every worker before the ticket cursor is opened.
+        connections.close_all()
+        with billiard.get_context('fork').Pool(
+            processes,
+            initializer=init_worker,
+            initargs=(shared,),
+        ) as pool:
+            for batch in batches:
+                pending.append(pool.apply_async(render_batch, (batch,)))
+                if len(pending) >= max_in_flight:
+                    write_batch(pending.popleft().get())
+            while pending:
+                write_batch(pending.popleft().get())
+
+    return done
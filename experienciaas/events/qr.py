@@ -0,0 +1,112 @@
+"""Pre-rendered QR code images for tickets.
+
+QR images are encoded once per payload version and stored in the default
+storage under ``tickets/qr/<ticket_number>/<version>.<format>``. The version is
+a short hash of the payload, so a ticket only gets new images when something
+encoded in the QR (attendee, event title/date, status) actually changes.
+"""
+import hashlib
+import io
+import json
+
+import segno
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+QR_FORMATS = ("svg", "png")
+QR_CONTENT_TYPES = {
+    "svg": "image/svg+xml",
+    "png": "image/png",
+}
+QR_STORAGE_DIR = "tickets/qr"
+QR_ERROR_CORRECTION = "m"
+# Module size in pixels for each format. SVG is scalable so a small scale
+# keeps the file compact; PNG is used for printing/downloads.
+QR_SCALE = {
+    "svg": 4,
+    "png": 10,
+}
+
+
+def build_qr_payload(ticket):
+    """Return the data encoded in the ticket QR code."""
+    return {
+        'ticket_number': ticket.ticket_number,
+        'event_name': ticket.event.title,
+        'attendee_name': ticket.attendee_name,
+        'event_date': ticket.event.start_date.isoformat(),
+        'status': ticket.status,
+    }
+
+
+def serialize_qr_payload(payload):
+    """Serialize the payload in a stable way so equal payloads hash equally."""
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"))
+
+
+def get_qr_version(payload):
+    """Return a short, stable version identifier for a payload."""
+    return hashlib.sha1(serialize_qr_payload(payload).encode()).hexdigest()[:12]  # noqa: S324
+
+
+def get_qr_path(ticket_number, version, image_format):
+    return f"{QR_STORAGE_DIR}/{ticket_number}/{version}.{image_format}"
+
+
+def render_qr_image(data, image_format):
+    """Encode ``data`` as a QR image and return the raw bytes."""
+    qr = segno.make(data, error=QR_ERROR_CORRECTION)
+    buffer = io.BytesIO()
+    if image_format == "svg":
+        qr.save(buffer, kind="svg", scale=QR_SCALE["svg"], xmldecl=False, svgclass="ticket-qr")
+    else:
+        qr.save(buffer, kind=image_format, scale=QR_SCALE[image_format])
+    return buffer.getvalue()
+
+
+def ensure_ticket_qr_codes(ticket, formats=QR_FORMATS):
+    """Make sure the QR images for the ticket's current payload exist.
+
+    Images for older payload versions are removed. Returns the current version.
+    """
+    payload = build_qr_payload(ticket)
+    version = get_qr_version(payload)
+    data = serialize_qr_payload(payload)
+
+    for image_format in formats:
+        path = get_qr_path(ticket.ticket_number, version, image_format)
+        if not default_storage.exists(path):
+            default_storage.save(path, ContentFile(render_qr_image(data, image_format)))
+
+    delete_stale_qr_codes(ticket.ticket_number, keep_version=version)
+    return version
+
+
+def delete_stale_qr_codes(ticket_number, keep_version=None):
+    """Delete stored QR images that don't belong to ``keep_version``."""
+    directory = f"{QR_STORAGE_DIR}/{ticket_number}"
+    try:
+        _, files = default_storage.listdir(directory)
+    except (FileNotFoundError, NotImplementedError):
+        return
+    for filename in files:
+        if keep_version and filename.startswith(f"{keep_version}."):
+            continue
+        default_storage.delete(f"{directory}/{filename}")
+
+
+def get_ticket_qr_urls(ticket):
+    """Return the versioned URLs of the ticket QR images, keyed by format."""
+    version = get_qr_version(build_qr_payload(ticket))
+    return {
+        image_format: reverse(
+            "events:ticket_qr",
+            kwargs={
+                "ticket_number": ticket.ticket_number,
+                "version": version,
+                "image_format": image_format,
+            },
+        )
+        for image_format in QR_FORMATS
+    }
@@ -0,0 +1,129 @@
+"""Live seat availability updates.
+
+Ticket changes only mark their event as dirty in Redis. A throttled task then
+recounts every dirty event with a single query and publishes one message on
+``SEATS_CHANNEL``, so a burst of registrations produces a few messages per
+second no matter its size.
+
+The websocket app (``config.websocket``) relays those messages to connected
+clients through ``seat_hub``: one Redis subscription per process, fanned out to
+the connections subscribed to each event.
+"""
+import asyncio
+import json
+
+from django.db.models import Count
+from django.db.models import Q
+from redis.exceptions import RedisError
+
+from experienciaas.utils.pubsub import PubSubHub
+from experienciaas.utils.redis import get_redis
+from experienciaas.utils.redis import mark_unavailable
+
+from .models import Event
+
+SEATS_CHANNEL = 'events:seats'
+SEATS_DIRTY_KEY = 'events:seats:dirty'
+SEATS_FLUSH_KEY = 'events:seats:flush-scheduled'
+# Minimum delay between two published messages, in seconds.
+FLUSH_INTERVAL = 0.5
+# Safety expiry of the flush marker, in case the scheduled task is lost.
+FLUSH_MARKER_TIMEOUT = 30
+
+# Clients can't follow the seats of unpublished events.
+LIVE_STATUSES = ('published', 'sold_out', 'cancelled')
+MAX_SUBSCRIPTIONS = 50
+
+
+def build_seat_snapshot(event_id, status, max_attendees, attendees):
+    remaining = max(0, max_attendees - attendees) if max_attendees else None
+    return {
+        'event': event_id,
+        'status': status,
+        'attendees': attendees,
+        'max_attendees': max_attendees,
+        'remaining': remaining,
+        'sold_out': status == 'sold_out' or remaining == 0,
+    }
+
+
+def get_seat_snapshots(event_ids, statuses=None):
+    """Return the current seat availability of the events, with one query."""
+    events = Event.objects.filter(pk__in=event_ids)
+    if statuses is not None:
+        events = events.filter(status__in=statuses)
+    rows = events.annotate(
+        confirmed_count=Count('tickets', filter=Q(tickets__status='confirmed')),
+    ).values_list('pk', 'status', 'max_attendees', 'confirmed_count')
+    return [build_seat_snapshot(*row) for row in rows]
+
+
+def mark_seats_dirty(event_id):
+    """Queue a seat update for the event, coalesced with other pending ones."""
+    client = get_redis()
+    if client is None:
+        return
+
+    try:
+        pipe = client.pipeline()
+        pipe.sadd(SEATS_DIRTY_KEY, event_id)
+        pipe.set(SEATS_FLUSH_KEY, 1, nx=True, ex=FLUSH_MARKER_TIMEOUT)
+        _, scheduled = pipe.execute()
+    except RedisError as exc:
+        mark_unavailable(exc)
+        return
+
+    if scheduled:
+        from .tasks import publish_seat_updates
+        publish_seat_updates.apply_async(countdown=FLUSH_INTERVAL)
+
+
+def flush_seat_updates():
+    """Publish the availability of every dirty event. Returns the event count."""
+    client = get_redis()
+    if client is None:
+        return 0
+
+    try:
+        # Clear the marker first: changes arriving from now on schedule a new
+        # flush, while everything marked before is picked up below.
+        client.delete(SEATS_FLUSH_KEY)
+        pipe = client.pipeline(transaction=True)
+        pipe.smembers(SEATS_DIRTY_KEY)
+        pipe.delete(SEATS_DIRTY_KEY)
+        event_ids, _ = pipe.execute()
+        if not event_ids:
+            return 0
+        snapshots = get_seat_snapshots([int(event_id) for event_id in event_ids])
+        message = json.dumps({'type': 'seats', 'events': snapshots})
+        client.publish(SEATS_CHANNEL, message)
+    except RedisError as exc:
+        mark_unavailable(exc)
+        return 0
+    return len(snapshots)
+
+
+class SeatSubscription:
+    """Seat updates waiting to be sent to one websocket connection.
+
+    Only the latest update of each event is kept, so slow clients skip
+    intermediate counts instead of building up a backlog.
+    """
+
+    def __init__(self):
+        self.keys = set()
+        self.pending = {}
+        self.ready = asyncio.Event()
+
+    def push(self, update):
+        self.pending[update['event']] = update
+        self.ready.set()
+
+    async def get(self):
+        await self.ready.wait()
+        self.ready.clear()
+        updates, self.pending = self.pending, {}
+        return list(updates.values())
+
+
+seat_hub = PubSubHub(SEATS_CHANNEL, items_key='events', id_key='event')
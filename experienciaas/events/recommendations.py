@@ -0,0 +1,265 @@
+"""Interest-based event recommendations.
+
+The ``compute_event_recommendations`` task periodically builds sparse matrices
+from the users' interests, tickets and event views, scores every upcoming event
+for every user with a few matrix products, and stores the best ones in
+``EventRecommendations``. Pages only read that row, so serving recommendations
+costs no computation.
+
+Two signals are combined:
+
+- content: how much the user cares about the event's category, from the
+  categories of their interests, tickets and views (user x category profile);
+- collaborative: cosine similarity between the upcoming event and the events
+  the user interacted with, based on who else bought or viewed them
+  (user x event interactions).
+"""
+import numpy as np
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.text import slugify
+from scipy import sparse
+
+from experienciaas.analytics.models import EventView
+from experienciaas.users.models import INTEREST_CHOICES
+from experienciaas.users.models import User
+
+from .models import Category, Event, EventRecommendations, Ticket
+
+RECOMMENDATIONS_PER_USER = 20
+# Interactions older than this are ignored.
+HISTORY_DAYS = 365
+# Users scored per block, bounding the memory of the dense score matrix.
+USERS_PER_BLOCK = 500
+
+INTEREST_WEIGHT = 2.0
+TICKET_WEIGHT = 3.0
+VIEW_WEIGHT = 1.0
+CONTENT_WEIGHT = 0.6
+COLLABORATIVE_WEIGHT = 0.4
+
+
+class Index:
+    """Maps ids to consecutive matrix indices."""
+
+    def __init__(self, ids=()):
+        self.positions = {}
+        for pk in ids:
+            self.add(pk)
+
+    def add(self, pk):
+        return self.positions.setdefault(pk, len(self.positions))
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, pk):
+        return self.positions[pk]
+
+    def get(self, pk):
+        return self.positions.get(pk)
+
+
+def get_interest_categories(categories):
+    """Map interest keys to the ids of the categories named after them."""
+    mapping = {}
+    for key, label in INTEREST_CHOICES:
+        term = f"-{slugify(str(label))}-"
+        mapping[key] = [pk for pk, slug in categories if term in f"-{slug}-"]
+    return mapping
+
+
+def build_matrix(rows, cols, weights, shape):
+    # Duplicate entries are summed
+    return sparse.coo_matrix(
+        (np.asarray(weights, dtype=np.float32), (rows, cols)), shape=shape
+    ).tocsr()
+
+
+def normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return (sparse.diags(1 / norms) @ matrix).tocsr()
+
+
+def load_interactions(since):
+    """Return the tickets and views since ``since``.
+
+    Both are lists of ``(user_id, event_id, category_id, weight)`` tuples.
+    """
+    tickets = Ticket.objects.filter(
+        created_at__gte=since
+    ).exclude(status='cancelled').values_list('user_id', 'event_id', 'event__category_id')
+    # Views may be on another database, so their categories are looked up apart
+    views = list(EventView.objects.filter(
+        user__isnull=False,
+        timestamp__gte=since
+    ).values_list('user_id', 'event_id').annotate(count=Count('id')))
+    categories = dict(Event.objects.filter(
+        pk__in={event_id for _, event_id, _ in views}
+    ).values_list('pk', 'category_id'))
+    return (
+        [(*ticket, TICKET_WEIGHT) for ticket in tickets],
+        [
+            (user_id, event_id, categories[event_id], VIEW_WEIGHT * float(np.log1p(count)))
+            for user_id, event_id, count in views
+            if event_id in categories
+        ],
+    )
+
+
+def top_events(scores, excluded, count):
+    """Best scoring columns of each row, skipping excluded and unscored ones.
+
+    Columns are ordered by start date, so ties go to the soonest event.
+    """
+    scores[excluded] = 0
+    order = np.argsort(-scores, axis=1, kind='stable')[:, :count]
+    best = np.take_along_axis(scores, order, axis=1)
+    return [row[row_scores > 0] for row, row_scores in zip(order, best, strict=True)]
+
+
+def compute_recommendations(count=RECOMMENDATIONS_PER_USER):
+    """Recompute the recommendations of every user. Returns the number of users."""
+    now = timezone.now()
+    candidates = list(Event.objects.filter(
+        status='published',
+        start_date__gte=now
+    ).order_by('start_date', 'pk').values_list('pk', 'category_id', 'organizer_id'))
+
+    categories = list(Category.objects.values_list('pk', 'slug'))
+    tickets, views = load_interactions(now - timezone.timedelta(days=HISTORY_DAYS))
+    interactions = tickets + views
+    interest_categories = get_interest_categories(categories)
+    interests = [
+        (user_id, category_id)
+        for user_id, keys in User.objects.exclude(interests=[]).values_list('pk', 'interests')
+        for key in keys if key in interest_categories
+        for category_id in interest_categories[key]
+    ]
+
+    user_index = Index([user_id for user_id, *_ in interactions] + [user_id for user_id, _ in interests])
+    if not candidates or not user_index:
+        EventRecommendations.objects.all().delete()
+        return 0
+    # Candidates come first, so they are the first columns of event matrices
+    event_index = Index([pk for pk, _, _ in candidates] + [event_id for _, event_id, _, _ in interactions])
+    category_index = Index(pk for pk, _ in categories)
+    event_categories = {pk: category_id for pk, category_id, _ in candidates}
+    event_categories.update((event_id, category_id) for _, event_id, category_id, _ in interactions)
+    users, events, candidate_count = len(user_index), len(event_index), len(candidates)
+
+    # user x event interactions
+    interaction_matrix = build_matrix(
+        [user_index[user_id] for user_id, *_ in interactions],
+        [event_index[event_id] for _, event_id, *_ in interactions],
+        [weight for *_, weight in interactions],
+        (users, events),
+    )
+    # event x category membership
+    event_category_matrix = build_matrix(
+        [event_index[event_id] for event_id in event_categories],
+        [category_index[category_id] for category_id in event_categories.values()],
+        np.ones(len(event_categories)),
+        (events, len(category_index)),
+    )
+    # user x category profile from interests and interactions
+    interest_matrix = build_matrix(
+        [user_index[user_id] for user_id, _ in interests],
+        [category_index[category_id] for _, category_id in interests],
+        np.full(len(interests), INTEREST_WEIGHT),
+        (users, len(category_index)),
+    )
+    profile = normalize_rows(interest_matrix + interaction_matrix @ event_category_matrix)
+    candidate_categories = event_category_matrix[:candidate_count].T.tocsr()
+
+    # Cosine similarity between every event and the candidates, from the
+    # users who interacted with both
+    normalized_events = normalize_rows(interaction_matrix.T).T.tocsr()
+    similarity = (normalized_events.T @ normalized_events[:, :candidate_count]).tocsr()
+    user_interactions = normalize_rows(interaction_matrix)
+    # Similarity of each candidate with itself: 1 if anyone interacted with it
+    self_similarity = np.asarray(
+        normalized_events[:, :candidate_count].power(2).sum(axis=0)
+    )
+
+    # Events the user already has a ticket for, or organizes
+    excluded_pairs = [
+        (user_index[user_id], event_index[event_id])
+        for user_id, event_id, _, _ in tickets
+        if event_index[event_id] < candidate_count
+    ] + [
+        (user_index.get(organizer_id), event_index[pk])
+        for pk, _, organizer_id in candidates
+        if user_index.get(organizer_id) is not None
+    ]
+    excluded = build_matrix(
+        [row for row, _ in excluded_pairs],
+        [col for _, col in excluded_pairs],
+        np.ones(len(excluded_pairs)),
+        (users, candidate_count),
+    )
+
+    candidate_ids = np.array([pk for pk, _, _ in candidates])
+    user_ids = list(user_index.positions)
+    rows = []
+    for start in range(0, users, USERS_PER_BLOCK):
+        block = slice(start, start + USERS_PER_BLOCK)
+        content = (profile[block] @ candidate_categories).toarray()
+        collaborative = (user_interactions[block] @ similarity).toarray()
+        # An event isn't similar to itself for recommendation purposes
+        collaborative -= user_interactions[block][:, :candidate_count].multiply(
+            self_similarity
+        ).toarray()
+        scores = CONTENT_WEIGHT * content + COLLABORATIVE_WEIGHT * collaborative
+        best = top_events(scores, excluded[block].toarray() > 0, count)
+        rows.extend(
+            EventRecommendations(
+                user_id=user_ids[start + offset],
+                event_ids=candidate_ids[columns].tolist(),
+                computed_at=now
+            )
+            for offset, columns in enumerate(best)
+            if len(columns)
+        )
+
+    EventRecommendations.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['event_ids', 'computed_at']
+    )
+    # Users without recommendations anymore
+    EventRecommendations.objects.filter(computed_at__lt=now).delete()
+    return len(rows)
+
+
+def get_recommended_events(user, limit=6):
+    """The stored recommendations of ``user`` that are still open, best first."""
+    event_ids = EventRecommendations.objects.filter(user=user).values_list(
+        'event_ids', flat=True
+    ).first()
+    if not event_ids:
+        return []
+    events = Event.objects.filter(
+        pk__in=event_ids,
+        status='published',
+        start_date__gte=timezone.now()
+    ).select_related('city', 'category', 'organizer').in_bulk()
+    return [events[pk] for pk in event_ids if pk in events][:limit]
+
+
+async def aget_recommended_events(user, limit=6):
+    """Async ``get_recommended_events``, for async views."""
+    event_ids = await EventRecommendations.objects.filter(user=user).values_list(
+        'event_ids', flat=True
+    ).afirst()
+    if not event_ids:
+        return []
+    events = await Event.objects.filter(
+        pk__in=event_ids,
+        status='published',
+        start_date__gte=timezone.now()
+    ).select_related('city', 'category', 'organizer').ain_bulk()
+    return [events[pk] for pk in event_ids if pk in events][:limit]
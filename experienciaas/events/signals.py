@@ -0,0 +1,205 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+from experienciaas.users.models import Follow
+
+from .models import Event
+from .models import EventPhoto
+from .models import EventSponsor
+from .models import Sponsor
+from .models import Ticket
+
+# Event fields that are encoded in ticket QR codes.
+QR_EVENT_FIELDS = ('title', 'start_date')
+# Event fields that are part of the live seat availability.
+SEAT_EVENT_FIELDS = ('status', 'max_attendees')
+# Event fields that decide if and where an event appears in follower feeds.
+FEED_EVENT_FIELDS = ('status', 'start_date')
+# Event fields shown or filtered on by search suggestions.
+SUGGESTION_EVENT_FIELDS = ('title', 'venue_name', 'status', 'start_date')
+# Event fields keying the cached detail page.
+PAGE_EVENT_FIELDS = ('slug',)
+TRACKED_EVENT_FIELDS = tuple(dict.fromkeys(
+    QR_EVENT_FIELDS + SEAT_EVENT_FIELDS + FEED_EVENT_FIELDS + SUGGESTION_EVENT_FIELDS
+    + PAGE_EVENT_FIELDS
+))
+# Event fields whose updates don't drop the cached detail page (it may show
+# a slightly old view count until it expires).
+UNCACHED_EVENT_FIELDS = frozenset({'views', 'trending_score'})
+
+
+@receiver(post_save, sender=Ticket)
+def pregenerate_ticket_qr_codes(sender, instance, **kwargs):
+    """Render QR images in the background once a ticket is confirmed."""
+    if instance.status != 'confirmed':
+        return
+
+    from .tasks import generate_ticket_qr_codes
+    transaction.on_commit(lambda: generate_ticket_qr_codes.delay(instance.pk))
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def publish_ticket_seat_update(sender, instance, **kwargs):
+    """Push the new seat availability of the ticket's event to live clients."""
+    from .realtime import mark_seats_dirty
+    event_id = instance.event_id
+    transaction.on_commit(lambda: mark_seats_dirty(event_id))
+
+
+@receiver(pre_save, sender=Event)
+def detect_tracked_field_changes(sender, instance, update_fields=None, **kwargs):
+    """Remember which tracked fields are about to change."""
+    instance._changed_fields = set()
+    instance._previous_slug = None
+    if instance.pk is None:
+        return
+    fields = TRACKED_EVENT_FIELDS
+    if update_fields is not None:
+        fields = [field for field in fields if field in update_fields]
+        if not fields:
+            return
+
+    previous = Event.objects.filter(pk=instance.pk).values(*fields).first()
+    if previous is None:
+        return
+    instance._changed_fields = {
+        field for field in fields if previous[field] != getattr(instance, field)
+    }
+    if 'slug' in instance._changed_fields:
+        instance._previous_slug = previous['slug']
+
+
+@receiver(post_save, sender=Event)
+def refresh_event_qr_codes(sender, instance, created, **kwargs):
+    """Refresh ticket QR images when event data encoded in them changed."""
+    changed_fields = getattr(instance, '_changed_fields', set())
+    if created or not changed_fields.intersection(QR_EVENT_FIELDS):
+        return
+
+    from .tasks import generate_event_qr_codes
+    transaction.on_commit(lambda: generate_event_qr_codes.delay(instance.pk))
+
+
+@receiver(post_save, sender=Event)
+def publish_event_seat_update(sender, instance, created, **kwargs):
+    """Push status and capacity changes to live clients."""
+    changed_fields = getattr(instance, '_changed_fields', set())
+    if created or not changed_fields.intersection(SEAT_EVENT_FIELDS):
+        return
+
+    from .realtime import mark_seats_dirty
+    transaction.on_commit(lambda: mark_seats_dirty(instance.pk))
+
+
+@receiver(post_save, sender=Event)
+def notify_followers_on_publish(sender, instance, created, **kwargs):
+    """Notify the organizer's followers when an event gets published."""
+    if instance.status != 'published':
+        return
+    if not created and 'status' not in getattr(instance, '_changed_fields', set()):
+        return
+
+    from .notifications import start_new_event_notifications
+    start_new_event_notifications([instance.pk])
+
+
+@receiver(post_save, sender=Event)
+def update_follower_feeds(sender, instance, created, **kwargs):
+    """Add published events to follower feeds, and remove unpublished ones."""
+    changed_fields = getattr(instance, '_changed_fields', set())
+    if created and instance.status == 'draft':
+        return
+    if not created and not changed_fields.intersection(FEED_EVENT_FIELDS):
+        return
+
+    from .tasks import fan_out_event_to_feeds
+    transaction.on_commit(lambda: fan_out_event_to_feeds.delay(instance.pk))
+
+
+@receiver(post_save, sender=Follow)
+def backfill_follower_feed(sender, instance, created, **kwargs):
+    """Add the upcoming events of a newly followed organizer to the follower's feed."""
+    if not created:
+        return
+
+    from .feed import follow_organizer_feed
+    follower_id, organizer_id = instance.follower_id, instance.organizer_id
+    transaction.on_commit(lambda: follow_organizer_feed(follower_id, organizer_id))
+
+
+@receiver(post_delete, sender=Follow)
+def trim_follower_feed(sender, instance, **kwargs):
+    """Remove the events of an unfollowed organizer from the follower's feed."""
+    from .feed import unfollow_organizer_feed
+    follower_id, organizer_id = instance.follower_id, instance.organizer_id
+    transaction.on_commit(lambda: unfollow_organizer_feed(follower_id, organizer_id))
+
+
+@receiver(post_save, sender=Event)
+def list_trending_event(sender, instance, created, **kwargs):
+    """Add newly listed events to the trending ranking."""
+    if instance.status not in ('published', 'sold_out'):
+        return
+    if not created and 'status' not in getattr(instance, '_changed_fields', set()):
+        return
+
+    from .trending import add_trending_event
+    transaction.on_commit(lambda: add_trending_event(instance.pk))
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def update_search_suggestions(sender, instance, created=False, **kwargs):
+    """Refresh the search suggestions of events whose suggested fields changed."""
+    if created and instance.status == 'draft':
+        return
+    if not created and kwargs['signal'] is post_save and not getattr(
+        instance, '_changed_fields', set()
+    ).intersection(SUGGESTION_EVENT_FIELDS):
+        return
+
+    from .tasks import update_event_suggestions
+    event_id = instance.pk
+    transaction.on_commit(lambda: update_event_suggestions.delay(event_id))
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def drop_cached_event_page(sender, instance, update_fields=None, **kwargs):
+    """Drop the cached detail page of a changed event, under its old slug too."""
+    if update_fields is not None and set(update_fields) <= UNCACHED_EVENT_FIELDS:
+        return
+
+    from .page_cache import delete_cached_pages
+    slugs = {instance.slug, getattr(instance, '_previous_slug', None)} - {None}
+    transaction.on_commit(lambda: delete_cached_pages(slugs))
+
+
+@receiver(post_save, sender=EventSponsor)
+@receiver(post_delete, sender=EventSponsor)
+@receiver(post_save, sender=EventPhoto)
+@receiver(post_delete, sender=EventPhoto)
+def drop_cached_page_of_event(sender, instance, **kwargs):
+    """Drop the cached detail page showing a sponsorship or photo."""
+    from .page_cache import delete_cached_pages
+    event_id = instance.event_id
+    transaction.on_commit(lambda: delete_cached_pages(
+        Event.objects.filter(pk=event_id).values_list('slug', flat=True)
+    ))
+
+
+@receiver(post_save, sender=Sponsor)
+def drop_cached_pages_of_sponsor(sender, instance, created, **kwargs):
+    """Drop the cached detail pages of the events a sponsor sponsors."""
+    if created:
+        return
+
+    from .page_cache import delete_cached_pages
+    sponsor_id = instance.pk
+    transaction.on_commit(lambda: delete_cached_pages(
+        Event.objects.filter(event_sponsors__sponsor_id=sponsor_id).values_list('slug', flat=True)
+    ))
@@ -0,0 +1,216 @@
+"""Sitemaps of the public catalog: events, organizers, suppliers, cities and categories.
+
+``sitemap.xml`` is an index of shards of up to ``SHARD_SIZE`` URLs each. A
+section's items are split by primary key, shard ``n`` holding the pks from
+``n * SHARD_SIZE + 1`` to ``(n + 1) * SHARD_SIZE``, so new items only ever
+land in the last shards and a change touches a single shard.
+
+Shards are generated by streaming ``values_list('slug', <lastmod>)`` through
+``.iterator()`` and cached with a fingerprint of their slice: the number of
+items, the number of dated rows and the latest lastmod. Serving a shard costs
+one aggregate over its pk range; it's regenerated only when the fingerprint
+no longer matches, i.e. when an item of the slice was added, removed, hidden
+or saved. The index takes one grouped aggregate per section.
+
+Events, organizers and suppliers are dated by their ``updated_at``; cities
+and categories by the latest ``updated_at`` of their listed events.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models import F
+from django.db.models import Max
+from django.db.models import Q
+from django.http import Http404
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.html import escape
+from django.views.decorators.http import require_safe
+
+from experienciaas.users.models import OrganizerProfile
+from experienciaas.users.models import SupplierProfile
+from experienciaas.utils.public_pages import public_page
+from experienciaas.utils.replicas import replica_reads
+
+from .models import Category, City, Event
+from .views import LISTED_STATUSES
+
+# Most URLs a sitemap may list
+SHARD_SIZE = 50000
+CHUNK_SIZE = 2000
+SHARD_KEY = 'sitemaps:{section}:{shard}:{base_url}'
+CONTENT_TYPE = 'application/xml; charset=utf-8'
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+class SitemapSection:
+    """Items of one model listed in the sitemaps, by slug."""
+    name = None
+    url_name = None
+    url_kwarg = 'slug'
+    lastmod = 'updated_at'
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def get_fingerprint_fields(self):
+        return {
+            'items': Count('pk', distinct=True),
+            'dated': Count(self.lastmod),
+            'lastmod': Max(self.lastmod),
+        }
+
+    def get_fingerprints(self):
+        """Fingerprints of the non-empty shards, by shard number."""
+        rows = self.get_queryset().annotate(
+            shard=(F('pk') - 1) / SHARD_SIZE
+        ).values('shard').annotate(**self.get_fingerprint_fields()).order_by('shard')
+        return {row.pop('shard'): row for row in rows}
+
+    def get_shard_queryset(self, shard):
+        return self.get_queryset().filter(
+            pk__gt=shard * SHARD_SIZE, pk__lte=(shard + 1) * SHARD_SIZE
+        )
+
+    def get_fingerprint(self, shard):
+        return self.get_shard_queryset(shard).aggregate(**self.get_fingerprint_fields())
+
+    def get_items(self, shard):
+        """``(slug, lastmod)`` of the items of a shard."""
+        return self.get_shard_queryset(shard).order_by('pk').values_list('slug', self.lastmod)
+
+    def get_location(self, slug):
+        return reverse(self.url_name, kwargs={self.url_kwarg: slug})
+
+
+class EventSection(SitemapSection):
+    name = 'events'
+    url_name = 'events:detail'
+
+    def get_queryset(self):
+        return Event.objects.filter(status__in=LISTED_STATUSES)
+
+
+class OrganizerSection(SitemapSection):
+    name = 'organizers'
+    url_name = 'users:organizer_profile'
+
+    def get_queryset(self):
+        return OrganizerProfile.objects.filter(is_public=True)
+
+
+class SupplierSection(SitemapSection):
+    name = 'suppliers'
+    url_name = 'users:supplier_profile'
+
+    def get_queryset(self):
+        return SupplierProfile.objects.filter(is_public=True, status='approved')
+
+
+class EventPlaceSection(SitemapSection):
+    """Cities and categories, dated by their latest listed event."""
+    lastmod = 'events__updated_at'
+
+    def get_fingerprint_fields(self):
+        listed = Q(events__status__in=LISTED_STATUSES)
+        return {
+            'items': Count('pk', distinct=True),
+            'dated': Count('events', filter=listed),
+            'lastmod': Max(self.lastmod, filter=listed),
+        }
+
+    def get_items(self, shard):
+        return self.get_shard_queryset(shard).order_by('pk').annotate(
+            lastmod=Max(self.lastmod, filter=Q(events__status__in=LISTED_STATUSES))
+        ).values_list('slug', 'lastmod')
+
+
+class CitySection(EventPlaceSection):
+    name = 'cities'
+    url_name = 'events:by_location'
+    url_kwarg = 'city_slug'
+
+    def get_queryset(self):
+        return City.objects.filter(is_active=True)
+
+
+class CategorySection(EventPlaceSection):
+    name = 'categories'
+    url_name = 'events:by_category'
+    url_kwarg = 'category_slug'
+
+    def get_queryset(self):
+        return Category.objects.filter(is_active=True)
+
+
+SECTIONS = {
+    section.name: section
+    for section in (EventSection(), OrganizerSection(), SupplierSection(), CitySection(), CategorySection())
+}
+
+
+def format_lastmod(lastmod):
+    return f'<lastmod>{lastmod.isoformat(timespec="seconds")}</lastmod>' if lastmod else ''
+
+
+def render_index(base_url):
+    parts = [XML_HEADER, f'<sitemapindex xmlns="{XMLNS}">\n']
+    for name, section in SECTIONS.items():
+        for shard, fingerprint in section.get_fingerprints().items():
+            location = reverse('events:sitemap_shard', kwargs={'section': name, 'shard': shard})
+            parts.append(
+                f'<sitemap><loc>{escape(base_url + location)}</loc>'
+                f'{format_lastmod(fingerprint["lastmod"])}</sitemap>\n'
+            )
+    parts.append('</sitemapindex>\n')
+    return ''.join(parts)
+
+
+def render_shard(section, shard, base_url):
+    parts = [XML_HEADER, f'<urlset xmlns="{XMLNS}">\n']
+    for slug, lastmod in section.get_items(shard).iterator(chunk_size=CHUNK_SIZE):
+        parts.append(
+            f'<url><loc>{escape(base_url + section.get_location(slug))}</loc>'
+            f'{format_lastmod(lastmod)}</url>\n'
+        )
+    parts.append('</urlset>\n')
+    return ''.join(parts)
+
+
+def get_shard(section, shard, base_url):
+    """The shard's sitemap, regenerated only when its slice changed."""
+    fingerprint = section.get_fingerprint(shard)
+    if not fingerprint['items']:
+        return None
+    key = SHARD_KEY.format(section=section.name, shard=shard, base_url=base_url)
+    cached = cache.get(key)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    content = render_shard(section, shard, base_url)
+    cache.set(key, (fingerprint, content), settings.SITEMAP_CACHE_TIMEOUT)
+    return content
+
+
+def get_base_url(request):
+    return request.build_absolute_uri('/')[:-1]
+
+
+@require_safe
+@public_page
+@replica_reads
+def sitemap_index(request):
+    return HttpResponse(render_index(get_base_url(request)), content_type=CONTENT_TYPE)
+
+
+@require_safe
+@public_page
+@replica_reads
+def sitemap_shard(request, section, shard):
+    if section not in SECTIONS:
+        raise Http404
+    content = get_shard(SECTIONS[section], shard, get_base_url(request))
+    if content is None:
+        raise Http404
+    return HttpResponse(content, content_type=CONTENT_TYPE)
@@ -0,0 +1,324 @@
+"""Search-as-you-type suggestions.
+
+Suggestions come from the titles and venues of listed events, city and
+category names and popular normalized searches, grouped in *sources* (one per
+event, city, category, plus the popular searches).
+
+Each process keeps an index of the suggestions in memory: a sorted list of
+normalized keys, one per word position of every suggestion, searched with
+``bisect``, so "parque" finds "Rock en el parque". Answering a prefix costs
+one binary search and a bounded scan.
+
+Indexes are kept current with *deltas*, the new state of one source, numbered
+by a sequence in the cache. Event saves publish the event's delta, and
+``rebuild_search_suggestions`` periodically rebuilds every source, publishes
+the ones that changed and stores the full snapshot for processes that start
+or fall behind. At most every ``VERSION_CHECK_INTERVAL`` seconds a process
+reads the sequence and applies the deltas it hasn't seen, editing its index
+in place. Requests never read the database to build suggestions: until a
+snapshot exists they get none, and one is requested from the worker.
+"""
+import time
+from bisect import bisect_left
+from bisect import insort
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import urlencode
+
+from experienciaas.analytics.searches import get_popular_searches
+from experienciaas.analytics.searches import normalize_search_query
+
+from .models import Category, City, Event
+
+SEQUENCE_KEY = 'suggestions:sequence'
+DELTA_KEY = 'suggestions:delta:{sequence}'
+SNAPSHOT_KEY = 'suggestions:snapshot'
+REBUILD_KEY = 'suggestions:rebuild'
+# Deltas outlive the interval of the periodic rebuild, whose snapshot
+# includes them.
+DELTA_TIMEOUT = 60 * 60
+VERSION_CHECK_INTERVAL = 1
+# Processes further behind reload the snapshot.
+MAX_DELTAS = 1000
+# Source key of the delta telling processes to reload the snapshot.
+RELOAD = None
+
+MIN_PREFIX_LENGTH = 2
+# Keys looked at per prefix, bounding the work of very short prefixes.
+MAX_SCANNED = 200
+POPULAR_SEARCHES = 500
+
+EVENT_WEIGHT = 30
+VENUE_WEIGHT = 5
+CITY_WEIGHT = 20
+CATEGORY_WEIGHT = 20
+
+LISTED_STATUSES = ('published', 'sold_out')
+
+
+def list_url(**params):
+    return f"{reverse('events:list')}?{urlencode(params)}"
+
+
+def get_event_source(event):
+    """Suggestions of a listed event, or ``None`` if it isn't listed."""
+    if event.status not in LISTED_STATUSES or event.start_date < timezone.now():
+        return None
+    suggestions = [(event.title, 'event', event.get_absolute_url(), EVENT_WEIGHT)]
+    if event.venue_name:
+        suggestions.append((event.venue_name, 'venue', list_url(search=event.venue_name), VENUE_WEIGHT))
+    return suggestions
+
+
+def build_sources():
+    """Every suggestion source, read from the database."""
+    sources = {}
+    events = Event.objects.filter(
+        status__in=LISTED_STATUSES,
+        start_date__gte=timezone.now()
+    ).only('pk', 'title', 'slug', 'venue_name', 'status', 'start_date')
+    for event in events.iterator(chunk_size=2000):
+        sources[f"event:{event.pk}"] = get_event_source(event)
+    for pk, name, slug in City.objects.filter(is_active=True).values_list('pk', 'name', 'slug'):
+        sources[f"city:{pk}"] = [(name, 'city', list_url(city=slug), CITY_WEIGHT)]
+    for pk, name, slug in Category.objects.filter(is_active=True).values_list('pk', 'name', 'slug'):
+        sources[f"category:{pk}"] = [(name, 'category', list_url(category=slug), CATEGORY_WEIGHT)]
+    sources['searches'] = [
+        (search['query'], 'search', list_url(search=search['query']), search['count'])
+        for search in get_popular_searches(days=30, limit=POPULAR_SEARCHES)
+    ]
+    return sources
+
+
+class SuggestionIndex:
+    """Sorted prefix index over suggestions, updated one source at a time."""
+
+    def __init__(self, sources=None):
+        self.sources = {}
+        # Suggestions by (kind, normalized text): source key -> (text, url, weight)
+        self.providers = {}
+        self.positions = {}
+        self.suggestions = []
+        self.free_positions = []
+        # (key, inner, position), inner keys start after the first word
+        self.keys = []
+        for source_key, suggestions in (sources or {}).items():
+            self.add_source(source_key, suggestions)
+        for name in self.providers:
+            self.refresh(name, sort=False)
+        self.keys.sort()
+
+    def add_source(self, source_key, suggestions):
+        self.sources[source_key] = suggestions
+        names = set()
+        for text, kind, url, weight in suggestions:
+            normalized = normalize_search_query(text)
+            if not normalized:
+                continue
+            name = (kind, normalized)
+            # The same text from several sources is suggested once
+            providers = self.providers.setdefault(name, {})
+            if source_key not in providers or providers[source_key][2] < weight:
+                providers[source_key] = (text, url, weight)
+            names.add(name)
+        return names
+
+    def remove_source(self, source_key):
+        names = set()
+        for text, kind, _url, _weight in self.sources.pop(source_key, None) or ():
+            name = (kind, normalize_search_query(text))
+            if name in self.providers:
+                self.providers[name].pop(source_key, None)
+                names.add(name)
+        return names
+
+    def update(self, source_key, suggestions):
+        """Replace the suggestions of a source, ``None`` removing it."""
+        names = self.remove_source(source_key)
+        if suggestions:
+            names |= self.add_source(source_key, suggestions)
+        for name in names:
+            self.refresh(name)
+
+    def get_keys(self, normalized, position):
+        words = normalized.split()
+        return [(' '.join(words[start:]), start > 0, position) for start in range(len(words))]
+
+    def refresh(self, name, sort=True):
+        """Bring the suggestion of ``name`` in line with its providers."""
+        kind, normalized = name
+        position = self.positions.get(name)
+        providers = self.providers.get(name)
+        if not providers:
+            self.providers.pop(name, None)
+            if position is not None:
+                for key in self.get_keys(normalized, position):
+                    del self.keys[bisect_left(self.keys, key)]
+                del self.positions[name]
+                self.suggestions[position] = None
+                self.free_positions.append(position)
+            return
+
+        text, url, weight = max(providers.values(), key=lambda provider: provider[2])
+        if position is None:
+            if self.free_positions:
+                position = self.free_positions.pop()
+            else:
+                position = len(self.suggestions)
+                self.suggestions.append(None)
+            self.positions[name] = position
+            for key in self.get_keys(normalized, position):
+                if sort:
+                    insort(self.keys, key)
+                else:
+                    self.keys.append(key)
+        self.suggestions[position] = (text, kind, url, weight)
+
+    def search(self, query, limit=8):
+        prefix = normalize_search_query(query)
+        if len(prefix) < MIN_PREFIX_LENGTH:
+            return []
+
+        start = bisect_left(self.keys, (prefix,))
+        matches = {}
+        for index in range(start, min(start + MAX_SCANNED, len(self.keys))):
+            key, inner, position = self.keys[index]
+            if not key.startswith(prefix):
+                break
+            matches[position] = min(matches.get(position, True), inner)
+
+        # Matches at the start of the text first, then by weight
+        ranked = sorted(
+            matches,
+            key=lambda position: (
+                matches[position], -self.suggestions[position][3], self.suggestions[position][0]
+            )
+        )
+        return [
+            {'text': text, 'kind': kind, 'url': url}
+            for text, kind, url, _ in (self.suggestions[position] for position in ranked[:limit])
+        ]
+
+
+def get_sequence():
+    return cache.get(SEQUENCE_KEY) or 0
+
+
+def publish_delta(source_key, suggestions):
+    """Publish the new suggestions of a source. Returns the delta's sequence."""
+    cache.add(SEQUENCE_KEY, 0, timeout=None)
+    sequence = cache.incr(SEQUENCE_KEY)
+    cache.set(DELTA_KEY.format(sequence=sequence), (source_key, suggestions), DELTA_TIMEOUT)
+    return sequence
+
+
+def rebuild_suggestions():
+    """Rebuild every source and publish the ones that changed.
+
+    Returns the sequence of the deltas included in the new snapshot.
+    """
+    # Deltas published from now on are applied over the snapshot
+    sequence = get_sequence()
+    sources = build_sources()
+    snapshot = cache.get(SNAPSHOT_KEY)
+    if snapshot is None:
+        cache.set(SNAPSHOT_KEY, {'sequence': sequence, 'sources': sources}, timeout=None)
+        publish_delta(RELOAD, None)
+        return sequence
+
+    previous = snapshot['sources']
+    cache.set(SNAPSHOT_KEY, {'sequence': sequence, 'sources': sources}, timeout=None)
+    for source_key in previous.keys() - sources.keys():
+        publish_delta(source_key, None)
+    for source_key, suggestions in sources.items():
+        if previous.get(source_key) != suggestions:
+            publish_delta(source_key, suggestions)
+    return sequence
+
+
+def update_event_suggestions(event_id):
+    """Publish the suggestions of a saved or deleted event."""
+    event = Event.objects.filter(pk=event_id).first()
+    source = get_event_source(event) if event is not None else None
+    return publish_delta(f"event:{event_id}", source)
+
+
+def request_rebuild():
+    """Have a worker build the missing snapshot, at most once a minute."""
+    from .tasks import rebuild_search_suggestions
+
+    if cache.add(REBUILD_KEY, 1, timeout=60):
+        rebuild_search_suggestions.delay()
+
+
+_index = None
+_sequence = 0
+_checked_at = 0.0
+
+
+def load_snapshot():
+    """The index of the snapshot and its sequence, ``None`` without one."""
+    snapshot = cache.get(SNAPSHOT_KEY)
+    if snapshot is None:
+        request_rebuild()
+        return None
+    return SuggestionIndex(snapshot['sources']), snapshot['sequence']
+
+
+def apply_deltas(index, applied, sequence, loaded=False):
+    """Apply the deltas after ``applied`` up to ``sequence``.
+
+    Returns the sequence applied, and ``None`` if the snapshot must be
+    reloaded, unless ``index`` was just ``loaded`` from it. Deltas published but not written yet end the run; missing
+    deltas followed by written ones expired and are skipped.
+    """
+    numbers = range(applied + 1, sequence + 1)
+    deltas = cache.get_many([DELTA_KEY.format(sequence=number) for number in numbers])
+    last_written = max(
+        (number for number in numbers if DELTA_KEY.format(sequence=number) in deltas), default=applied
+    )
+    for number in range(applied + 1, last_written + 1):
+        delta = deltas.get(DELTA_KEY.format(sequence=number))
+        if delta is None:
+            continue
+        source_key, suggestions = delta
+        if source_key is RELOAD:
+            if not loaded:
+                return None
+            continue
+        index.update(source_key, suggestions)
+    return last_written
+
+
+def get_index():
+    """The current index, refreshed with the latest deltas."""
+    global _index, _sequence, _checked_at  # noqa: PLW0603
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < VERSION_CHECK_INTERVAL:
+        return _index
+    # Deltas missed while idle may have expired
+    stale = now - _checked_at > DELTA_TIMEOUT
+    _checked_at = now
+
+    sequence = get_sequence()
+    if _index is not None and not stale and sequence - _sequence <= MAX_DELTAS:
+        if sequence == _sequence:
+            return _index
+        applied = apply_deltas(_index, _sequence, sequence)
+        if applied is not None:
+            _sequence = applied
+            return _index
+
+    loaded = load_snapshot()
+    if loaded is None:
+        # Stale suggestions beat none
+        return _index or SuggestionIndex()
+    index, applied = loaded
+    _index, _sequence = index, apply_deltas(index, applied, sequence, loaded=True)
+    return _index
+
+
+def get_suggestions(query, limit=8):
+    return get_index().search(query, limit)
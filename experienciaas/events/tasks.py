@@ -0,0 +1,137 @@
+import smtplib
+import tempfile
+
+from celery import shared_task
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .models import Event, EventNotificationFanout, Ticket
+
+
+@shared_task()
+def generate_ticket_qr_codes(ticket_id):
+    """Pre-render the QR images of a confirmed ticket."""
+    ticket = Ticket.objects.select_related('event').filter(
+        pk=ticket_id,
+        status='confirmed'
+    ).first()
+    if ticket is None:
+        return None
+
+    from .qr import ensure_ticket_qr_codes
+    return ensure_ticket_qr_codes(ticket)
+
+
+@shared_task()
+def generate_event_qr_codes(event_id):
+    """Refresh the QR images of every confirmed ticket of an event.
+
+    Tickets whose payload didn't change keep their existing images.
+    """
+    from .qr import ensure_ticket_qr_codes
+
+    tickets = Ticket.objects.filter(
+        event_id=event_id,
+        status='confirmed'
+    ).select_related('event')
+    count = 0
+    for ticket in tickets.iterator(chunk_size=500):
+        ensure_ticket_qr_codes(ticket)
+        count += 1
+    return count
+
+
+@shared_task(bind=True, soft_time_limit=60 * 60, time_limit=60 * 65)
+def export_event_tickets(self, event_id, processes=None, batch_size=None):
+    """Render the printable tickets of an event into a ZIP in the default storage.
+
+    Progress is reported through the task state as ``{'done': n, 'total': m}``.
+    Returns the storage path of the archive.
+    """
+    from .printing import DEFAULT_BATCH_SIZE
+    from .printing import export_event_tickets as render_archive
+
+    event = Event.objects.select_related('city').get(pk=event_id)
+
+    def report_progress(done, total):
+        if not self.request.is_eager:
+            self.update_state(state='PROGRESS', meta={'done': done, 'total': total})
+
+    with tempfile.TemporaryFile() as archive:
+        render_archive(
+            event,
+            archive,
+            processes=processes,
+            batch_size=batch_size or DEFAULT_BATCH_SIZE,
+            progress=report_progress,
+        )
+        archive.seek(0)
+        timestamp = timezone.now().strftime('%Y%m%d%H%M%S')
+        path = f"tickets/exports/{event.slug}-{timestamp}.zip"
+        return default_storage.save(path, File(archive))
+
+
+@shared_task(ignore_result=True)
+def publish_seat_updates():
+    """Publish the seat availability of events whose tickets changed."""
+    from .realtime import flush_seat_updates
+    return flush_seat_updates()
+
+
+@shared_task(
+    autoretry_for=(smtplib.SMTPException, OSError),
+    retry_backoff=True,
+    max_retries=8,
+    ignore_result=True,
+)
+def send_new_event_notifications(event_id):
+    """Notify one chunk of the organizer's followers, then queue the next one."""
+    from .notifications import process_notification_chunk
+    if process_notification_chunk(event_id):
+        send_new_event_notifications.delay(event_id)
+
+
+@shared_task(ignore_result=True)
+def resume_new_event_notifications():
+    """Re-queue unfinished fan-outs, e.g. after a worker was lost. Safe to run periodically."""
+    event_ids = EventNotificationFanout.objects.exclude(
+        status='completed'
+    ).values_list('event_id', flat=True)
+    for event_id in event_ids:
+        send_new_event_notifications.delay(event_id)
+
+
+@shared_task(ignore_result=True)
+def fan_out_event_to_feeds(event_id):
+    """Write a published or changed event to the feeds of the organizer's followers."""
+    from .feed import update_event_feeds
+    return update_event_feeds(event_id)
+
+
+@shared_task(ignore_result=True, soft_time_limit=60 * 30, time_limit=60 * 35)
+def compute_event_recommendations():
+    """Recompute the event recommendations of every user. Meant to run periodically."""
+    from .recommendations import compute_recommendations
+    return compute_recommendations()
+
+
+@shared_task(ignore_result=True)
+def checkpoint_trending_scores():
+    """Save the trending scores to the database. Meant to run every few minutes."""
+    from .trending import checkpoint_trending_scores as checkpoint
+    return checkpoint()
+
+
+@shared_task(ignore_result=True)
+def update_event_suggestions(event_id):
+    """Publish the search suggestions of a saved or deleted event."""
+    from .suggestions import update_event_suggestions as update
+    update(event_id)
+
+
+@shared_task(ignore_result=True)
+def rebuild_search_suggestions():
+    """Rebuild every search suggestion. Meant to run every few minutes."""
+    from .suggestions import rebuild_suggestions
+    return rebuild_suggestions()
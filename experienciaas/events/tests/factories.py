@@ -0,0 +1,59 @@
+import datetime
+
+from django.utils import timezone
+from factory import Faker
+from factory import LazyAttribute
+from factory import LazyFunction
+from factory import Sequence
+from factory import SubFactory
+from factory.django import DjangoModelFactory
+
+from experienciaas.events.models import Category
+from experienciaas.events.models import City
+from experienciaas.events.models import Event
+from experienciaas.events.models import Ticket
+from experienciaas.users.tests.factories import UserFactory
+
+
+class CityFactory(DjangoModelFactory[City]):
+    name = Sequence(lambda n: f"City {n}")
+    country = "Colombia"
+
+    class Meta:
+        model = City
+        django_get_or_create = ["name"]
+
+
+class CategoryFactory(DjangoModelFactory[Category]):
+    name = Sequence(lambda n: f"Category {n}")
+
+    class Meta:
+        model = Category
+        django_get_or_create = ["name"]
+
+
+class EventFactory(DjangoModelFactory[Event]):
+    title = Sequence(lambda n: f"Event {n}")
+    description = Faker("paragraph")
+    organizer = SubFactory(UserFactory)
+    category = SubFactory(CategoryFactory)
+    city = SubFactory(CityFactory)
+    start_date = LazyFunction(lambda: timezone.now() + datetime.timedelta(days=7))
+    end_date = LazyAttribute(lambda o: o.start_date + datetime.timedelta(hours=3))
+    venue_name = Faker("company")
+    address = Faker("address")
+    status = "published"
+
+    class Meta:
+        model = Event
+
+
+class TicketFactory(DjangoModelFactory[Ticket]):
+    event = SubFactory(EventFactory)
+    user = SubFactory(UserFactory)
+    attendee_name = Faker("name")
+    attendee_email = Faker("email")
+    status = "confirmed"
+
+    class Meta:
+        model = Ticket
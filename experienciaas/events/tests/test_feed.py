@@ -0,0 +1,92 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from experienciaas.events import feed
+from experienciaas.events.feed import Feed
+from experienciaas.events.tests.factories import EventFactory
+from experienciaas.users.models import Follow
+from experienciaas.users.models import OrganizerProfile
+from experienciaas.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def organizer():
+    profile = OrganizerProfile.objects.create(user=UserFactory())
+    return profile.user
+
+
+def test_feed_lists_upcoming_events_of_followed_organizers(user, organizer):
+    Follow.objects.create(follower=user, organizer=organizer.organizer_profile)
+    later = EventFactory(organizer=organizer)
+    sooner = EventFactory(
+        organizer=organizer, start_date=timezone.now() + datetime.timedelta(days=1)
+    )
+    EventFactory(organizer=organizer, status="draft")
+    EventFactory(
+        organizer=organizer, start_date=timezone.now() - datetime.timedelta(days=1)
+    )
+    EventFactory()
+
+    events = Feed(user)
+
+    assert events.count() == 2  # noqa: PLR2004
+    assert events[0:10] == [sooner, later]
+
+
+def test_feed_page(client, user, organizer):
+    Follow.objects.create(follower=user, organizer=organizer.organizer_profile)
+    event = EventFactory(organizer=organizer)
+    client.force_login(user)
+
+    response = client.get(reverse("events:feed"))
+
+    assert response.status_code == 200  # noqa: PLR2004
+    assert list(response.context["events"]) == [event]
+
+
+def test_feed_api(client, user, organizer):
+    Follow.objects.create(follower=user, organizer=organizer.organizer_profile)
+    event = EventFactory(organizer=organizer)
+    client.force_login(user)
+
+    response = client.get(reverse("api:feed-list"), {"limit": 5})
+
+    assert response.status_code == 200  # noqa: PLR2004
+    assert response.json()["count"] == 1
+    assert response.json()["results"][0]["id"] == event.pk
+
+
+def test_feeds_are_written_on_publish_and_follow(
+    monkeypatch, django_capture_on_commit_callbacks, user, organizer
+):
+    calls = []
+    monkeypatch.setattr(
+        feed, "update_event_feeds", lambda pk: calls.append(("event", pk))
+    )
+    monkeypatch.setattr(
+        feed, "follow_organizer_feed", lambda *args: calls.append(("follow", *args))
+    )
+    monkeypatch.setattr(
+        feed, "unfollow_organizer_feed", lambda *args: calls.append(("unfollow", *args))
+    )
+    profile = organizer.organizer_profile
+
+    with django_capture_on_commit_callbacks(execute=True):
+        follow = Follow.objects.create(follower=user, organizer=profile)
+        event = EventFactory(organizer=organizer, status="draft")
+    with django_capture_on_commit_callbacks(execute=True):
+        event.status = "published"
+        event.save()
+    with django_capture_on_commit_callbacks(execute=True):
+        follow.delete()
+
+    assert calls == [
+        ("follow", user.pk, profile.pk),
+        ("event", event.pk),
+        ("unfollow", user.pk, profile.pk),
+    ]
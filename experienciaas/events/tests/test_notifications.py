@@ -0,0 +1,163 @@
+import datetime
+import smtplib
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from experienciaas.events.models import EventNotificationDelivery
+from experienciaas.events.models import EventNotificationFanout
+from experienciaas.events.notifications import process_notification_chunk
+from experienciaas.events.notifications import send_notifications
+from experienciaas.events.tests.factories import EventFactory
+from experienciaas.users.models import Follow
+from experienciaas.users.models import OrganizerProfile
+from experienciaas.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def organizer():
+    user = UserFactory()
+    OrganizerProfile.objects.create(user=user)
+    return user
+
+
+def follow(organizer, **kwargs):
+    follower = UserFactory(**kwargs)
+    Follow.objects.create(follower=follower, organizer=organizer.organizer_profile)
+    return follower
+
+
+def test_publishing_notifies_followers(organizer, django_capture_on_commit_callbacks):
+    followers = [follow(organizer) for _ in range(3)]
+    inactive = follow(organizer, is_active=False)
+    event = EventFactory(organizer=organizer, status="draft")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        event.status = "published"
+        event.save()
+
+    assert sorted(message.to[0] for message in mail.outbox) == sorted(
+        user.email for user in followers
+    )
+    assert event.title in mail.outbox[0].subject
+    assert event.get_absolute_url() in mail.outbox[0].body
+    fanout = EventNotificationFanout.objects.get(event=event)
+    assert fanout.status == "completed"
+    assert fanout.sent_count == len(followers)
+    assert not EventNotificationDelivery.objects.filter(user=inactive).exists()
+
+
+def test_fanout_is_chunked_resumable_and_idempotent(organizer):
+    followers = [follow(organizer) for _ in range(5)]
+    event = EventFactory(organizer=organizer, status="draft")
+    EventNotificationFanout.objects.create(event=event)
+    # Already notified before an interruption
+    EventNotificationDelivery.objects.create(event=event, user=followers[0], status="sent")
+
+    assert process_notification_chunk(event.pk, chunk_size=2, rate_limit=0)
+    fanout = EventNotificationFanout.objects.get(event=event)
+    assert fanout.status == "running"
+    assert len(mail.outbox) == 1
+
+    while process_notification_chunk(event.pk, chunk_size=2, rate_limit=0):
+        pass
+
+    assert sorted(message.to[0] for message in mail.outbox) == sorted(
+        user.email for user in followers[1:]
+    )
+    assert EventNotificationFanout.objects.get(event=event).status == "completed"
+    assert not process_notification_chunk(event.pk, chunk_size=2, rate_limit=0)
+    assert len(mail.outbox) == len(followers) - 1
+
+
+def test_connection_lost_mid_chunk_keeps_sent_deliveries(organizer, monkeypatch):
+    followers = [follow(organizer) for _ in range(4)]
+    event = EventFactory(organizer=organizer, status="draft")
+    EventNotificationFanout.objects.create(event=event)
+    send_messages = EmailBackend.send_messages
+
+    def disconnect_after_two(self, messages):
+        if len(mail.outbox) == 2:  # noqa: PLR2004
+            raise smtplib.SMTPServerDisconnected
+        return send_messages(self, messages)
+
+    monkeypatch.setattr(EmailBackend, "send_messages", disconnect_after_two)
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        process_notification_chunk(event.pk, chunk_size=4, rate_limit=0)
+
+    fanout = EventNotificationFanout.objects.get(event=event)
+    assert EventNotificationDelivery.objects.filter(event=event, status="sent").count() == 2  # noqa: PLR2004
+    assert fanout.sent_count == 2  # noqa: PLR2004
+    assert fanout.last_follow_id == 0
+    assert fanout.leased_until is None
+
+    # The retry sends only to the followers not notified yet
+    monkeypatch.setattr(EmailBackend, "send_messages", send_messages)
+    while process_notification_chunk(event.pk, chunk_size=4, rate_limit=0):
+        pass
+
+    assert sorted(message.to[0] for message in mail.outbox) == sorted(user.email for user in followers)
+    assert EventNotificationFanout.objects.get(event=event).sent_count == len(followers)
+
+
+def test_deliveries_are_saved_in_batches(organizer):
+    followers = [follow(organizer) for _ in range(5)]
+    event = EventFactory(organizer=organizer, status="draft")
+    recipients = [(user.pk, user.email, user.name) for user in followers]
+
+    with CaptureQueriesContext(connection) as queries:
+        deliveries = list(send_notifications(event, recipients, rate_limit=0, flush_size=2))
+
+    inserts = [
+        query for query in queries
+        if query["sql"].startswith('INSERT INTO "events_eventnotificationdelivery"')
+    ]
+    assert len(deliveries) == len(followers)
+    assert len(inserts) == 3  # noqa: PLR2004
+    assert EventNotificationDelivery.objects.filter(event=event).count() == len(followers)
+
+
+def test_leased_fanout_is_left_to_its_worker(organizer):
+    follow(organizer)
+    event = EventFactory(organizer=organizer, status="draft")
+    EventNotificationFanout.objects.create(
+        event=event, leased_until=timezone.now() + datetime.timedelta(minutes=1)
+    )
+
+    assert not process_notification_chunk(event.pk, rate_limit=0)
+    assert not mail.outbox
+
+
+def test_bulk_publish_notifies_followers(
+    client: Client,
+    organizer,
+    django_capture_on_commit_callbacks,
+):
+    follower = follow(organizer)
+    events = EventFactory.create_batch(2, organizer=organizer, status="draft")
+    organizer.is_superuser = organizer.is_staff = True
+    organizer.save()
+    client.force_login(organizer)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(
+            reverse("events:admin_bulk_actions"),
+            {"action": "publish", "selected_events": [event.pk for event in events]},
+        )
+
+    assert len(mail.outbox) == len(events)
+    assert {message.to[0] for message in mail.outbox} == {follower.email}
+
+
+def test_unfinished_fanouts_are_resumed_periodically(settings):
+    tasks = [entry["task"] for entry in settings.CELERY_BEAT_SCHEDULE.values()]
+
+    assert "experienciaas.events.tasks.resume_new_event_notifications" in tasks
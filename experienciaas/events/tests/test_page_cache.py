@@ -0,0 +1,119 @@
+import datetime
+
+import pytest
+from django.core.cache import cache
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from experienciaas.analytics.models import EventView
+from experienciaas.events.models import EventPhoto
+from experienciaas.events.models import EventSponsor
+from experienciaas.events.models import Sponsor
+from experienciaas.events.page_cache import CSRF_PLACEHOLDER
+from experienciaas.events.page_cache import get_page_key
+from experienciaas.events.tests.factories import EventFactory
+
+pytestmark = pytest.mark.django_db
+
+BROWSER = "Mozilla/5.0 (X11; Linux x86_64) Firefox/128.0"
+
+
+@pytest.fixture(autouse=True)
+def _cache():
+    cache.clear()
+
+
+def get_page(client, event):
+    response = client.get(event.get_absolute_url(), headers={"user-agent": BROWSER})
+    assert response.status_code == 200  # noqa: PLR2004
+    return response.content.decode()
+
+
+def test_anonymous_pages_are_served_from_the_cache(client, django_assert_max_num_queries):
+    event = EventFactory()
+    get_page(client, event)
+
+    with django_assert_max_num_queries(0):
+        content = get_page(Client(), event)
+
+    assert event.title in content
+    assert CSRF_PLACEHOLDER not in content
+
+
+def test_pages_of_users_are_not_cached(client, user):
+    event = EventFactory()
+    client.force_login(user)
+
+    get_page(client, event)
+
+    assert cache.get(get_page_key(event.slug)) is None
+
+
+def test_event_changes_drop_the_page(client, django_capture_on_commit_callbacks):
+    event = EventFactory(title="Rock al parque")
+    get_page(client, event)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        event.title = "Jazz al parque"
+        event.save()
+
+    assert "Jazz al parque" in get_page(client, event)
+
+
+def test_sponsors_and_photos_drop_the_page(client, django_capture_on_commit_callbacks):
+    event = EventFactory()
+    get_page(client, event)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        sponsor = Sponsor.objects.create(name="Cerveza Andina", contact_email="andina@example.com")
+        EventSponsor.objects.create(event=event, sponsor=sponsor)
+    assert "Cerveza Andina" in get_page(client, event)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        sponsor.name = "Café de Altura"
+        sponsor.save()
+    assert "Café de Altura" in get_page(client, event)
+
+    # Photos are shown once the event took place
+    past_event = EventFactory(start_date=timezone.now() - datetime.timedelta(days=1))
+    get_page(client, past_event)
+    with django_capture_on_commit_callbacks(execute=True):
+        EventPhoto.objects.create(event=past_event, image="events/post_event_photos/stage.jpg", caption="Main stage")
+    assert "Main stage" in get_page(client, past_event)
+
+
+def test_view_counts_dont_drop_the_page(client, django_capture_on_commit_callbacks):
+    event = EventFactory()
+    get_page(client, event)
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        event.views += 1
+        event.save(update_fields=["views"])
+
+    assert not callbacks
+
+
+def test_beacon_counts_the_view_with_the_page_referrer(client):
+    event = EventFactory()
+    url = reverse("events:view_beacon", kwargs={"slug": event.slug})
+
+    response = client.post(
+        url,
+        {"referrer": "https://www.google.com/search"},
+        headers={"user-agent": BROWSER, "referer": f"http://testserver{event.get_absolute_url()}"},
+    )
+
+    assert response.status_code == 204  # noqa: PLR2004
+    view = EventView.objects.select_related("referrer").get()
+    assert view.referrer.domain == "google.com"
+    event.refresh_from_db()
+    assert event.views == 1
+
+
+def test_beacon_needs_a_listed_event(client):
+    event = EventFactory(status="draft")
+
+    response = client.post(reverse("events:view_beacon", kwargs={"slug": event.slug}))
+
+    assert response.status_code == 404  # noqa: PLR2004
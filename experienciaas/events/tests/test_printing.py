@@ -0,0 +1,108 @@
+import io
+import multiprocessing
+import zipfile
+
+import pytest
+from django.db import connections
+
+from experienciaas.events import printing
+from experienciaas.events.printing import export_event_tickets
+from experienciaas.events.printing import iter_ticket_batches
+from experienciaas.events.qr import build_qr_payload
+from experienciaas.events.qr import serialize_qr_payload
+from experienciaas.events.tasks import export_event_tickets as export_task
+from experienciaas.events.tests.factories import EventFactory
+from experienciaas.events.tests.factories import TicketFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_export_event_tickets_in_process():
+    event = EventFactory()
+    tickets = TicketFactory.create_batch(3, event=event, status="confirmed")
+    TicketFactory(event=event, status="pending")
+    progress = []
+
+    archive = io.BytesIO()
+    count = export_event_tickets(
+        event,
+        archive,
+        processes=1,
+        batch_size=2,
+        progress=lambda done, total: progress.append((done, total)),
+    )
+
+    assert count == len(tickets)
+    assert progress == [(2, 3), (3, 3)]
+    with zipfile.ZipFile(archive) as result:
+        names = result.namelist()
+        assert sorted(names) == sorted(f"ticket-{t.ticket_number}.pdf" for t in tickets)
+        assert result.read(names[0]).startswith(b"%PDF")
+
+
+# Connections are closed before forking the workers, which a test
+# transaction wouldn't survive
+@pytest.mark.django_db(transaction=True)
+def test_export_event_tickets_in_worker_processes():
+    event = EventFactory()
+    tickets = TicketFactory.create_batch(5, event=event, status="confirmed")
+
+    def export(processes):
+        archive = io.BytesIO()
+        count = export_event_tickets(event, archive, processes=processes, batch_size=2)
+        with zipfile.ZipFile(archive) as result:
+            return count, [(name, result.read(name)) for name in result.namelist()]
+
+    single_count, single = export(processes=1)
+    count, pages = export(processes=2)
+
+    assert count == single_count == len(tickets)
+    # Batches come back from the pool in the order they were queued
+    assert [name for name, _ in pages] == [name for name, _ in single]
+    assert all(content.startswith(b"%PDF") for _, content in pages)
+
+
+def export_in_daemon(event, results):
+    archive = io.BytesIO()
+    results.put(export_event_tickets(event, archive, processes=2, batch_size=2))
+
+
+# Like a Celery prefork child, the exporting process is daemonic
+@pytest.mark.django_db(transaction=True)
+def test_export_event_tickets_from_a_daemonic_process():
+    event = EventFactory()
+    tickets = TicketFactory.create_batch(3, event=event, status="confirmed")
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    # The child would otherwise share, and close, this process' connection
+    connections.close_all()
+
+    process = context.Process(target=export_in_daemon, args=(event, results), daemon=True)
+    process.start()
+    count = results.get(timeout=60)
+    process.join()
+
+    assert count == len(tickets)
+
+
+def test_ticket_qr_data_matches_the_ticket_page():
+    event = EventFactory()
+    ticket = TicketFactory(event=event, status="confirmed")
+
+    [[printed]] = iter_ticket_batches(event, batch_size=2)
+
+    assert printed["qr_data"] == serialize_qr_payload(build_qr_payload(ticket))
+
+
+def test_export_task_forwards_the_batch_size(monkeypatch):
+    event = EventFactory()
+    calls = []
+
+    def render_archive(event, archive, **kwargs):
+        calls.append(kwargs)
+
+    monkeypatch.setattr(printing, "export_event_tickets", render_archive)
+    export_task.delay(event.pk, processes=1, batch_size=7)
+
+    assert calls[0]["processes"] == 1
+    assert calls[0]["batch_size"] == 7  # noqa: PLR2004
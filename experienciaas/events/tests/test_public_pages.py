@@ -0,0 +1,84 @@
+import pytest
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.urls import reverse
+
+from experienciaas.events.tests.factories import EventFactory
+from experienciaas.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+BROWSER = "Mozilla/5.0 (X11; Linux x86_64) Firefox/128.0"
+
+
+@pytest.fixture(autouse=True)
+def _cache():
+    cache.clear()
+
+
+def get_urls(event):
+    return [
+        reverse("events:list"),
+        event.get_absolute_url(),
+        reverse("events:by_location", kwargs={"city_slug": event.city.slug}),
+        reverse("events:by_category", kwargs={"category_slug": event.category.slug}),
+    ]
+
+
+def get(client, url):
+    response = client.get(url, headers={"user-agent": BROWSER})
+    assert response.status_code == 200  # noqa: PLR2004
+    return response
+
+
+def assert_shared_cacheable(response):
+    assert not response.cookies
+    assert "Cookie" not in response.get("Vary", "")
+    assert "public" in response["Cache-Control"]
+    assert f"max-age={settings.PUBLIC_PAGE_MAX_AGE}" in response["Cache-Control"]
+
+
+def test_anonymous_catalog_pages_are_cacheable(client):
+    event = EventFactory()
+
+    for url in get_urls(event):
+        # The second detail request is a hit of the page cache
+        for response in (get(client, url), get(client, url)):
+            assert_shared_cacheable(response)
+            assert 'value="csrf' not in response.content.decode()
+
+    assert not Session.objects.exists()
+
+
+def test_head_requests_are_cacheable(client):
+    response = client.head(reverse("events:list"), headers={"user-agent": BROWSER})
+
+    assert_shared_cacheable(response)
+
+
+def test_logged_in_pages_vary_on_the_session(client):
+    event = EventFactory()
+    client.force_login(UserFactory())
+
+    for url in get_urls(event):
+        response = get(client, url)
+        assert "Cookie" in response["Vary"]
+        assert "public" not in response.get("Cache-Control", "")
+
+
+def test_requests_with_a_session_are_not_shared(client):
+    event = EventFactory()
+    client.cookies[settings.SESSION_COOKIE_NAME] = "expired"
+
+    response = get(client, event.get_absolute_url())
+
+    assert "Cookie" in response["Vary"]
+    assert "public" not in response.get("Cache-Control", "")
+
+
+def test_other_pages_keep_the_csrf_cookie(client):
+    response = get(client, reverse("account_login"))
+
+    assert settings.CSRF_COOKIE_NAME in response.cookies
+    assert "public" not in response.get("Cache-Control", "")
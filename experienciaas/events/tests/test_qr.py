@@ -0,0 +1,71 @@
+import pytest
+from django.core.files.storage import default_storage
+from django.test import Client
+from django.urls import reverse
+
+from experienciaas.events.qr import build_qr_payload
+from experienciaas.events.qr import get_qr_path
+from experienciaas.events.qr import get_qr_version
+from experienciaas.events.tests.factories import TicketFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_qr_pregenerated_on_confirmation(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        ticket = TicketFactory(status="confirmed")
+
+    version = get_qr_version(build_qr_payload(ticket))
+    assert default_storage.exists(get_qr_path(ticket.ticket_number, version, "svg"))
+    assert default_storage.exists(get_qr_path(ticket.ticket_number, version, "png"))
+
+
+def test_qr_version_changes_with_payload():
+    ticket = TicketFactory(status="confirmed")
+    version = get_qr_version(build_qr_payload(ticket))
+
+    ticket.attendee_name = "Someone Else"
+    assert get_qr_version(build_qr_payload(ticket)) != version
+
+
+def test_qr_served_with_long_lived_cache(client: Client, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        ticket = TicketFactory(status="confirmed")
+    client.force_login(ticket.user)
+    version = get_qr_version(build_qr_payload(ticket))
+
+    response = client.get(
+        reverse(
+            "events:ticket_qr",
+            kwargs={"ticket_number": ticket.ticket_number, "version": version, "image_format": "svg"},
+        ),
+    )
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "image/svg+xml"
+    assert "immutable" in response["Cache-Control"]
+
+
+def test_qr_stale_version_redirects(client: Client):
+    ticket = TicketFactory(status="confirmed")
+    client.force_login(ticket.user)
+
+    response = client.get(
+        reverse(
+            "events:ticket_qr",
+            kwargs={"ticket_number": ticket.ticket_number, "version": "0" * 12, "image_format": "png"},
+        ),
+    )
+
+    assert response.status_code == 302
+    assert get_qr_version(build_qr_payload(ticket)) in response["Location"]
+
+
+def test_ticket_detail_links_versioned_qr(client: Client):
+    ticket = TicketFactory(status="confirmed")
+    client.force_login(ticket.user)
+
+    response = client.get(reverse("events:ticket_detail", kwargs={"ticket_number": ticket.ticket_number}))
+
+    assert response.status_code == 200
+    assert response.context["qr_urls"]["svg"].endswith(".svg")
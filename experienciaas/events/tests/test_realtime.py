@@ -0,0 +1,107 @@
+import asyncio
+import json
+
+import pytest
+
+from config.websocket import websocket_application
+from experienciaas.events import realtime
+from experienciaas.events.realtime import SeatSubscription
+from experienciaas.events.realtime import get_seat_snapshots
+from experienciaas.events.tests.factories import EventFactory
+from experienciaas.events.tests.factories import TicketFactory
+from experienciaas.utils.pubsub import PubSubHub
+
+pytestmark = pytest.mark.django_db
+
+
+def test_seat_snapshots():
+    limited = EventFactory(max_attendees=3)
+    TicketFactory.create_batch(3, event=limited, status="confirmed")
+    TicketFactory(event=limited, status="pending")
+    unlimited = EventFactory(max_attendees=None)
+    TicketFactory(event=unlimited, status="confirmed")
+
+    snapshots = {s["event"]: s for s in get_seat_snapshots([limited.pk, unlimited.pk])}
+
+    assert snapshots[limited.pk]["attendees"] == 3
+    assert snapshots[limited.pk]["remaining"] == 0
+    assert snapshots[limited.pk]["sold_out"] is True
+    assert snapshots[unlimited.pk]["remaining"] is None
+    assert snapshots[unlimited.pk]["sold_out"] is False
+
+
+def test_ticket_changes_mark_event_dirty(
+    monkeypatch, django_capture_on_commit_callbacks
+):
+    event = EventFactory()
+    marked = []
+    monkeypatch.setattr(realtime, "mark_seats_dirty", marked.append)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ticket = TicketFactory(event=event)
+    with django_capture_on_commit_callbacks(execute=True):
+        ticket.delete()
+    with django_capture_on_commit_callbacks(execute=True):
+        event.max_attendees = 10
+        event.save()
+
+    assert marked == [event.pk, event.pk, event.pk]
+
+
+def test_hub_keeps_latest_update_per_event():
+    async def run():
+        hub = PubSubHub("test", items_key="events", id_key="event")
+        subscription = SeatSubscription()
+        hub.subscribe(subscription, [1])
+        hub.dispatch(
+            {"events": [{"event": 1, "remaining": 5}, {"event": 2, "remaining": 1}]}
+        )
+        hub.dispatch({"events": [{"event": 1, "remaining": 4}]})
+        updates = await subscription.get()
+        hub.unsubscribe(subscription)
+        return updates, hub.subscriptions
+
+    updates, subscriptions = asyncio.run(run())
+    assert updates == [{"event": 1, "remaining": 4}]
+    assert not subscriptions
+
+
+@pytest.mark.django_db(transaction=True)
+def test_websocket_subscribe_sends_current_seats():
+    event = EventFactory(max_attendees=10)
+    TicketFactory.create_batch(2, event=event, status="confirmed")
+    draft = EventFactory(status="draft")
+
+    async def run():
+        incoming = asyncio.Queue()
+        sent = []
+        for message in (
+            {"type": "websocket.connect"},
+            {"type": "websocket.receive", "text": "ping"},
+            {
+                "type": "websocket.receive",
+                "text": json.dumps(
+                    {"action": "subscribe", "events": [event.pk, draft.pk]}
+                ),
+            },
+        ):
+            incoming.put_nowait(message)
+
+        async def send(message):
+            sent.append(message)
+            if len(sent) == 3:
+                incoming.put_nowait({"type": "websocket.disconnect"})
+
+        await asyncio.wait_for(
+            websocket_application({"type": "websocket"}, incoming.get, send), timeout=5
+        )
+        return sent
+
+    accept, pong, seats = asyncio.run(run())
+    assert accept == {"type": "websocket.accept"}
+    assert pong["text"] == "pong!"
+    payload = json.loads(seats["text"])
+    assert payload["type"] == "seats"
+    assert [
+        (s["event"], s["attendees"], s["remaining"]) for s in payload["events"]
+    ] == [(event.pk, 2, 8)]
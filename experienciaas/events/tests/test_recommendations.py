@@ -0,0 +1,65 @@
+import pytest
+from django.urls import reverse
+
+from experienciaas.analytics.models import EventView
+from experienciaas.events.models import EventRecommendations
+from experienciaas.events.recommendations import compute_recommendations
+from experienciaas.events.tests.factories import CategoryFactory
+from experienciaas.events.tests.factories import EventFactory
+from experienciaas.events.tests.factories import TicketFactory
+from experienciaas.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_interests_recommend_matching_categories():
+    music = CategoryFactory(name="Música")
+    sports = CategoryFactory(name="Deportes")
+    concert = EventFactory(category=music)
+    EventFactory(category=sports)
+    user = UserFactory(interests=["music"])
+
+    assert compute_recommendations() == 1
+    assert EventRecommendations.objects.get(user=user).event_ids == [concert.pk]
+
+
+def test_similar_events_are_recommended():
+    category = CategoryFactory()
+    past = EventFactory(category=category)
+    similar = EventFactory(category=CategoryFactory())
+    unrelated = EventFactory(category=CategoryFactory())
+    bought = EventFactory(category=category)
+    # Other attendees of the user's event also went to ``similar``
+    for other in UserFactory.create_batch(3):
+        TicketFactory(user=other, event=past)
+        TicketFactory(user=other, event=similar)
+    user = UserFactory(interests=[])
+    TicketFactory(user=user, event=past)
+    TicketFactory(user=user, event=bought)
+    EventView.objects.create(event=unrelated, user=UserFactory(), ip_address="127.0.0.1")
+
+    compute_recommendations()
+
+    event_ids = EventRecommendations.objects.get(user=user).event_ids
+    assert event_ids.index(similar.pk) == 0
+    assert bought.pk not in event_ids
+    assert unrelated.pk not in event_ids
+
+
+def test_recommendations_strip(client, user):
+    event = EventFactory()
+    EventRecommendations.objects.create(
+        user=user, event_ids=[event.pk], computed_at=event.created_at
+    )
+    client.force_login(user)
+
+    response = client.get(reverse("events:list"))
+
+    assert response.context["recommended_events"] == [event]
+    assert "Para ti" in response.content.decode()
+
+
+def test_recommendations_are_recomputed_periodically(settings):
+    tasks = [entry["task"] for entry in settings.CELERY_BEAT_SCHEDULE.values()]
+
+    assert "experienciaas.events.tasks.compute_event_recommendations" in tasks
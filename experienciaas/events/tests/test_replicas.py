@@ -0,0 +1,74 @@
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from experienciaas.events.tests.factories import EventFactory
+from experienciaas.utils import replicas
+from experienciaas.utils.replicas import PIN_COOKIE
+
+# The replica mirrors the test database, so it only sees committed rows
+pytestmark = pytest.mark.django_db(transaction=True)
+
+BROWSER = "Mozilla/5.0 (X11; Linux x86_64) Firefox/128.0"
+
+
+@pytest.fixture(autouse=True)
+def _replica_lag(monkeypatch):
+    monkeypatch.setattr(replicas, "_lag_checked_at", float("-inf"))
+    monkeypatch.setattr(replicas, "measure_replica_lag", lambda: 0.0)
+
+
+def get_page(client, url):
+    """Return the response and the number of queries sent to the replica."""
+    with CaptureQueriesContext(connections["replica"]) as queries:
+        response = client.get(url, headers={"user-agent": BROWSER})
+    assert response.status_code == 200  # noqa: PLR2004
+    return response, len(queries)
+
+
+def test_event_pages_read_from_the_replica(client):
+    event = EventFactory(status="published")
+
+    _, list_queries = get_page(client, reverse("events:list"))
+    _, detail_queries = get_page(client, event.get_absolute_url())
+    beacon = client.post(
+        reverse("events:view_beacon", kwargs={"slug": event.slug}),
+        headers={"user-agent": BROWSER},
+    )
+    _, next_queries = get_page(client, reverse("events:list"))
+
+    assert list_queries > 0
+    assert detail_queries > 0
+    # Counting the view doesn't pin the visitor to the primary
+    assert PIN_COOKIE not in beacon.cookies
+    assert next_queries > 0
+    # The view count was written to the primary
+    event.refresh_from_db()
+    assert event.views == 1
+
+
+def test_writes_pin_the_client_to_the_primary(client):
+    response = client.post(reverse("events:list"))
+    assert PIN_COOKIE in response.cookies
+
+    _, queries = get_page(client, reverse("events:list"))
+
+    assert queries == 0
+
+
+def test_lagging_replica_is_skipped(client, monkeypatch):
+    monkeypatch.setattr(replicas, "measure_replica_lag", lambda: 60.0)
+
+    _, queries = get_page(client, reverse("events:list"))
+
+    assert queries == 0
+
+
+def test_other_pages_read_from_the_primary(client, user):
+    client.force_login(user)
+
+    with CaptureQueriesContext(connections["replica"]) as queries:
+        client.get(reverse("events:my_events"))
+
+    assert len(queries) == 0
@@ -0,0 +1,124 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from experienciaas.events import sitemaps
+from experienciaas.events.tests.factories import EventFactory
+from experienciaas.users.models import OrganizerProfile
+from experienciaas.users.models import SupplierProfile
+from experienciaas.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _cache():
+    cache.clear()
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """Sections and shards rendered from the database."""
+    shards = []
+    render_shard = sitemaps.render_shard
+
+    def render(section, shard, base_url):
+        shards.append((section.name, shard))
+        return render_shard(section, shard, base_url)
+
+    monkeypatch.setattr(sitemaps, "render_shard", render)
+    return shards
+
+
+def get(client, url):
+    response = client.get(url)
+    assert response.status_code == 200  # noqa: PLR2004
+    assert response["Content-Type"] == sitemaps.CONTENT_TYPE
+    return response.content.decode()
+
+
+def get_shard(client, section, shard):
+    return get(client, reverse("events:sitemap_shard", kwargs={"section": section, "shard": shard}))
+
+
+def get_shard_number(obj):
+    return (obj.pk - 1) // sitemaps.SHARD_SIZE
+
+
+def test_sitemaps_list_the_public_pages(client):
+    event = EventFactory()
+    EventFactory(status="draft")
+    organizer = OrganizerProfile.objects.create(user=UserFactory())
+    supplier = SupplierProfile.objects.create(user=UserFactory(), company_name="Sound", status="approved")
+    SupplierProfile.objects.create(user=UserFactory(), company_name="Pending")
+
+    index = get(client, reverse("events:sitemap"))
+    events = get_shard(client, "events", get_shard_number(event))
+    organizers = get_shard(client, "organizers", get_shard_number(organizer))
+    suppliers = get_shard(client, "suppliers", get_shard_number(supplier))
+    cities = get_shard(client, "cities", get_shard_number(event.city))
+
+    assert index.count("<sitemap>") == 5  # noqa: PLR2004
+    assert f"<lastmod>{event.updated_at.isoformat(timespec='seconds')}</lastmod>" in index
+    assert events.count("<url>") == 1
+    assert f"<loc>http://testserver{event.get_absolute_url()}</loc>" in events
+    assert organizer.get_absolute_url() in organizers
+    assert suppliers.count("<url>") == 1
+    assert supplier.get_absolute_url() in suppliers
+    assert f"{event.updated_at.isoformat(timespec='seconds')}" in cities
+
+
+def test_items_are_sharded_by_primary_key(client, monkeypatch):
+    monkeypatch.setattr(sitemaps, "SHARD_SIZE", 2)
+    events = EventFactory.create_batch(5)
+    shards = {get_shard_number(event) for event in events}
+
+    index = get(client, reverse("events:sitemap"))
+
+    assert index.count("sitemap-events-") == len(shards)
+    for shard in shards:
+        content = get_shard(client, "events", shard)
+        assert content.count("<url>") == sum(get_shard_number(event) == shard for event in events)
+
+
+def test_only_changed_shards_are_regenerated(client, monkeypatch, rendered):
+    monkeypatch.setattr(sitemaps, "SHARD_SIZE", 2)
+    first, *_others, last = EventFactory.create_batch(4)
+    first_shard, last_shard = get_shard_number(first), get_shard_number(last)
+    get_shard(client, "events", first_shard)
+    get_shard(client, "events", last_shard)
+
+    last.title = "Renamed"
+    last.save()
+    unchanged = get_shard(client, "events", first_shard)
+    changed = get_shard(client, "events", last_shard)
+
+    assert rendered == [("events", first_shard), ("events", last_shard), ("events", last_shard)]
+    assert first.get_absolute_url() in unchanged
+    assert last.updated_at.isoformat(timespec="seconds") in changed
+
+
+def test_hidden_items_regenerate_their_shard(client, rendered):
+    event = EventFactory()
+    other = EventFactory()
+    shard = get_shard_number(event)
+    get_shard(client, "events", shard)
+
+    other.status = "draft"
+    other.save()
+    content = get_shard(client, "events", shard)
+
+    assert len(rendered) == 2  # noqa: PLR2004
+    assert other.get_absolute_url() not in content
+
+
+def test_unknown_sections_and_empty_shards_are_not_found(client):
+    event = EventFactory()
+
+    unknown = client.get(reverse("events:sitemap_shard", kwargs={"section": "tickets", "shard": 0}))
+    empty = client.get(
+        reverse("events:sitemap_shard", kwargs={"section": "events", "shard": get_shard_number(event) + 1})
+    )
+
+    assert unknown.status_code == 404  # noqa: PLR2004
+    assert empty.status_code == 404  # noqa: PLR2004
@@ -0,0 +1,154 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from experienciaas.analytics.models import SearchQuery
+from experienciaas.events import suggestions
+from experienciaas.events.suggestions import SuggestionIndex
+from experienciaas.events.suggestions import get_suggestions
+from experienciaas.events.suggestions import rebuild_suggestions
+from experienciaas.events.tasks import rebuild_search_suggestions
+from experienciaas.events.tests.factories import CityFactory
+from experienciaas.events.tests.factories import EventFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _fresh_index(monkeypatch):
+    cache.clear()
+    monkeypatch.setattr(suggestions, "_index", None)
+    monkeypatch.setattr(suggestions, "_sequence", 0)
+    monkeypatch.setattr(suggestions, "_checked_at", 0.0)
+    monkeypatch.setattr(suggestions, "VERSION_CHECK_INTERVAL", 0)
+
+
+def test_index_matches_word_prefixes_ignoring_accents():
+    index = SuggestionIndex({
+        "event:1": [("Rock al Parque", "event", "/rock/", 30)],
+        "event:2": [("Parque Jaime Duque", "venue", "/?search=parque", 5)],
+        "city:1": [("Bogotá", "city", "/?city=bogota", 20)],
+    })
+
+    assert [s["text"] for s in index.search("PARQ")] == ["Parque Jaime Duque", "Rock al Parque"]
+    assert [s["text"] for s in index.search("bogota")] == ["Bogotá"]
+    assert index.search("p") == []
+    assert index.search("zz") == []
+
+
+def test_index_updates_one_source_at_a_time():
+    index = SuggestionIndex({
+        "event:1": [("Rock al Parque", "event", "/rock/", 30)],
+        "event:2": [("Parque Jaime Duque", "venue", "/?search=parque", 5)],
+        "event:3": [("Parque Jaime Duque", "venue", "/?search=parque", 5)],
+    })
+
+    index.update("event:1", [("Salsa al Parque", "event", "/salsa/", 30)])
+    index.update("event:2", None)
+    index.update("event:4", [("Rock en Bogotá", "event", "/bogota/", 30)])
+
+    assert [s["text"] for s in index.search("parque")] == ["Parque Jaime Duque", "Salsa al Parque"]
+    assert [s["text"] for s in index.search("rock")] == ["Rock en Bogotá"]
+    index.update("event:3", None)
+    assert [s["text"] for s in index.search("parque")] == ["Salsa al Parque"]
+    assert [key for key, *_ in index.keys] == [key for key, *_ in SuggestionIndex(index.sources).keys]
+
+
+def test_suggestions_include_events_cities_and_popular_searches():
+    EventFactory(title="Festival de Jazz", venue_name="Teatro Libre")
+    EventFactory(title="Jazz privado", venue_name="Teatro Libre", status="draft")
+    CityFactory(name="Jamundí")
+    SearchQuery.objects.create(query="Jazz en vivo", ip_address="127.0.0.1")
+    rebuild_suggestions()
+
+    texts = [s["text"] for s in get_suggestions("ja")]
+
+    # Prefix matches first, by weight, then matches of later words
+    assert texts == ["Jamundí", "jazz en vivo", "Festival de Jazz"]
+
+
+def test_requests_never_build_the_snapshot(monkeypatch):
+    EventFactory(title="Teatro Colón")
+    rebuilds = []
+    monkeypatch.setattr(rebuild_search_suggestions, "delay", lambda: rebuilds.append(1))
+
+    missing = get_suggestions("colon")
+    get_suggestions("colon")
+    rebuild_suggestions()
+    built = get_suggestions("colon")
+    cache.delete(suggestions.SNAPSHOT_KEY)
+    suggestions._index = None  # noqa: SLF001
+    lost = get_suggestions("colon")
+
+    assert missing == []
+    # Once a minute at most
+    assert rebuilds == [1]
+    assert [s["text"] for s in built] == ["Teatro Colón"]
+    assert lost == []
+
+
+def test_stale_index_is_served_without_a_snapshot():
+    event = EventFactory(title="Teatro Colón")
+    rebuild_suggestions()
+    get_suggestions("colon")
+    cache.delete(suggestions.SNAPSHOT_KEY)
+
+    suggestions.update_event_suggestions(event.pk)
+    suggestions.publish_delta(suggestions.RELOAD, None)
+
+    assert [s["text"] for s in get_suggestions("colon")] == ["Teatro Colón"]
+
+
+def test_event_saves_publish_deltas(django_capture_on_commit_callbacks):
+    rebuild_suggestions()
+    with django_capture_on_commit_callbacks(execute=True):
+        event = EventFactory(title="Teatro Colón")
+    assert [s["text"] for s in get_suggestions("colon")] == ["Teatro Colón"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        event.title = "Teatro Mayor"
+        event.save()
+    assert get_suggestions("colon") == []
+    assert [s["url"] for s in get_suggestions("mayor")] == [event.get_absolute_url()]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        event.delete()
+    assert get_suggestions("mayor") == []
+    # Applied to the index in place, no snapshot copied
+    assert cache.get(suggestions.SNAPSHOT_KEY)["sources"] == {"searches": []}
+
+
+def test_rebuilds_publish_what_changed():
+    event = EventFactory(title="Teatro Colón")
+    rebuild_suggestions()
+    assert [s["text"] for s in get_suggestions("colon")] == ["Teatro Colón"]
+    sequence = suggestions.get_sequence()
+
+    # Saved without signals, e.g. by a bulk update
+    type(event).objects.filter(pk=event.pk).update(title="Teatro Mayor")
+    rebuild_suggestions()
+
+    assert suggestions.get_sequence() == sequence + 1
+    assert get_suggestions("colon") == []
+    assert [s["text"] for s in get_suggestions("mayor")] == ["Teatro Mayor"]
+
+
+def test_suggest_view(client):
+    event = EventFactory(title="Salsa al Parque")
+    rebuild_suggestions()
+
+    response = client.get(reverse("events:suggest"), {"q": "sals"})
+
+    assert response.status_code == 200  # noqa: PLR2004
+    assert response.json()["suggestions"][0] == {
+        "text": "Salsa al Parque",
+        "kind": "event",
+        "url": event.get_absolute_url(),
+    }
+    assert "public" in response["Cache-Control"]
+
+
+def test_suggestions_are_rebuilt_periodically(settings):
+    tasks = [entry["task"] for entry in settings.CELERY_BEAT_SCHEDULE.values()]
+
+    assert "experienciaas.events.tasks.rebuild_search_suggestions" in tasks
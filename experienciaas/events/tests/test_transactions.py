@@ -0,0 +1,76 @@
+import threading
+import time
+from contextlib import ExitStack
+
+import pytest
+from django.db import connection
+from django.db import connections
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+
+from experienciaas.events.models import Ticket
+from experienciaas.events.tests.factories import EventFactory
+from experienciaas.users.tests.factories import UserFactory
+
+# Concurrent requests need committed rows and their own connections
+pytestmark = pytest.mark.django_db(transaction=True)
+
+BROWSER = "Mozilla/5.0 (X11; Linux x86_64) Firefox/128.0"
+CONCURRENT_REGISTRATIONS = 8
+# Generous bound for checking capacity and inserting one ticket
+MAX_LOCK_SECONDS = 0.5
+
+
+def test_registrations_hold_the_event_lock_briefly():
+    event = EventFactory(price_type="free", max_attendees=5)
+    users = UserFactory.create_batch(CONCURRENT_REGISTRATIONS)
+    url = reverse("events:register", kwargs={"slug": event.slug})
+    hold_times = []
+    start = threading.Barrier(CONCURRENT_REGISTRATIONS)
+
+    def record_lock(execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        if "FOR UPDATE" in sql:
+            locked_at = time.monotonic()
+            transaction.on_commit(lambda: hold_times.append(time.monotonic() - locked_at))
+        return result
+
+    def register(user):
+        client = Client()
+        client.force_login(user)
+        start.wait()
+        try:
+            with connection.execute_wrapper(record_lock):
+                client.post(url)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=register, args=(user,)) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(hold_times) == CONCURRENT_REGISTRATIONS
+    assert max(hold_times) < MAX_LOCK_SECONDS
+    assert Ticket.objects.filter(event=event).count() == event.max_attendees
+
+
+def test_read_only_pages_run_outside_transactions(client):
+    event = EventFactory()
+    in_transaction = []
+
+    def record(execute, sql, params, many, context):
+        in_transaction.append(context["connection"].in_atomic_block)
+        return execute(sql, params, many, context)
+
+    # Pages may read from the replica
+    with ExitStack() as stack:
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(record))
+        client.get(reverse("events:list"), headers={"user-agent": BROWSER})
+        client.get(event.get_absolute_url(), headers={"user-agent": BROWSER})
+
+    assert in_transaction
+    assert not any(in_transaction)
@@ -0,0 +1,70 @@
+import pytest
+from django.urls import reverse
+
+from experienciaas.analytics import signals as analytics_signals
+from experienciaas.events.trending import HALF_LIFE
+from experienciaas.events.trending import PERIOD
+from experienciaas.events.trending import TICKET_WEIGHT
+from experienciaas.events.trending import TrendingEvents
+from experienciaas.events.trending import decay_factor
+from experienciaas.events.tests.factories import EventFactory
+from experienciaas.events.tests.factories import TicketFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_activity_halves_every_half_life():
+    period = 100
+    start = period * PERIOD
+    assert decay_factor(start, period) == 1
+    assert decay_factor(start + HALF_LIFE, period) == 2  # noqa: PLR2004
+    # A view now outweighs a view one half-life ago by 2x, whatever the landmark
+    assert decay_factor(start + 3 * HALF_LIFE, period) / decay_factor(
+        start + 2 * HALF_LIFE, period
+    ) == 2  # noqa: PLR2004
+
+
+def test_trending_events_fall_back_to_checkpointed_scores():
+    quiet = EventFactory(trending_score=0.5)
+    hot = EventFactory(trending_score=12)
+    EventFactory(trending_score=50, status="draft")
+
+    events = TrendingEvents()
+
+    assert events.count() == 2  # noqa: PLR2004
+    assert events[0:10] == [hot, quiet]
+
+
+def test_list_and_api_sort_by_trending(client, user):
+    quiet = EventFactory(trending_score=1)
+    hot = EventFactory(trending_score=3)
+    client.force_login(user)
+
+    response = client.get(reverse("events:list"), {"sort": "trending"})
+    assert list(response.context["events"]) == [hot, quiet]
+
+    response = client.get(reverse("api:event-list"), {"sort": "trending"})
+    assert [event["id"] for event in response.json()["results"]] == [hot.pk, quiet.pk]
+
+
+def test_confirmed_tickets_count_once(monkeypatch, django_capture_on_commit_callbacks):
+    recorded = []
+    monkeypatch.setattr(
+        analytics_signals,
+        "record_trending_activity",
+        lambda *args: recorded.append(args),
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ticket = TicketFactory(status="pending")
+        ticket.status = "confirmed"
+        ticket.save()
+        ticket.save()
+
+    assert recorded == [(ticket.event_id, TICKET_WEIGHT)]
+
+
+def test_trending_scores_are_checkpointed_periodically(settings):
+    tasks = [entry["task"] for entry in settings.CELERY_BEAT_SCHEDULE.values()]
+
+    assert "experienciaas.events.tasks.checkpoint_trending_scores" in tasks
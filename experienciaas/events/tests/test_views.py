@@ -0,0 +1,115 @@
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import AsyncClient
+from django.urls import reverse
+
+from experienciaas.analytics.models import EventView
+from experienciaas.analytics.models import SearchQuery
+from experienciaas.events.tests.factories import EventFactory
+from experienciaas.events.tests.factories import TicketFactory
+
+pytestmark = pytest.mark.django_db
+
+BROWSER = "Mozilla/5.0 (X11; Linux x86_64) Firefox/128.0"
+
+
+def get(client, url, **kwargs):
+    response = client.get(url, headers={"user-agent": BROWSER}, **kwargs)
+    assert response.status_code == 200  # noqa: PLR2004
+    return response
+
+
+def test_list_filters_and_paginates(client):
+    event = EventFactory(title="Jazz night", is_featured=True)
+    EventFactory.create_batch(13, city=event.city)
+
+    page = get(client, reverse("events:list"), data={"city": event.city.slug, "page": "2"})
+    search = get(client, reverse("events:list"), data={"search": "jazz"})
+
+    assert len(page.context["events"]) == 2  # noqa: PLR2004
+    assert page.context["page_obj"].paginator.count == 14  # noqa: PLR2004
+    assert list(search.context["events"]) == [event]
+    assert list(search.context["featured_events"]) == [event]
+    assert SearchQuery.objects.get().results_count == 1
+
+
+def test_async_list_filters_and_paginates(client):
+    event = EventFactory(title="Jazz night", is_featured=True)
+    EventFactory.create_batch(13, city=event.city)
+
+    page = get(client, reverse("events:async_list"), data={"city": event.city.slug, "page": "2"})
+    search = get(client, reverse("events:async_list"), data={"search": "jazz"})
+
+    assert len(page.context["events"]) == 2  # noqa: PLR2004
+    assert page.context["page_obj"].paginator.count == 14  # noqa: PLR2004
+    assert search.context["events"] == [event]
+    assert search.context["featured_events"] == [event]
+    assert SearchQuery.objects.get().results_count == 1
+
+
+def test_list_unknown_page_is_not_found(client):
+    response = client.get(reverse("events:list"), {"page": "9"})
+    assert response.status_code == 404  # noqa: PLR2004
+
+
+def test_detail_shows_the_ticket_of_the_user(client):
+    event = EventFactory()
+    related = EventFactory(category=event.category)
+    ticket = TicketFactory(event=event)
+    client.force_login(ticket.user)
+
+    response = get(client, event.get_absolute_url())
+    async_response = get(client, reverse("events:async_detail", kwargs={"slug": event.slug}))
+
+    for page in (response, async_response):
+        assert page.context["event"] == event
+        assert page.context["user_ticket"] == ticket
+        assert list(page.context["related_events"]) == [related]
+
+
+def test_location_and_category_pages(client):
+    event = EventFactory()
+
+    by_location = get(client, reverse("events:by_location", kwargs={"city_slug": event.city.slug}))
+    by_category = get(client, reverse("events:by_category", kwargs={"category_slug": event.category.slug}))
+
+    sync_by_location = get(client, reverse("events:sync_by_location", kwargs={"city_slug": event.city.slug}))
+    sync_by_category = get(
+        client, reverse("events:sync_by_category", kwargs={"category_slug": event.category.slug})
+    )
+
+    for page in (by_location, sync_by_location):
+        assert list(page.context["events"]) == [event]
+        assert list(page.context["categories"]) == [event.category]
+    for page in (by_category, sync_by_category):
+        assert list(page.context["events"]) == [event]
+        assert list(page.context["cities"]) == [event.city]
+
+
+def test_pages_are_served_by_the_async_stack():
+    event = EventFactory()
+    client = AsyncClient()
+
+    page = async_to_sync(client.get)(
+        reverse("events:async_detail", kwargs={"slug": event.slug}), headers={"user-agent": BROWSER}
+    )
+    beacon = async_to_sync(client.post)(
+        reverse("events:view_beacon", kwargs={"slug": event.slug}), headers={"user-agent": BROWSER}
+    )
+
+    assert page.status_code == 200  # noqa: PLR2004
+    assert beacon.status_code == 204  # noqa: PLR2004
+    assert EventView.objects.filter(event_id=event.pk).count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_compares_sync_and_async_views():
+    EventFactory()
+    out = StringIO()
+
+    call_command("benchmark_event_views", requests=2, concurrency=2, stdout=out)
+
+    assert out.getvalue().count("req/s") == 8  # noqa: PLR2004
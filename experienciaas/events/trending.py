@@ -0,0 +1,199 @@
+"""Trending ranking of upcoming events.
+
+Views and confirmed tickets add to an event's score with exponential time
+decay: activity is worth half as much every ``HALF_LIFE`` seconds. Scores use
+forward decay, i.e. activity at time ``t`` adds ``weight * 2 ** ((t - L) / HALF_LIFE)``
+for a fixed landmark ``L``, so past increments never need rewriting and the
+ranking is a plain Redis sorted set updated with ZINCRBY as activity is
+ingested. Decayed scores are ``stored * 2 ** (-(now - L) / HALF_LIFE)``.
+
+The landmark moves every ``PERIOD`` to keep scores within float range; the
+first writer or reader of a new period carries the previous set over, scaled
+to the new landmark. ``checkpoint_trending_scores`` periodically saves the
+decayed scores to ``Event.trending_score`` (used when Redis is unavailable or
+the list is filtered) and drops events that are no longer listed.
+"""
+import time
+
+from django.utils import timezone
+from redis.exceptions import RedisError
+
+from experienciaas.utils.redis import get_redis
+from experienciaas.utils.redis import mark_unavailable
+
+from .models import Event
+
+TRENDING_STATUSES = ('published', 'sold_out')
+HALF_LIFE = 24 * 60 * 60
+PERIOD = 30 * 24 * 60 * 60
+
+VIEW_WEIGHT = 1
+TICKET_WEIGHT = 5
+
+_carried_period = None
+
+
+def get_period(timestamp):
+    return int(timestamp // PERIOD)
+
+
+def get_trending_key(period):
+    return f"events:trending:{period}"
+
+
+def decay_factor(timestamp, period):
+    """Factor turning a decayed score at ``timestamp`` into a stored one."""
+    return 2 ** ((timestamp - period * PERIOD) / HALF_LIFE)
+
+
+def ensure_period(client, period):
+    """Carry the previous period's scores over to ``period``, once."""
+    global _carried_period  # noqa: PLW0603
+    if _carried_period == period:
+        return
+    if client.set(f"{get_trending_key(period)}:carried", 1, nx=True, ex=2 * PERIOD):
+        previous = get_trending_key(period - 1)
+        key = get_trending_key(period)
+        client.zunionstore(key, {key: 1, previous: 2 ** (-PERIOD / HALF_LIFE)})
+        client.expire(previous, 60 * 60)
+    _carried_period = period
+
+
+def record_trending_activity(event_id, weight):
+    """Add decayed activity to an event's trending score."""
+    client = get_redis()
+    if client is None:
+        return
+
+    now = time.time()
+    period = get_period(now)
+    try:
+        ensure_period(client, period)
+        client.zincrby(get_trending_key(period), weight * decay_factor(now, period), event_id)
+    except RedisError as exc:
+        mark_unavailable(exc)
+
+
+def add_trending_event(event_id):
+    """List an event in the ranking, with no activity yet."""
+    client = get_redis()
+    if client is None:
+        return
+
+    period = get_period(time.time())
+    try:
+        ensure_period(client, period)
+        client.zadd(get_trending_key(period), {event_id: 0}, nx=True)
+    except RedisError as exc:
+        mark_unavailable(exc)
+
+
+def get_listed_events():
+    return Event.objects.filter(
+        status__in=TRENDING_STATUSES,
+        start_date__gte=timezone.now()
+    )
+
+
+def checkpoint_trending_scores():
+    """Save decayed scores to the database and resync the ranking with it.
+
+    Returns the number of ranked events.
+    """
+    client = get_redis()
+    if client is None:
+        return 0
+
+    now = time.time()
+    period = get_period(now)
+    key = get_trending_key(period)
+    listed = set(get_listed_events().values_list('pk', flat=True))
+    try:
+        ensure_period(client, period)
+        stored = {int(pk): score for pk, score in client.zrange(key, 0, -1, withscores=True)}
+        pipe = client.pipeline(transaction=False)
+        unlisted = stored.keys() - listed
+        if unlisted:
+            pipe.zrem(key, *unlisted)
+        missing = listed - stored.keys()
+        if missing:
+            pipe.zadd(key, dict.fromkeys(missing, 0), nx=True)
+        pipe.execute()
+    except RedisError as exc:
+        mark_unavailable(exc)
+        return 0
+
+    factor = decay_factor(now, period)
+    events = [
+        Event(pk=pk, trending_score=stored.get(pk, 0) / factor)
+        for pk in listed
+    ]
+    Event.objects.bulk_update(events, ['trending_score'], batch_size=1000)
+    # Scores of events that left the ranking no longer matter
+    Event.objects.exclude(pk__in=listed).exclude(trending_score=0).update(trending_score=0)
+    return len(listed)
+
+
+class TrendingEvents:
+    """Listed events by trending score, as a sliceable sequence.
+
+    Pages are rank ranges of the sorted set (ZREVRANGE), so paginators never
+    sort or count the events table. Falls back to ``Event.trending_score``
+    without Redis.
+    """
+
+    def __init__(self, queryset=None):
+        if queryset is None:
+            queryset = get_listed_events()
+        self.queryset = queryset.select_related('city', 'category', 'organizer')
+        self.client = get_redis()
+        self.period = get_period(time.time())
+        if self.client is not None:
+            try:
+                ensure_period(self.client, self.period)
+            except RedisError as exc:
+                mark_unavailable(exc)
+                self.client = None
+
+    def get_fallback_queryset(self):
+        return self.queryset.order_by('-trending_score', 'start_date', 'pk')
+
+    def count(self):
+        if self.client is not None:
+            try:
+                count = self.client.zcard(get_trending_key(self.period))
+            except RedisError as exc:
+                mark_unavailable(exc)
+                self.client = None
+            else:
+                if count:
+                    return count
+                # Not built yet, until the first checkpoint
+                self.client = None
+        return self.get_fallback_queryset().count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        stop = index.stop if index.stop is not None else self.count()
+        if stop <= start:
+            return []
+
+        if self.client is None:
+            return list(self.get_fallback_queryset()[start:stop])
+        try:
+            event_ids = [
+                int(pk) for pk in self.client.zrevrange(get_trending_key(self.period), start, stop - 1)
+            ]
+        except RedisError as exc:
+            mark_unavailable(exc)
+            self.client = None
+            return list(self.get_fallback_queryset()[start:stop])
+
+        # Events that stopped being listed since the last checkpoint are skipped
+        events = self.queryset.filter(pk__in=event_ids).in_bulk()
+        return [events[pk] for pk in event_ids if pk in events]
@@ -2,18 +2,30 @@ from django.urls import path
 
 from . import views
 from . import admin_views
+from . import async_views
+from . import sitemaps
 
 app_name = "events"
 
 urlpatterns = [
     path("", views.EventListView.as_view(), name="list"),
     path("my-events/", views.MyEventsView.as_view(), name="my_events"),
-    path("city/<slug:city_slug>/", views.EventsByLocationView.as_view(), name="by_location"),
-    path("category/<slug:category_slug>/", views.EventsByCategoryView.as_view(), name="by_category"),
+    path("feed/", views.FeedView.as_view(), name="feed"),
+    path("suggest/", views.EventSuggestionsView.as_view(), name="suggest"),
+    path("city/<slug:city_slug>/", async_views.AsyncEventsByLocationView.as_view(), name="by_location"),
+    path("category/<slug:category_slug>/", async_views.AsyncEventsByCategoryView.as_view(), name="by_category"),
+    # The other implementation of each public page, compared by benchmark_event_views
+    path("async/", async_views.AsyncEventListView.as_view(), name="async_list"),
+    path("async/<slug:slug>/", async_views.AsyncEventDetailView.as_view(), name="async_detail"),
+    path("sync/city/<slug:city_slug>/", views.EventsByLocationView.as_view(), name="sync_by_location"),
+    path("sync/category/<slug:category_slug>/", views.EventsByCategoryView.as_view(), name="sync_by_category"),
+    path("sitemap.xml", sitemaps.sitemap_index, name="sitemap"),
+    path("sitemap-<slug:section>-<int:shard>.xml", sitemaps.sitemap_shard, name="sitemap_shard"),
     path("register/<slug:slug>/", views.RegisterForEventView.as_view(), name="register"),
     
     # Ticket detail with QR code
     path("ticket/<str:ticket_number>/", views.TicketDetailView.as_view(), name="ticket_detail"),
+    path("ticket/<str:ticket_number>/qr/<str:version>.<str:image_format>", views.TicketQRCodeView.as_view(), name="ticket_qr"),
     
     # Sponsorship URLs
     path("<slug:event_slug>/sponsor-apply/", views.SponsorshipApplicationCreateView.as_view(), name="sponsor_apply"),
@@ -55,6 +67,9 @@ urlpatterns = [
     path("admin/event-photos/<int:pk>/delete/", admin_views.EventPhotoDeleteView.as_view(), name="admin_delete_event_photo"),
     path("admin/events/<int:event_pk>/photos/reorder/", admin_views.EventPhotoUpdateOrderView.as_view(), name="admin_reorder_event_photos"),
     
+    # View beacon sent by event detail pages
+    path("<slug:slug>/view/", async_views.event_view_beacon, name="view_beacon"),
+    
     # Public event detail (must be last to avoid conflicts)
     path("<slug:slug>/", views.EventDetailView.as_view(), name="detail"),
 ]
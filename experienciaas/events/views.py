@@ -1,18 +1,121 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.files.storage import default_storage
+from django.db import transaction
 from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views import View
 from django.views.generic import DetailView, ListView, CreateView
 from django.contrib import messages
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse_lazy
 import random
 
+from experienciaas.utils.public_pages import PublicPageMixin
+from experienciaas.utils.replicas import ReplicaReadMixin
+
 from .models import Category, City, Event, Ticket, SponsorshipApplication
 from .forms import SponsorshipApplicationForm
+from .page_cache import cache_page
+from .page_cache import get_cacheable_context
+from .page_cache import get_cached_page
+
+# QR images are addressed by payload version, so they can be cached for a year.
+QR_CACHE_MAX_AGE = 60 * 60 * 24 * 365
+SUGGESTIONS_CACHE_MAX_AGE = 60
+
+LISTED_STATUSES = ['published', 'sold_out']
+LIST_FILTERS = ('search', 'city', 'category', 'date')
+BANNER_IMAGES = [
+    'images/banner/experienciaas.png',
+    'images/banner/experienciaas_2.png',
+    'images/banner/experienciaas_3.png'
+]
+
+
+def get_upcoming_events():
+    return Event.objects.filter(
+        status__in=LISTED_STATUSES,
+        start_date__gte=timezone.now()
+    ).select_related('city', 'category', 'organizer')
+
+
+def search_events(queryset, search):
+    return queryset.filter(
+        Q(title__icontains=search) |
+        Q(description__icontains=search) |
+        Q(venue_name__icontains=search)
+    )
+
+
+def filter_events(queryset, params):
+    """Apply the search, city, category and date filters of the event list."""
+    search = params.get('search')
+    if search:
+        queryset = search_events(queryset, search)
+    
+    # City filter
+    city_slug = params.get('city')
+    if city_slug:
+        queryset = queryset.filter(city__slug=city_slug)
+    
+    # Category filter
+    category_slug = params.get('category')
+    if category_slug:
+        queryset = queryset.filter(category__slug=category_slug)
+    
+    # Date filter
+    date_filter = params.get('date')
+    if date_filter == 'today':
+        queryset = queryset.filter(start_date__date=timezone.now().date())
+    elif date_filter == 'tomorrow':
+        tomorrow = timezone.now().date() + timezone.timedelta(days=1)
+        queryset = queryset.filter(start_date__date=tomorrow)
+    elif date_filter == 'this_week':
+        week_start = timezone.now()
+        week_end = week_start + timezone.timedelta(days=7)
+        queryset = queryset.filter(start_date__range=[week_start, week_end])
+    elif date_filter == 'this_month':
+        month_start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        next_month = month_start + timezone.timedelta(days=32)
+        month_end = next_month.replace(day=1) - timezone.timedelta(seconds=1)
+        queryset = queryset.filter(start_date__range=[month_start, month_end])
+    
+    return queryset
 
 
-class EventListView(ListView):
+def sort_events(queryset, params):
+    """Sort by date, featured or trending."""
+    sort = params.get('sort', 'date')
+    if sort == 'featured':
+        return queryset.order_by('-is_featured', 'start_date')
+    if sort == 'trending':
+        from .trending import TrendingEvents
+        if not any(params.get(name) for name in LIST_FILTERS):
+            # Pages are rank ranges of the trending ranking
+            return TrendingEvents(queryset)
+        return queryset.order_by('-trending_score', 'start_date')
+    return queryset.order_by('start_date')
+
+
+def get_list_filters(params):
+    return {
+        'search': params.get('search', ''),
+        'city': params.get('city', ''),
+        'category': params.get('category', ''),
+        'date': params.get('date', ''),
+        'sort': params.get('sort', 'date'),
+    }
+
+
+def shows_recommendations(user, params):
+    """Precomputed recommendations are shown on the unfiltered first page only."""
+    return user.is_authenticated and not any(params.get(name) for name in (*LIST_FILTERS, 'page'))
+
+
+class EventListView(PublicPageMixin, ReplicaReadMixin, ListView):
     """List all published events with filtering capabilities."""
     model = Event
     template_name = "events/event_list.html"
@@ -20,24 +123,15 @@ class EventListView(ListView):
     paginate_by = 12
     
     def get_queryset(self):
-        queryset = Event.objects.filter(
-            status__in=['published', 'sold_out'],
-            start_date__gte=timezone.now()
-        ).select_related('city', 'category', 'organizer')
+        queryset = get_upcoming_events()
         
         # Search functionality
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(venue_name__icontains=search)
-            )
-            
             # Track search analytics
             try:
                 from experienciaas.analytics.utils import track_search_query
-                results_count = queryset.count()
+                results_count = search_events(queryset, search).count()
                 city = None
                 category = None
                 
@@ -59,134 +153,129 @@ class EventListView(ListView):
             except ImportError:
                 pass
         
-        # City filter
-        city_slug = self.request.GET.get('city')
-        if city_slug:
-            queryset = queryset.filter(city__slug=city_slug)
-        
-        # Category filter
-        category_slug = self.request.GET.get('category')
-        if category_slug:
-            queryset = queryset.filter(category__slug=category_slug)
-        
-        # Date filter
-        date_filter = self.request.GET.get('date')
-        if date_filter == 'today':
-            queryset = queryset.filter(start_date__date=timezone.now().date())
-        elif date_filter == 'tomorrow':
-            tomorrow = timezone.now().date() + timezone.timedelta(days=1)
-            queryset = queryset.filter(start_date__date=tomorrow)
-        elif date_filter == 'this_week':
-            week_start = timezone.now()
-            week_end = week_start + timezone.timedelta(days=7)
-            queryset = queryset.filter(start_date__range=[week_start, week_end])
-        elif date_filter == 'this_month':
-            month_start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            next_month = month_start + timezone.timedelta(days=32)
-            month_end = next_month.replace(day=1) - timezone.timedelta(seconds=1)
-            queryset = queryset.filter(start_date__range=[month_start, month_end])
-        
-        # Sort by date or featured
-        sort = self.request.GET.get('sort', 'date')
-        if sort == 'featured':
-            queryset = queryset.order_by('-is_featured', 'start_date')
-        else:
-            queryset = queryset.order_by('start_date')
-        
-        return queryset
+        return sort_events(filter_events(queryset, self.request.GET), self.request.GET)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['cities'] = City.objects.filter(is_active=True, events__isnull=False).distinct()
         context['categories'] = Category.objects.filter(is_active=True, events__isnull=False).distinct()
-        context['current_filters'] = {
-            'search': self.request.GET.get('search', ''),
-            'city': self.request.GET.get('city', ''),
-            'category': self.request.GET.get('category', ''),
-            'date': self.request.GET.get('date', ''),
-            'sort': self.request.GET.get('sort', 'date'),
-        }
+        context['current_filters'] = get_list_filters(self.request.GET)
         
         # Get featured events separately - apply same filters as main queryset
-        featured_queryset = Event.objects.filter(
-            status__in=['published', 'sold_out'],
-            start_date__gte=timezone.now(),
-            is_featured=True
-        ).select_related('city', 'category', 'organizer')
+        context['featured_events'] = filter_events(
+            get_upcoming_events().filter(is_featured=True), self.request.GET
+        ).order_by('start_date')
         
-        # Apply the same filters to featured events
-        search = self.request.GET.get('search')
-        if search:
-            featured_queryset = featured_queryset.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(venue_name__icontains=search)
-            )
-        
-        city_slug = self.request.GET.get('city')
-        if city_slug:
-            featured_queryset = featured_queryset.filter(city__slug=city_slug)
-        
-        category_slug = self.request.GET.get('category')
-        if category_slug:
-            featured_queryset = featured_queryset.filter(category__slug=category_slug)
-        
-        date_filter = self.request.GET.get('date')
-        if date_filter == 'today':
-            featured_queryset = featured_queryset.filter(start_date__date=timezone.now().date())
-        elif date_filter == 'tomorrow':
-            tomorrow = timezone.now().date() + timezone.timedelta(days=1)
-            featured_queryset = featured_queryset.filter(start_date__date=tomorrow)
-        elif date_filter == 'this_week':
-            week_start = timezone.now()
-            week_end = week_start + timezone.timedelta(days=7)
-            featured_queryset = featured_queryset.filter(start_date__range=[week_start, week_end])
-        elif date_filter == 'this_month':
-            month_start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            next_month = month_start + timezone.timedelta(days=32)
-            month_end = next_month.replace(day=1) - timezone.timedelta(seconds=1)
-            featured_queryset = featured_queryset.filter(start_date__range=[month_start, month_end])
-        
-        # Order featured events by start date
-        context['featured_events'] = featured_queryset.order_by('start_date')
+        context['recommended_events'] = []
+        if shows_recommendations(self.request.user, self.request.GET):
+            from .recommendations import get_recommended_events
+            context['recommended_events'] = get_recommended_events(self.request.user)
         
         # Add random banner image
-        banner_images = [
-            'images/banner/experienciaas.png',
-            'images/banner/experienciaas_2.png',
-            'images/banner/experienciaas_3.png'
-        ]
-        context['random_banner'] = random.choice(banner_images)
+        context['random_banner'] = random.choice(BANNER_IMAGES)
         
         return context
 
 
-class EventDetailView(DetailView):
-    """Display event details."""
+def get_event_sponsors(event):
+    from .models import EventSponsor
+    return EventSponsor.objects.filter(
+        event=event
+    ).select_related('sponsor').order_by('display_order', 'tier')
+
+
+def get_sponsor_profiles(event_sponsors):
+    """Approved supplier profiles of the users matching the sponsors' contact emails."""
+    from experienciaas.users.models import SupplierProfile
+    emails = {event_sponsor.sponsor.contact_email for event_sponsor in event_sponsors}
+    return SupplierProfile.objects.filter(
+        user__email__in=emails,
+        status='approved'
+    ).select_related('user')
+
+
+def enrich_sponsors(event_sponsors, supplier_profiles):
+    """Sponsor data with the SupplierProfile information when available."""
+    profiles = {profile.user.email: profile for profile in supplier_profiles}
+    enriched_sponsors = []
+    for event_sponsor in event_sponsors:
+        supplier_profile = profiles.get(event_sponsor.sponsor.contact_email)
+        enriched_sponsors.append({
+            'event_sponsor': event_sponsor,
+            'sponsor': event_sponsor.sponsor,
+            'supplier_profile': supplier_profile,
+            'has_robust_profile': supplier_profile is not None
+        })
+    return enriched_sponsors
+
+
+def get_related_events(event):
+    """Upcoming events of the same category or city."""
+    return Event.objects.filter(
+        Q(category_id=event.category_id) | Q(city_id=event.city_id),
+        status__in=LISTED_STATUSES,
+        start_date__gte=timezone.now()
+    ).exclude(pk=event.pk)[:4]
+
+
+def get_city_events(city):
+    return Event.objects.filter(
+        city=city,
+        status__in=LISTED_STATUSES,
+        start_date__gte=timezone.now()
+    ).select_related('category', 'organizer').order_by('start_date')
+
+
+def get_city_categories(city):
+    return Category.objects.filter(
+        events__city=city,
+        is_active=True
+    ).distinct()
+
+
+def get_category_events(category):
+    return Event.objects.filter(
+        category=category,
+        status__in=LISTED_STATUSES,
+        start_date__gte=timezone.now()
+    ).select_related('city', 'organizer').order_by('start_date')
+
+
+def get_category_cities(category):
+    return City.objects.filter(
+        events__category=category,
+        is_active=True
+    ).distinct()
+
+
+class EventDetailView(PublicPageMixin, ReplicaReadMixin, DetailView):
+    """Display event details, cached for anonymous visitors.
+    
+    Views are counted by the page's beacon (``event_view_beacon``).
+    """
     model = Event
     template_name = "events/event_detail.html"
     context_object_name = "event"
     
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+        
+        slug = kwargs['slug']
+        content = get_cached_page(request, slug)
+        if content is not None:
+            return HttpResponse(content)
+        response = super().get(request, *args, **kwargs)
+        return cache_page(request, slug, response.render())
+    
     def get_queryset(self):
-        return Event.objects.filter(status__in=['published', 'sold_out']).select_related(
+        return Event.objects.filter(status__in=LISTED_STATUSES).select_related(
             'city', 'category', 'organizer'
         )
     
-    def get_object(self, queryset=None):
-        obj = super().get_object(queryset)
-        
-        # Track analytics
-        try:
-            from experienciaas.analytics.utils import track_event_view
-            track_event_view(obj, self.request)
-        except ImportError:
-            pass
-        
-        return obj
-    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        event = self.get_object()
+        event = self.object
         
         # Check if user already has a ticket
         if self.request.user.is_authenticated:
@@ -194,53 +283,19 @@ class EventDetailView(DetailView):
                 event=event, 
                 user=self.request.user
             ).first()
+        else:
+            context.update(get_cacheable_context())
         
         # Get event sponsors with enriched information
-        from .models import EventSponsor
-        from experienciaas.users.models import SupplierProfile, User
-        
-        event_sponsors = EventSponsor.objects.filter(
-            event=event
-        ).select_related('sponsor').order_by('display_order', 'tier')
-        
-        # Enrich sponsor data with SupplierProfile information when available
-        enriched_sponsors = []
-        for event_sponsor in event_sponsors:
-            sponsor_data = {
-                'event_sponsor': event_sponsor,
-                'sponsor': event_sponsor.sponsor,
-                'supplier_profile': None,
-                'has_robust_profile': False
-            }
-            
-            try:
-                # Find user by email that matches sponsor's contact_email
-                user = User.objects.get(email=event_sponsor.sponsor.contact_email)
-                # Get the supplier profile for that user if it exists and is approved
-                supplier_profile = SupplierProfile.objects.get(
-                    user=user,
-                    status='approved'
-                )
-                sponsor_data['supplier_profile'] = supplier_profile
-                sponsor_data['has_robust_profile'] = True
-            except (User.DoesNotExist, SupplierProfile.DoesNotExist):
-                pass
-            
-            enriched_sponsors.append(sponsor_data)
+        event_sponsors = list(get_event_sponsors(event))
+        context['event_sponsors'] = enrich_sponsors(event_sponsors, get_sponsor_profiles(event_sponsors))
         
-        context['event_sponsors'] = enriched_sponsors
-        
-        # Related events (same category or city)
-        context['related_events'] = Event.objects.filter(
-            Q(category=event.category) | Q(city=event.city),
-            status__in=['published', 'sold_out'],
-            start_date__gte=timezone.now()
-        ).exclude(pk=event.pk)[:4]
+        context['related_events'] = get_related_events(event)
         
         return context
 
 
-class EventsByLocationView(ListView):
+class EventsByLocationView(PublicPageMixin, ReplicaReadMixin, ListView):
     """List events by city."""
     model = Event
     template_name = "events/events_by_location.html"
@@ -249,23 +304,16 @@ class EventsByLocationView(ListView):
     
     def get_queryset(self):
         self.city = get_object_or_404(City, slug=self.kwargs['city_slug'])
-        return Event.objects.filter(
-            city=self.city,
-            status__in=['published', 'sold_out'],
-            start_date__gte=timezone.now()
-        ).select_related('category', 'organizer').order_by('start_date')
+        return get_city_events(self.city)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['city'] = self.city
-        context['categories'] = Category.objects.filter(
-            events__city=self.city,
-            is_active=True
-        ).distinct()
+        context['categories'] = get_city_categories(self.city)
         return context
 
 
-class EventsByCategoryView(ListView):
+class EventsByCategoryView(PublicPageMixin, ReplicaReadMixin, ListView):
     """List events by category."""
     model = Event
     template_name = "events/events_by_category.html"
@@ -274,19 +322,12 @@ class EventsByCategoryView(ListView):
     
     def get_queryset(self):
         self.category = get_object_or_404(Category, slug=self.kwargs['category_slug'])
-        return Event.objects.filter(
-            category=self.category,
-            status__in=['published', 'sold_out'],
-            start_date__gte=timezone.now()
-        ).select_related('city', 'organizer').order_by('start_date')
+        return get_category_events(self.category)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['category'] = self.category
-        context['cities'] = City.objects.filter(
-            events__category=self.category,
-            is_active=True
-        ).distinct()
+        context['cities'] = get_category_cities(self.category)
         return context
 
 
@@ -306,26 +347,30 @@ class RegisterForEventView(LoginRequiredMixin, DetailView):
             messages.error(request, _("Registration for this event has closed."))
             return redirect(event.get_absolute_url())
         
-        # Check if user already registered
-        existing_ticket = Ticket.objects.filter(event=event, user=request.user).first()
-        if existing_ticket:
-            messages.info(request, _("You are already registered for this event."))
-            return redirect(event.get_absolute_url())
-        
-        # Check capacity
-        if event.max_attendees and event.attendees_count >= event.max_attendees:
-            messages.error(request, _("This event is sold out."))
-            return redirect(event.get_absolute_url())
-        
-        # Create ticket
-        ticket = Ticket.objects.create(
-            event=event,
-            user=request.user,
-            attendee_name=request.user.name or request.user.email,
-            attendee_email=request.user.email,
-            amount_paid=event.price if event.price_type == 'paid' else 0,
-            status='confirmed' if event.is_free else 'pending'
-        )
+        # Registrations queue on the event row only while checking capacity
+        # and creating the ticket, so the event can't be oversold
+        with transaction.atomic():
+            event = Event.objects.select_for_update().get(pk=event.pk)
+
+            # Check if user already registered
+            if Ticket.objects.filter(event=event, user=request.user).exists():
+                messages.info(request, _("You are already registered for this event."))
+                return redirect(event.get_absolute_url())
+
+            # Check capacity
+            if event.max_attendees and event.attendees_count >= event.max_attendees:
+                messages.error(request, _("This event is sold out."))
+                return redirect(event.get_absolute_url())
+
+            # Create ticket
+            Ticket.objects.create(
+                event=event,
+                user=request.user,
+                attendee_name=request.user.name or request.user.email,
+                attendee_email=request.user.email,
+                amount_paid=event.price if event.price_type == 'paid' else 0,
+                status='confirmed' if event.is_free else 'pending'
+            )
         
         if event.is_free:
             messages.success(request, _("You have successfully registered for this event!"))
@@ -431,6 +476,30 @@ class MyEventsView(LoginRequiredMixin, ListView):
         return context
 
 
+class FeedView(LoginRequiredMixin, ListView):
+    """Upcoming events of the organizers the user follows."""
+    template_name = "events/feed.html"
+    context_object_name = "events"
+    paginate_by = 12
+
+    def get_queryset(self):
+        from .feed import Feed
+        return Feed(self.request.user)
+
+
+class EventSuggestionsView(View):
+    """Sugerencias de búsqueda mientras se escribe."""
+
+    def get(self, request):
+        from .suggestions import get_suggestions
+
+        query = request.GET.get('q', '')[:100]
+        response = JsonResponse({'suggestions': get_suggestions(query)})
+        # Las mismas letras se piden muchas veces seguidas
+        patch_cache_control(response, public=True, max_age=SUGGESTIONS_CACHE_MAX_AGE)
+        return response
+
+
 class SponsorshipApplicationView(LoginRequiredMixin, CreateView):
     """Handle sponsorship applications."""
     model = SponsorshipApplication
@@ -559,19 +628,56 @@ class TicketDetailView(LoginRequiredMixin, DetailView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        ticket = self.get_object()
-        
-        # Datos para el QR
-        import json
-        qr_data = {
-            'ticket_number': ticket.ticket_number,
-            'event_name': ticket.event.title,
-            'attendee_name': ticket.attendee_name,
-            'event_date': ticket.event.start_date.isoformat(),
-            'status': ticket.status
-        }
+        ticket = self.object
         
-        context['qr_data'] = json.dumps(qr_data)
+        # Las imágenes QR se generan en segundo plano al confirmar el ticket;
+        # aquí solo se construyen sus URLs versionadas.
         context['can_download_qr'] = ticket.status == 'confirmed'
+        if context['can_download_qr']:
+            from .qr import get_ticket_qr_urls
+            context['qr_urls'] = get_ticket_qr_urls(ticket)
         
         return context
+
+
+class TicketQRCodeView(LoginRequiredMixin, View):
+    """Sirve la imagen QR pre-generada de un ticket con caché de larga duración."""
+    
+    def get(self, request, ticket_number, version, image_format):
+        from .qr import (
+            QR_CONTENT_TYPES, QR_FORMATS, build_qr_payload, ensure_ticket_qr_codes,
+            get_qr_path, get_qr_version
+        )
+        
+        if image_format not in QR_FORMATS:
+            raise Http404
+        
+        ticket = get_object_or_404(
+            Ticket.objects.select_related('event'),
+            ticket_number=ticket_number,
+            user=request.user,
+            status='confirmed'
+        )
+        
+        # Versiones antiguas redirigen a la imagen del payload actual
+        current_version = get_qr_version(build_qr_payload(ticket))
+        if version != current_version:
+            return redirect(
+                'events:ticket_qr',
+                ticket_number=ticket.ticket_number,
+                version=current_version,
+                image_format=image_format
+            )
+        
+        path = get_qr_path(ticket.ticket_number, version, image_format)
+        if not default_storage.exists(path):
+            # La tarea en segundo plano aún no ha terminado
+            ensure_ticket_qr_codes(ticket)
+        
+        response = FileResponse(
+            default_storage.open(path, 'rb'),
+            content_type=QR_CONTENT_TYPES[image_format]
+        )
+        # La URL cambia con el payload, así que el contenido es inmutable
+        patch_cache_control(response, private=True, max_age=QR_CACHE_MAX_AGE, immutable=True)
+        return response
@@ -3,8 +3,12 @@ from __future__ import annotations
 import typing
 
 from allauth.account.adapter import DefaultAccountAdapter
+from allauth.core import context as allauth_context
 from allauth.socialaccount.adapter import DefaultSocialAccountAdapter
 from django.conf import settings
+from django.contrib.sites.shortcuts import get_current_site
+
+from experienciaas.users.outbox import queue_email
 
 if typing.TYPE_CHECKING:
     from allauth.socialaccount.models import SocialLogin
@@ -44,7 +48,7 @@ class AccountAdapter(DefaultAccountAdapter):
 
     def send_mail(self, template_prefix, email, context):
         """
-        Override to use Spanish email templates.
+        Override to use Spanish email templates and send through the outbox.
         """
         # Map template prefixes to Spanish versions
         spanish_templates = {
@@ -57,7 +61,17 @@ class AccountAdapter(DefaultAccountAdapter):
         
         # Use Spanish template if available
         spanish_template = spanish_templates.get(template_prefix, template_prefix)
-        return super().send_mail(spanish_template, email, context)
+
+        # Same context as allauth's send_mail, but the rendered message is
+        # queued in the outbox and delivered by a worker
+        request = allauth_context.request
+        ctx = {
+            "request": request,
+            "email": email,
+            "current_site": get_current_site(request),
+        }
+        ctx.update(context)
+        queue_email(self.render_mail(spanish_template, email, ctx))
 
 
 class SocialAccountAdapter(DefaultSocialAccountAdapter):
@@ -7,7 +7,7 @@ from django.utils.translation import gettext_lazy as _
 
 from .forms import UserAdminChangeForm
 from .forms import UserAdminCreationForm
-from .models import User, OrganizerProfile, Follow, SupplierProfile, RoleApplication, SponsorshipApplication
+from .models import User, OrganizerProfile, Follow, SupplierProfile, RoleApplication, SponsorshipApplication, OutboxMessage
 
 if settings.DJANGO_ADMIN_FORCE_ALLAUTH:
     # Force the `admin` sign in process to go through the `django-allauth` workflow:
@@ -460,3 +460,11 @@ class SponsorshipApplicationAdmin(admin.ModelAdmin):
         updated = queryset.filter(status='approved').update(status='contracted')
         self.message_user(request, f"{updated} solicitudes marcadas como contratadas.")
     mark_contracted.short_description = "Marcar como contratadas"
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ["subject", "to_email", "status", "attempts", "next_attempt_at", "created_at", "sent_at"]
+    list_filter = ["status", "created_at"]
+    search_fields = ["to_email", "subject"]
+    readonly_fields = ["dedupe_key", "attempts", "last_error", "leased_until", "created_at", "sent_at"]
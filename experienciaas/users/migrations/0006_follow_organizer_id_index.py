@@ -0,0 +1,17 @@
+# Generated by Django 5.1.11 on 2026-10-19 04:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_user_organizer_suspended_user_organizer_suspended_by_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['organizer', 'id'], name='users_follo_organiz_c4f138_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.11 on 2026-10-19 04:13
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_follow_organizer_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('to_email', models.EmailField(max_length=254, verbose_name='Destinatario')),
+                ('domain', models.CharField(max_length=255, verbose_name='Dominio')),
+                ('from_email', models.CharField(max_length=254, verbose_name='Remitente')),
+                ('subject', models.TextField(verbose_name='Asunto')),
+                ('body', models.TextField(verbose_name='Cuerpo')),
+                ('html_body', models.TextField(blank=True, verbose_name='Cuerpo HTML')),
+                ('dedupe_key', models.CharField(db_index=True, max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('sent', 'Enviado'), ('failed', 'Fallido')], default='pending', max_length=20, verbose_name='Estado')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Próximo intento')),
+                ('last_error', models.CharField(blank=True, max_length=255, verbose_name='Último error')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Enviado el')),
+            ],
+            options={
+                'verbose_name': 'Mensaje en cola',
+                'verbose_name_plural': 'Mensajes en cola',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='users_outbo_status_7f5ff5_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('dedupe_key',), name='unique_pending_outbox_message')],
+            },
+        ),
+    ]
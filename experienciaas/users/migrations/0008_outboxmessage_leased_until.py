@@ -0,0 +1,31 @@
+# Generated by Django 5.1.11 on 2026-10-19 05:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_outboxmessage'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='outboxmessage',
+            name='unique_pending_outbox_message',
+        ),
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='leased_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Reservado hasta'),
+        ),
+        migrations.AlterField(
+            model_name='outboxmessage',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pendiente'), ('sending', 'Enviando'), ('sent', 'Enviado'), ('failed', 'Fallido')], default='pending', max_length=20, verbose_name='Estado'),
+        ),
+        migrations.AddConstraint(
+            model_name='outboxmessage',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'sending'])), fields=('dedupe_key',), name='unique_pending_outbox_message'),
+        ),
+    ]
@@ -7,6 +7,7 @@ from django.db import models
 from django.db.models import CharField
 from django.db.models import EmailField
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import RegexValidator, MinLengthValidator
@@ -772,6 +773,10 @@ class Follow(models.Model):
     
     class Meta:
         unique_together = ['follower', 'organizer']
+        indexes = [
+            # Keyset pagination of an organizer's followers
+            models.Index(fields=['organizer', 'id']),
+        ]
         verbose_name = _("Follow")
         verbose_name_plural = _("Follows")
         ordering = ["-created_at"]
@@ -850,3 +855,51 @@ class SponsorshipApplication(models.Model):
     
     def __str__(self):
         return f"{self.supplier_profile.company_name} - {self.event.title} ({self.get_status_display()})"
+
+
+class OutboxMessage(models.Model):
+    """Email rendered during a request and waiting to be delivered by a worker."""
+    STATUS_CHOICES = [
+        ('pending', _('Pendiente')),
+        ('sending', _('Enviando')),
+        ('sent', _('Enviado')),
+        ('failed', _('Fallido')),
+    ]
+
+    to_email = models.EmailField(_("Destinatario"))
+    # Recipient domain, used for per-domain throttling
+    domain = models.CharField(_("Dominio"), max_length=255)
+    from_email = models.CharField(_("Remitente"), max_length=254)
+    subject = models.TextField(_("Asunto"))
+    body = models.TextField(_("Cuerpo"))
+    html_body = models.TextField(_("Cuerpo HTML"), blank=True)
+    # Hash of recipient, subject and bodies used to drop duplicates
+    dedupe_key = models.CharField(max_length=64, db_index=True)
+
+    status = models.CharField(_("Estado"), max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(_("Intentos"), default=0)
+    next_attempt_at = models.DateTimeField(_("Próximo intento"), default=timezone.now)
+    last_error = models.CharField(_("Último error"), max_length=255, blank=True)
+    # Claimed by a worker until then, see experienciaas.users.outbox
+    leased_until = models.DateTimeField(_("Reservado hasta"), null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(_("Enviado el"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Mensaje en cola")
+        verbose_name_plural = _("Mensajes en cola")
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedupe_key'],
+                condition=models.Q(status__in=['pending', 'sending']),
+                name='unique_pending_outbox_message',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.get_status_display()})"
@@ -0,0 +1,256 @@
+"""Email outbox.
+
+Emails rendered during a request are stored as ``OutboxMessage`` rows and
+delivered by the ``drain_email_outbox`` Celery task, so request latency never
+depends on the SMTP server.
+
+Workers claim batches of due messages in a short transaction (rows are
+locked with ``SKIP LOCKED`` so several workers can drain in parallel), marking
+them ``sending`` with a lease, then send each batch over a single SMTP
+connection outside of any transaction and save each message's result as soon
+as it's known. Messages whose worker died keep their lease until it expires
+and are then claimed again; a periodic run of the task picks them up, along
+with retries nothing else scheduled. Failed messages are retried with
+exponential backoff, recipients' domains are throttled to a number of
+messages per minute, and a message that is identical to one still queued or
+recently sent is dropped.
+"""
+import hashlib
+import random
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail import get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_ATTEMPTS = 8
+# Messages per minute sent to each recipient domain.
+DEFAULT_DOMAIN_RATE_LIMIT = 60
+# Identical messages queued within this many seconds are dropped.
+DEFAULT_DEDUPE_WINDOW = 10 * 60
+
+# Seconds a worker has to send a claimed batch.
+SEND_LEASE = 10 * 60
+
+RETRY_BASE_DELAY = 30
+RETRY_MAX_DELAY = 6 * 60 * 60
+
+DRAIN_SCHEDULED_KEY = 'outbox:drain-scheduled'
+
+
+def get_setting(name, default):
+    return getattr(settings, name, default)
+
+
+def get_dedupe_key(to_email, subject, body, html_body):
+    content = '\0'.join([to_email.lower(), subject, body, html_body])
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def queue_email(message):
+    """Store a rendered ``EmailMessage`` in the outbox, one row per recipient.
+
+    Delivery starts once the current transaction commits. Returns the number of
+    queued messages, duplicates excluded.
+    """
+    html_body = ''
+    for content, mimetype in getattr(message, 'alternatives', []):
+        if mimetype == 'text/html':
+            html_body = content
+    body = message.body
+    if message.content_subtype == 'html' and not html_body:
+        html_body, body = body, ''
+
+    recipients = [email for email in message.recipients() if email]
+    dedupe_keys = {
+        email: get_dedupe_key(email, message.subject, body, html_body) for email in recipients
+    }
+    since = timezone.now() - timedelta(seconds=get_setting('EMAIL_OUTBOX_DEDUPE_WINDOW', DEFAULT_DEDUPE_WINDOW))
+    duplicates = set(OutboxMessage.objects.filter(
+        Q(status__in=['pending', 'sending']) | Q(status='sent', created_at__gte=since),
+        dedupe_key__in=dedupe_keys.values()
+    ).values_list('dedupe_key', flat=True))
+
+    messages = [
+        OutboxMessage(
+            to_email=email,
+            domain=email.rsplit('@', 1)[-1].lower(),
+            from_email=message.from_email or settings.DEFAULT_FROM_EMAIL,
+            subject=message.subject,
+            body=body,
+            html_body=html_body,
+            dedupe_key=dedupe_key,
+        )
+        for email, dedupe_key in dedupe_keys.items()
+        if dedupe_key not in duplicates
+    ]
+    # Queued duplicates created concurrently are rejected by the unique constraint
+    OutboxMessage.objects.bulk_create(messages, ignore_conflicts=True)
+    if messages:
+        from .tasks import drain_email_outbox
+        transaction.on_commit(drain_email_outbox.delay)
+    return len(messages)
+
+
+def build_email(outbox_message, connection):
+    email = EmailMultiAlternatives(
+        outbox_message.subject,
+        outbox_message.body,
+        outbox_message.from_email,
+        [outbox_message.to_email],
+        connection=connection,
+    )
+    if outbox_message.html_body:
+        if outbox_message.body:
+            email.attach_alternative(outbox_message.html_body, 'text/html')
+        else:
+            email.body = outbox_message.html_body
+            email.content_subtype = 'html'
+    return email
+
+
+def schedule_retry(outbox_message, exc, now):
+    outbox_message.attempts += 1
+    outbox_message.last_error = str(exc)[:255]
+    permanent = isinstance(exc, smtplib.SMTPRecipientsRefused)
+    if permanent or outbox_message.attempts >= get_setting('EMAIL_OUTBOX_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS):
+        outbox_message.status = 'failed'
+        return
+    outbox_message.status = 'pending'
+    delay = min(RETRY_BASE_DELAY * 2 ** (outbox_message.attempts - 1), RETRY_MAX_DELAY)
+    # Jitter so messages failing together don't retry together
+    delay += random.uniform(0, delay / 10)  # noqa: S311
+    outbox_message.next_attempt_at = now + timedelta(seconds=delay)
+
+
+def throttle_domains(messages, now):
+    """Split ``messages`` into those within their domain's budget and the rest.
+
+    Budgets are counted in the cache per domain and minute, so they hold across
+    workers when the cache is shared.
+    """
+    limit = get_setting('EMAIL_OUTBOX_DOMAIN_RATE_LIMIT', DEFAULT_DOMAIN_RATE_LIMIT)
+    by_domain = {}
+    for outbox_message in messages:
+        by_domain.setdefault(outbox_message.domain, []).append(outbox_message)
+
+    minute = now.strftime('%Y%m%d%H%M')
+    allowed, throttled = [], []
+    for domain, domain_messages in by_domain.items():
+        key = f"outbox:domain:{domain}:{minute}"
+        cache.add(key, 0, timeout=120)
+        try:
+            used = cache.incr(key, len(domain_messages)) - len(domain_messages)
+        except ValueError:
+            # The key expired in between, start a new budget
+            cache.set(key, len(domain_messages), timeout=120)
+            used = 0
+        budget = max(0, limit - used)
+        allowed.extend(domain_messages[:budget])
+        throttled.extend(domain_messages[budget:])
+    return allowed, throttled
+
+
+def save_result(outbox_message):
+    """Save the outcome of sending a claimed message, releasing its lease.
+
+    Nothing is saved if the lease expired and another worker claimed it.
+    """
+    OutboxMessage.objects.filter(
+        pk=outbox_message.pk,
+        status='sending',
+        leased_until=outbox_message.leased_until
+    ).update(
+        status=outbox_message.status,
+        attempts=outbox_message.attempts,
+        next_attempt_at=outbox_message.next_attempt_at,
+        last_error=outbox_message.last_error,
+        sent_at=outbox_message.sent_at,
+        leased_until=None,
+    )
+
+
+def deliver(messages, now):
+    """Send claimed ``messages`` over one connection, saving each result."""
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except (smtplib.SMTPException, OSError) as exc:
+        for outbox_message in messages:
+            schedule_retry(outbox_message, exc, now)
+            save_result(outbox_message)
+        return
+
+    try:
+        for outbox_message in messages:
+            try:
+                build_email(outbox_message, connection).send()
+            except (smtplib.SMTPException, OSError) as exc:
+                schedule_retry(outbox_message, exc, now)
+                save_result(outbox_message)
+                if isinstance(exc, smtplib.SMTPServerDisconnected):
+                    connection.close()
+                    connection.open()
+            else:
+                outbox_message.status = 'sent'
+                outbox_message.sent_at = timezone.now()
+                save_result(outbox_message)
+    except (smtplib.SMTPException, OSError) as exc:
+        # Reconnecting failed: retry whatever wasn't handled yet
+        for outbox_message in messages:
+            if outbox_message.status == 'sending':
+                schedule_retry(outbox_message, exc, now)
+                save_result(outbox_message)
+    finally:
+        connection.close()
+
+
+def claim_batch(batch_size, now):
+    """Lease a batch of due or stranded messages. Returns those to send now.
+
+    Throttled messages are put back to wait for the next minute.
+    """
+    with transaction.atomic():
+        batch = list(OutboxMessage.objects.select_for_update(skip_locked=True).filter(
+            Q(status='pending', next_attempt_at__lte=now) | Q(status='sending', leased_until__lt=now)
+        ).order_by('next_attempt_at', 'pk')[:batch_size])
+        if not batch:
+            return [], 0
+
+        allowed, throttled = throttle_domains(batch, now)
+        next_minute = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for outbox_message in throttled:
+            outbox_message.status = 'pending'
+            outbox_message.next_attempt_at = next_minute
+            outbox_message.leased_until = None
+        for outbox_message in allowed:
+            outbox_message.status = 'sending'
+            outbox_message.leased_until = now + timedelta(seconds=SEND_LEASE)
+        OutboxMessage.objects.bulk_update(batch, ['status', 'next_attempt_at', 'leased_until'])
+    return allowed, len(batch)
+
+
+def drain_outbox(batch_size=None):
+    """Deliver one batch of due messages. Returns the size of the batch."""
+    if batch_size is None:
+        batch_size = get_setting('EMAIL_OUTBOX_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    now = timezone.now()
+    allowed, claimed = claim_batch(batch_size, now)
+    if allowed:
+        deliver(allowed, now)
+    return claimed
+
+
+def get_next_attempt_at():
+    """Return when the next pending message is due, or ``None``."""
+    return OutboxMessage.objects.filter(status='pending').order_by(
+        'next_attempt_at'
+    ).values_list('next_attempt_at', flat=True).first()
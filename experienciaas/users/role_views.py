@@ -5,9 +5,12 @@ from django.contrib import messages
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from django.core.paginator import Paginator
+from django.db import transaction
 from django.db.models import Q
 from django.http import JsonResponse
 
+from experienciaas.utils.replicas import replica_reads
+
 from .models import RoleApplication, SupplierProfile, OrganizerProfile, User
 from .role_forms import (
     RoleApplicationForm, 
@@ -157,6 +160,7 @@ def manage_supplier_profile(request):
 
 
 # Public Profile Views
+@replica_reads
 def supplier_profile(request, slug):
     """Public view for supplier profiles."""
     profile = get_object_or_404(SupplierProfile, slug=slug, is_public=True, status='approved')
@@ -167,6 +171,7 @@ def supplier_profile(request, slug):
     })
 
 
+@replica_reads
 def suppliers_list(request):
     """Public view listing all approved suppliers."""
     suppliers = SupplierProfile.objects.filter(
@@ -250,61 +255,64 @@ def admin_review_role_application(request, application_id):
     application = get_object_or_404(RoleApplication, id=application_id)
     
     if request.method == 'POST':
-        action = request.POST.get('action')
-        admin_notes = request.POST.get('admin_notes', '')
-        rejection_reason = request.POST.get('rejection_reason', '')
+        # The review and the role it grants are saved together
+        with transaction.atomic():
+            application = RoleApplication.objects.select_for_update().get(pk=application.pk)
+            action = request.POST.get('action')
+            admin_notes = request.POST.get('admin_notes', '')
+            rejection_reason = request.POST.get('rejection_reason', '')
         
-        if action == 'approve':
-            application.status = 'approved'
-            application.reviewed_by = request.user
-            application.reviewed_at = timezone.now()
-            application.admin_notes = admin_notes
-            application.save()
+            if action == 'approve':
+                application.status = 'approved'
+                application.reviewed_by = request.user
+                application.reviewed_at = timezone.now()
+                application.admin_notes = admin_notes
+                application.save()
             
-            # Grant the role to the user
-            if application.role == 'organizer':
-                application.user.is_staff = True
-                application.user.save()
+                # Grant the role to the user
+                if application.role == 'organizer':
+                    application.user.is_staff = True
+                    application.user.save()
                 
-                # Create organizer profile if it doesn't exist
-                if not hasattr(application.user, 'organizer_profile'):
-                    OrganizerProfile.objects.create(user=application.user)
+                    # Create organizer profile if it doesn't exist
+                    if not hasattr(application.user, 'organizer_profile'):
+                        OrganizerProfile.objects.create(user=application.user)
                 
-                messages.success(request, _(
-                    'Aplicación aprobada. {} ahora es organizador.'
-                ).format(application.user.name or application.user.email))
+                    messages.success(request, _(
+                        'Aplicación aprobada. {} ahora es organizador.'
+                    ).format(application.user.name or application.user.email))
             
-            elif application.role == 'supplier':
-                # Create supplier profile
-                SupplierProfile.objects.create(
-                    user=application.user,
-                    company_name=application.user.name or f"Empresa de {application.user.email}",
-                    status='approved',
-                    approved_at=timezone.now(),
-                    reviewed_by=request.user,
-                    application_reason=application.motivation
-                )
+                elif application.role == 'supplier':
+                    # Create supplier profile
+                    SupplierProfile.objects.create(
+                        user=application.user,
+                        company_name=application.user.name or f"Empresa de {application.user.email}",
+                        status='approved',
+                        approved_at=timezone.now(),
+                        reviewed_by=request.user,
+                        application_reason=application.motivation
+                    )
                 
-                messages.success(request, _(
-                    'Aplicación aprobada. {} ahora es proveedor.'
-                ).format(application.user.name or application.user.email))
+                    messages.success(request, _(
+                        'Aplicación aprobada. {} ahora es proveedor.'
+                    ).format(application.user.name or application.user.email))
         
-        elif action == 'reject':
-            application.status = 'rejected'
-            application.reviewed_by = request.user
-            application.reviewed_at = timezone.now()
-            application.admin_notes = admin_notes
-            application.rejection_reason = rejection_reason
-            application.save()
+            elif action == 'reject':
+                application.status = 'rejected'
+                application.reviewed_by = request.user
+                application.reviewed_at = timezone.now()
+                application.admin_notes = admin_notes
+                application.rejection_reason = rejection_reason
+                application.save()
             
-            messages.success(request, _('Aplicación rechazada.'))
+                messages.success(request, _('Aplicación rechazada.'))
         
-        elif action == 'under_review':
-            application.status = 'under_review'
-            application.admin_notes = admin_notes
-            application.save()
+            elif action == 'under_review':
+                application.status = 'under_review'
+                application.admin_notes = admin_notes
+                application.save()
             
-            messages.success(request, _('Aplicación marcada como en revisión.'))
+                messages.success(request, _('Aplicación marcada como en revisión.'))
         
         return redirect('users:admin_role_applications')
     
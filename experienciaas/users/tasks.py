@@ -1,9 +1,45 @@
 from celery import shared_task
+from django.core.cache import cache
+from django.utils import timezone
 
 from .models import User
+from .outbox import DEFAULT_BATCH_SIZE
+from .outbox import DRAIN_SCHEDULED_KEY
+from .outbox import drain_outbox
+from .outbox import get_next_attempt_at
+from .outbox import get_setting
 
 
 @shared_task()
 def get_users_count():
     """A pointless Celery task to demonstrate usage."""
     return User.objects.count()
+
+
+
+# Batches sent by one run before handing over to a new task.
+OUTBOX_BATCHES_PER_RUN = 20
+
+
+@shared_task(ignore_result=True)
+def drain_email_outbox():
+    """Deliver the due outbox messages, then schedule a run for pending retries."""
+    batch_size = get_setting('EMAIL_OUTBOX_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    for _ in range(OUTBOX_BATCHES_PER_RUN):
+        if drain_outbox(batch_size) < batch_size:
+            break
+    else:
+        # More due messages than one run should handle
+        drain_email_outbox.delay()
+        return
+
+    next_attempt_at = get_next_attempt_at()
+    if next_attempt_at is None:
+        return
+    # Only schedule a run if none is already due before this one
+    scheduled_at = cache.get(DRAIN_SCHEDULED_KEY)
+    if scheduled_at is not None and scheduled_at <= next_attempt_at.timestamp():
+        return
+    countdown = max(1, int((next_attempt_at - timezone.now()).total_seconds()) + 1)
+    cache.set(DRAIN_SCHEDULED_KEY, next_attempt_at.timestamp(), timeout=countdown)
+    drain_email_outbox.apply_async(countdown=countdown)
@@ -0,0 +1,156 @@
+import smtplib
+from datetime import timedelta
+
+import pytest
+from django.conf import settings as django_settings
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail.backends.base import BaseEmailBackend
+from django.test import RequestFactory
+from django.utils import timezone
+
+from experienciaas.users.adapters import AccountAdapter
+from experienciaas.users.models import OutboxMessage
+from experienciaas.users.outbox import drain_outbox
+from experienciaas.users.outbox import queue_email
+
+pytestmark = pytest.mark.django_db
+
+
+class RefusingBackend(BaseEmailBackend):
+    """Email backend whose server is never reachable."""
+
+    def open(self):
+        msg = "Connection refused"
+        raise smtplib.SMTPConnectError(421, msg)
+
+    def send_messages(self, email_messages):
+        return 0
+
+
+class CrashingBackend(BaseEmailBackend):
+    """Email backend whose worker dies after sending one message."""
+
+    sent = []
+
+    def send_messages(self, email_messages):
+        # Claimed before the SMTP conversation starts
+        message = OutboxMessage.objects.get(to_email=email_messages[0].to[0])
+        assert message.status == "sending"
+        assert message.leased_until > timezone.now()
+        if self.sent:
+            msg = "Worker lost"
+            raise RuntimeError(msg)
+        self.sent.extend(email_messages)
+        return 1
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
+
+
+def make_message(*to):
+    message = EmailMultiAlternatives("Bienvenido", "Hola", to=list(to))
+    message.attach_alternative("<p>Hola</p>", "text/html")
+    return message
+
+
+def test_queued_email_is_delivered_on_commit(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        assert queue_email(make_message("ana@example.com", "luis@example.org")) == 2  # noqa: PLR2004
+
+    assert len(mail.outbox) == 2  # noqa: PLR2004
+    assert mail.outbox[0].alternatives[0][0] == "<p>Hola</p>"
+    assert set(OutboxMessage.objects.values_list("status", flat=True)) == {"sent"}
+
+
+def test_duplicates_are_dropped():
+    assert queue_email(make_message("ana@example.com")) == 1
+    # Still pending
+    assert queue_email(make_message("ana@example.com")) == 0
+    drain_outbox()
+    # Recently sent
+    assert queue_email(make_message("ana@example.com")) == 0
+    assert len(mail.outbox) == 1
+
+
+def test_domains_are_throttled(settings):
+    settings.EMAIL_OUTBOX_DOMAIN_RATE_LIMIT = 2
+    queue_email(make_message(*[f"user{i}@example.com" for i in range(3)], "ana@example.org"))
+
+    drain_outbox()
+
+    assert len(mail.outbox) == 3  # noqa: PLR2004
+    deferred = OutboxMessage.objects.get(status="pending")
+    assert deferred.domain == "example.com"
+    assert deferred.attempts == 0
+
+
+def test_failed_deliveries_are_retried_then_given_up(settings):
+    settings.EMAIL_BACKEND = "experienciaas.users.tests.test_outbox.RefusingBackend"
+    settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+    queue_email(make_message("ana@example.com"))
+
+    drain_outbox()
+    message = OutboxMessage.objects.get()
+    assert message.status == "pending"
+    assert message.attempts == 1
+    assert message.next_attempt_at > message.created_at
+    assert "Connection refused" in message.last_error
+
+    # Not due yet
+    assert drain_outbox() == 0
+    OutboxMessage.objects.update(next_attempt_at=message.created_at)
+    drain_outbox()
+    message.refresh_from_db()
+    assert message.status == "failed"
+    assert message.attempts == 2  # noqa: PLR2004
+
+
+def test_results_are_saved_as_messages_are_sent(settings):
+    settings.EMAIL_BACKEND = "experienciaas.users.tests.test_outbox.CrashingBackend"
+    CrashingBackend.sent = []
+    queue_email(make_message("ana@example.com", "luis@example.com"))
+
+    with pytest.raises(RuntimeError):
+        drain_outbox()
+
+    sent, stranded = OutboxMessage.objects.order_by("pk")
+    assert sent.status == "sent"
+    assert sent.leased_until is None
+    assert stranded.status == "sending"
+    # Left to the leasing worker, then claimed again once the lease expires
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    assert drain_outbox() == 0
+    OutboxMessage.objects.filter(pk=stranded.pk).update(leased_until=timezone.now() - timedelta(seconds=1))
+    assert drain_outbox() == 1
+    stranded.refresh_from_db()
+    assert stranded.status == "sent"
+    assert [message.to for message in mail.outbox] == [["luis@example.com"]]
+
+
+def test_outbox_is_drained_periodically():
+    schedule = django_settings.CELERY_BEAT_SCHEDULE.values()
+
+    assert "experienciaas.users.tasks.drain_email_outbox" in [entry["task"] for entry in schedule]
+
+
+def test_account_adapter_queues_emails():
+    request = RequestFactory().get("/")
+    adapter = AccountAdapter(request)
+
+    from allauth.core import context
+
+    with context.request_context(request):
+        adapter.send_mail(
+            "account/email/password_reset_key",
+            "ana@example.com",
+            {"password_reset_url": "http://testserver/reset/", "user": None},
+        )
+
+    message = OutboxMessage.objects.get()
+    assert message.to_email == "ana@example.com"
+    assert message.status == "pending"
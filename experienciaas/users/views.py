@@ -2,6 +2,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
 from django.db.models import QuerySet
 from django.db import models
+from django.db import transaction
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import DetailView, ListView
@@ -22,6 +23,7 @@ from .forms import SupplierProfileUpdateForm
 
 from experienciaas.users.models import User, OrganizerProfile, Follow, RoleApplication, SupplierProfile
 from experienciaas.users.forms import UserUpdateForm
+from experienciaas.utils.replicas import ReplicaReadMixin
 
 
 class UserDetailView(LoginRequiredMixin, DetailView):
@@ -60,7 +62,7 @@ class UserRedirectView(LoginRequiredMixin, RedirectView):
 user_redirect_view = UserRedirectView.as_view()
 
 
-class OrganizerProfileView(DetailView):
+class OrganizerProfileView(ReplicaReadMixin, DetailView):
     """Public view for organizer profiles."""
     model = OrganizerProfile
     template_name = "users/organizer_profile.html"
@@ -127,7 +129,7 @@ class OrganizerProfileView(DetailView):
 organizer_profile_view = OrganizerProfileView.as_view()
 
 
-class OrganizersListView(ListView):
+class OrganizersListView(ReplicaReadMixin, ListView):
     """List view for all public organizers."""
     model = OrganizerProfile
     template_name = "users/organizers_list.html"
@@ -365,13 +367,14 @@ class AdminSupplierProfilesView(ListView):
 
 @require_POST
 @staff_member_required
+@transaction.atomic
 def approve_role_application(request, application_id):
     """Approve a role application."""
     if not request.user.is_superuser:
         messages.error(request, _("Access denied. Superuser permission required."))
         return redirect('users:admin_active_roles')
     
-    application = get_object_or_404(RoleApplication, id=application_id)
+    application = get_object_or_404(RoleApplication.objects.select_for_update(), id=application_id)
     
     if application.status != 'pending':
         messages.warning(request, _("This application has already been processed."))
@@ -493,13 +496,14 @@ def approve_role_application(request, application_id):
 
 @require_POST
 @staff_member_required
+@transaction.atomic
 def reject_role_application(request, application_id):
     """Reject a role application."""
     if not request.user.is_superuser:
         messages.error(request, _("Access denied. Superuser permission required."))
         return redirect('users:admin_active_roles')
     
-    application = get_object_or_404(RoleApplication, id=application_id)
+    application = get_object_or_404(RoleApplication.objects.select_for_update(), id=application_id)
     
     if application.status != 'pending':
         messages.warning(request, _("This application has already been processed."))
@@ -517,6 +521,7 @@ def reject_role_application(request, application_id):
 
 @require_POST
 @staff_member_required
+@transaction.atomic
 def approve_supplier_profile(request, profile_id):
     """Approve a supplier profile."""
     if not request.user.is_superuser:
@@ -539,6 +544,7 @@ def approve_supplier_profile(request, profile_id):
 
 @require_POST
 @staff_member_required
+@transaction.atomic
 def reject_supplier_profile(request, profile_id):
     """Reject/unapprove a supplier profile."""
     if not request.user.is_superuser:
@@ -691,6 +697,7 @@ class AdminUnifiedRolesView(ListView):
 
 @require_POST
 @staff_member_required
+@transaction.atomic
 def suspend_organizer_role(request, user_id):
     """Suspend organizer role for a user."""
     if not request.user.is_superuser:
@@ -742,6 +749,7 @@ def suspend_organizer_role(request, user_id):
 
 @require_POST
 @staff_member_required
+@transaction.atomic
 def suspend_supplier_role(request, user_id):
     """Suspend supplier role for a user."""
     if not request.user.is_superuser:
@@ -793,6 +801,7 @@ def suspend_supplier_role(request, user_id):
 
 @require_POST
 @staff_member_required
+@transaction.atomic
 def reactivate_organizer_role(request, user_id):
     """Reactivate suspended organizer role."""
     if not request.user.is_superuser:
@@ -817,6 +826,7 @@ def reactivate_organizer_role(request, user_id):
 
 @require_POST
 @staff_member_required
+@transaction.atomic
 def reactivate_supplier_role(request, user_id):
     """Reactivate suspended supplier role."""
     if not request.user.is_superuser:
@@ -841,6 +851,7 @@ def reactivate_supplier_role(request, user_id):
 
 @require_POST
 @staff_member_required
+@transaction.atomic
 def revoke_organizer_role(request, user_id):
     """Completely revoke organizer role from a user."""
     if not request.user.is_superuser:
@@ -871,6 +882,7 @@ def revoke_organizer_role(request, user_id):
 
 @require_POST
 @staff_member_required
+@transaction.atomic
 def revoke_supplier_role(request, user_id):
     """Completely revoke supplier role from a user."""
     if not request.user.is_superuser:
@@ -906,6 +918,7 @@ admin_active_roles_view = AdminUnifiedRolesView.as_view()
 
 @require_POST
 @staff_member_required
+@transaction.atomic
 def activate_user_account(request, user_id):
     """Activate a user account."""
     if not request.user.is_superuser:
@@ -927,6 +940,7 @@ def activate_user_account(request, user_id):
 
 @require_POST
 @staff_member_required
+@transaction.atomic
 def deactivate_user_account(request, user_id):
     """Deactivate a user account."""
     if not request.user.is_superuser:
@@ -970,6 +984,7 @@ def deactivate_user_account(request, user_id):
 
 @require_POST
 @staff_member_required
+@transaction.atomic
 def promote_to_organizer(request, user_id):
     """Promote a basic user to organizer role."""
     if not request.user.is_superuser:
@@ -1008,6 +1023,7 @@ def promote_to_organizer(request, user_id):
 
 @require_POST
 @staff_member_required
+@transaction.atomic
 def approve_as_supplier(request, user_id):
     """Approve a basic user as supplier."""
     if not request.user.is_superuser:
@@ -0,0 +1,107 @@
+"""Session-free, CSRF-free responses for anonymous visits to catalog pages.
+
+Views marked with ``public_page`` (or ``PublicPageMixin``) are public pages.
+Anonymous GET and HEAD requests to them that carry neither a session nor a
+messages cookie get a response shared caches (nginx, traefik) can store:
+
+- no CSRF token is rendered (``public_page_context``), so no CSRF cookie is
+  set; anonymous visitors get one on the pages with forms;
+- no session is created, and reading the empty session to find out the user
+  is anonymous doesn't add ``Vary: Cookie``;
+- ``Cache-Control: public`` is added, with ``PUBLIC_PAGE_MAX_AGE`` seconds.
+
+Requests with a session cookie never take this path and the pages no longer
+vary on cookies, so the proxy must skip its cache for them, e.g. nginx's
+``proxy_cache_bypass $cookie_sessionid`` and ``proxy_no_cache
+$cookie_sessionid``.
+
+A view that still writes the session or renders a CSRF token gets a regular,
+uncacheable response.
+"""
+
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.http.request import HttpRequest
+from django.utils.cache import patch_cache_control
+
+SAFE_METHODS = ("GET", "HEAD")
+
+
+def public_page(view):
+    """Mark a view function as a public catalog page."""
+    view.public_page = True
+    return view
+
+
+class PublicPageMixin:
+    """Serve a class-based view as a public catalog page."""
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return public_page(super().as_view(**initkwargs))
+
+
+def is_public_page(request):
+    """Whether the request takes the session-free, CSRF-free path."""
+    return getattr(request, "public_page", False)
+
+
+def public_page_context(request):
+    """Leave the CSRF token and flash messages out of public pages."""
+    if not is_public_page(request):
+        return {}
+    return {"csrf_token": "", "messages": ()}
+
+
+class PublicPageMiddleware:
+    """Make anonymous responses of public pages cacheable by shared caches.
+
+    It must come after the session, CSRF and messages middleware, so it sees
+    responses before they do.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Marks the request without a thread hop
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.make_cacheable(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.make_cacheable(request, await self.get_response(request))
+
+    def process_view(self, request: HttpRequest, view_func, view_args, view_kwargs):
+        if (
+            getattr(view_func, "public_page", False)
+            and request.method in SAFE_METHODS
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+            and CookieStorage.cookie_name not in request.COOKIES
+        ):
+            request.public_page = True
+
+    async def aprocess_view(self, request: HttpRequest, view_func, view_args, view_kwargs):
+        PublicPageMiddleware.process_view(self, request, view_func, view_args, view_kwargs)
+
+    def make_cacheable(self, request: HttpRequest, response):
+        if not is_public_page(request):
+            return response
+        session = request.session
+        if session.modified or not session.is_empty() or request.META.get("CSRF_COOKIE_NEEDS_UPDATE"):
+            # The view used the session or a CSRF token after all
+            return response
+
+        # Only read to find out the visitor is anonymous
+        session.accessed = False
+        if response.status_code == 200 and not response.has_header("Cache-Control"):  # noqa: PLR2004
+            patch_cache_control(response, public=True, max_age=settings.PUBLIC_PAGE_MAX_AGE)
+        return response
@@ -0,0 +1,80 @@
+"""Fan-out of Redis pub/sub messages to local asyncio subscribers.
+
+Each ASGI process holds a single Redis subscription per channel, no matter how
+many clients are connected, and routes every published item to the
+subscriptions interested in its key.
+"""
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+from redis.exceptions import RedisError
+
+from .redis import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY = 5
+
+
+class PubSubHub:
+    """Route the items of messages published on ``channel`` to subscriptions.
+
+    Messages are JSON objects holding a list of items under ``items_key``; each
+    item is pushed to the subscriptions registered for its ``id_key`` value.
+    Subscriptions only need a ``keys`` set and a ``push(item)`` method.
+    """
+
+    def __init__(self, channel, items_key, id_key):
+        self.channel = channel
+        self.items_key = items_key
+        self.id_key = id_key
+        self.subscriptions = defaultdict(set)
+        self.listener = None
+
+    def subscribe(self, subscription, keys):
+        for key in keys:
+            self.subscriptions[key].add(subscription)
+            subscription.keys.add(key)
+        if self.subscriptions and (self.listener is None or self.listener.done()):
+            self.listener = asyncio.create_task(self.listen())
+
+    def unsubscribe(self, subscription, keys=None):
+        if keys is None:
+            keys = list(subscription.keys)
+        for key in keys:
+            subscription.keys.discard(key)
+            subscribers = self.subscriptions.get(key)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscriptions[key]
+
+    def dispatch(self, message):
+        for item in message.get(self.items_key, []):
+            for subscription in self.subscriptions.get(item[self.id_key], ()):
+                subscription.push(item)
+
+    async def listen(self):
+        """Relay the channel messages while there are subscriptions."""
+        while self.subscriptions:
+            client = get_async_redis()
+            if client is None:
+                return
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    while self.subscriptions:
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True,
+                            timeout=5,
+                        )
+                        if message is not None:
+                            self.dispatch(json.loads(message["data"]))
+            except (RedisError, OSError) as exc:
+                logger.warning("Subscription to %s lost: %s", self.channel, exc)
+                await asyncio.sleep(RECONNECT_DELAY)
+            finally:
+                await client.aclose()
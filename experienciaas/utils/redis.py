@@ -0,0 +1,72 @@
+"""Shared Redis clients.
+
+Features that talk to Redis directly (pub/sub, counters, sorted sets) get their
+client from here instead of opening their own connections. ``get_redis()``
+returns ``None`` when Redis isn't configured or recently failed, so callers can
+skip or fall back to the database without waiting on timeouts.
+"""
+
+import logging
+import time
+from functools import lru_cache
+
+import redis
+import redis.asyncio
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds to stop using Redis after a connection error.
+RETRY_AFTER = 30
+
+_unavailable_until = 0.0
+
+
+def get_connection_kwargs():
+    kwargs = {
+        "socket_connect_timeout": 1,
+        "socket_timeout": 2,
+        "health_check_interval": 30,
+    }
+    if getattr(settings, "REDIS_SSL", False):
+        kwargs["ssl_cert_reqs"] = None
+    return kwargs
+
+
+@lru_cache(maxsize=4)
+def _get_client(url):
+    return redis.Redis.from_url(url, **get_connection_kwargs())
+
+
+def is_available():
+    return (
+        bool(getattr(settings, "REDIS_URL", ""))
+        and time.monotonic() >= _unavailable_until
+    )
+
+
+def get_redis():
+    """Return the shared Redis client, or ``None`` if Redis can't be used."""
+    if not is_available():
+        return None
+    return _get_client(settings.REDIS_URL)
+
+
+def get_async_redis():
+    """Return a new asyncio Redis client, or ``None`` if Redis can't be used.
+
+    asyncio clients are bound to the running event loop, so they aren't shared.
+    """
+    if not is_available():
+        return None
+    kwargs = get_connection_kwargs()
+    # Subscribers block on reads, so only the connect timeout applies
+    kwargs.pop("socket_timeout")
+    return redis.asyncio.Redis.from_url(settings.REDIS_URL, **kwargs)
+
+
+def mark_unavailable(exc):
+    """Stop using Redis for a while after ``exc``."""
+    global _unavailable_until  # noqa: PLW0603
+    _unavailable_until = time.monotonic() + RETRY_AFTER
+    logger.warning("Redis unavailable, retrying in %ss: %s", RETRY_AFTER, exc)
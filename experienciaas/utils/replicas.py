@@ -0,0 +1,183 @@
+"""Read replica routing for read-only pages.
+
+Views marked with ``replica_reads`` (or ``ReplicaReadMixin``) read from the
+``replica`` database alias when it's configured (``DATABASE_REPLICA_URL``);
+everything else, and every write, uses the primary. Reads fall back to the
+primary when:
+
+- the client wrote recently: ``ReplicaMiddleware`` sets a cookie after
+  unsafe requests, pinning the client to the primary for
+  ``DATABASE_REPLICA_PIN_SECONDS`` so it reads its own writes (except for
+  views marked with ``no_primary_pin``, whose writes the client never reads
+  back);
+- the replica lags more than ``DATABASE_REPLICA_MAX_LAG`` seconds behind,
+  measured at most every ``LAG_CHECK_INTERVAL`` seconds per process;
+- a transaction is open on the primary, whose writes the replica can't see.
+
+Marked views are also non-atomic, so they never run in a request transaction
+should a database enable ``ATOMIC_REQUESTS``.
+"""
+
+import contextvars
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db import DatabaseError
+from django.db import connections
+from django.db import transaction
+from django.http.request import HttpRequest
+
+logger = logging.getLogger(__name__)
+
+REPLICA_DB_ALIAS = "replica"
+PIN_COOKIE = "primary_pin"
+LAG_CHECK_INTERVAL = 5
+
+# Lag of a PostgreSQL standby in seconds, 0 once it replayed everything it
+# received or when the database isn't a standby at all
+LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+_replica_reads = contextvars.ContextVar("replica_reads", default=False)
+
+_lag = 0.0
+_lag_checked_at = 0.0
+
+
+def replica_reads(view):
+    """Mark a view function as read-only, to be served from the replica."""
+    view.replica_reads = True
+    return transaction.non_atomic_requests(view)
+
+
+def no_primary_pin(view):
+    """Mark an unsafe view function as not pinning the client to the primary."""
+    view.pins_primary = False
+    return view
+
+
+class ReplicaReadMixin:
+    """Serve a read-only class-based view from the replica."""
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return replica_reads(super().as_view(**initkwargs))
+
+
+def has_replica():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def measure_replica_lag():
+    connection = connections[REPLICA_DB_ALIAS]
+    if connection.vendor != "postgresql":
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(LAG_SQL)
+        return float(cursor.fetchone()[0])
+
+
+def get_replica_lag():
+    """Seconds the replica is behind, infinite if it can't be reached."""
+    global _lag, _lag_checked_at  # noqa: PLW0603
+    now = time.monotonic()
+    if now - _lag_checked_at >= LAG_CHECK_INTERVAL:
+        try:
+            _lag = measure_replica_lag()
+        except DatabaseError as exc:
+            logger.warning("Read replica unavailable: %s", exc)
+            _lag = float("inf")
+        _lag_checked_at = now
+    return _lag
+
+
+def use_replica():
+    return (
+        _replica_reads.get()
+        and has_replica()
+        and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        and get_replica_lag() <= settings.DATABASE_REPLICA_MAX_LAG
+    )
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if use_replica():
+            return REPLICA_DB_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Objects read from the replica are saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPLICA_DB_ALIAS:
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    """Enable replica reads for marked views, unless the client is pinned."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Marks the view without a thread hop
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _replica_reads.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica_reads.reset(token)
+        return self.pin_to_primary(request, response)
+
+    async def __acall__(self, request):
+        token = _replica_reads.set(False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _replica_reads.reset(token)
+        return self.pin_to_primary(request, response)
+
+    def process_view(self, request: HttpRequest, view_func, view_args, view_kwargs):
+        if getattr(view_func, "replica_reads", False) and PIN_COOKIE not in request.COOKIES:
+            _replica_reads.set(True)
+        request.pins_primary = getattr(view_func, "pins_primary", True)
+
+    async def aprocess_view(self, request: HttpRequest, view_func, view_args, view_kwargs):
+        ReplicaMiddleware.process_view(self, request, view_func, view_args, view_kwargs)
+
+    def pin_to_primary(self, request: HttpRequest, response):
+        if request.method not in ("GET", "HEAD", "OPTIONS", "TRACE") and getattr(request, "pins_primary", True):
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                secure=request.is_secure(),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response